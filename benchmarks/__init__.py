@@ -0,0 +1,11 @@
+"""
+Benchmarks für den ObservationWrapper, die Constraint-Prüfung und das highway-v0-Environment.
+
+Die reproduzierbaren Suites (siehe suites) werden mit run ausgeführt und als JSON gespeichert, compare vergleicht
+zwei Ergebnisdateien und meldet Verschlechterungen oberhalb eines Schwellwerts:
+    python -m benchmarks.run --output baseline.json
+    python -m benchmarks.run --output current.json
+    python -m benchmarks.compare baseline.json current.json --threshold 0.1
+
+Daneben gibt es einzelne Benchmark-Skripte (bench_*.py) für gezielte Vergleiche von Implementierungen.
+"""
@@ -0,0 +1,119 @@
+"""
+Microbenchmark der Event-Abonnements der Constraint-b-threads aus overtake_abstract_checker.
+
+Ein synthetischer Lauf mit --steps Simulationsschritten (je Schritt POSITION_UPDATE, STEP und SPEED_UPDATE, dazu
+regelmäßig LANE_CHANGE und SPEED_UP, am Ende END) wird abgespielt:
+  - ohne Constraints (Referenz für den Aufwand des BProgram selbst),
+  - mit den Constraints, die wie ursprünglich mit waitFor=All() auf jedes Event warten,
+  - mit den Constraints, die nur auf ihre Events und END warten (EventNameSet).
+Die beiden Varianten mit Constraints werden jeweils mit der SimpleEventSelectionStrategy und mit der
+SubscriptionEventSelectionStrategy gemessen.
+Für den Vergleich mit All() werden die Event-Sets des Moduls vorübergehend durch All() ersetzt; da die Constraints
+die Event-Namen zusätzlich selbst prüfen, entspricht das dem ursprünglichen Verhalten.
+
+Aufruf aus dem Repository-Root:
+    python -m benchmarks.bench_checker_subscriptions
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+from bppy import All, BEvent, BProgram, SimpleEventSelectionStrategy, sync, thread
+
+sys.path.insert(
+    0, str(Path(__file__).resolve().parent.parent / "src" / "overtake_abstract_checker")
+)
+
+import overtake_abstract_checker  # noqa: E402
+
+EVENT_SETS = (
+    "POSITION_EVENTS",
+    "DURATION_EVENTS",
+    "FUNCTIONAL_ACTION_EVENTS",
+    "SPEED_LIMIT_EVENTS",
+)
+
+
+@thread
+def synthetic_run(steps):
+    for step in range(steps):
+        yield sync(
+            request=BEvent("POSITION_UPDATE", {"distance_to_vut": step / 100 - 50})
+        )
+        yield sync(request=BEvent("STEP"))
+        yield sync(request=BEvent("SPEED_UPDATE", {"speed": 20.0}))
+        if step % 40 == 5:
+            yield sync(request=BEvent("LANE_CHANGE", {"step": step}))
+        elif step % 40 == 20:
+            yield sync(request=BEvent("SPEED_UP", {"step": step}))
+    yield sync(request=BEvent("END"))
+
+
+def count_events(steps: int) -> int:
+    return 3 * steps + sum(1 for step in range(steps) if step % 40 in (5, 20)) + 1
+
+
+def measure(
+    steps: int, checker_threads, strategy=SimpleEventSelectionStrategy
+) -> float:
+    bp = BProgram(
+        bthreads=[synthetic_run(steps)] + checker_threads(),
+        event_selection_strategy=strategy(),
+    )
+    start = time.perf_counter()
+    bp.run()
+    return time.perf_counter() - start
+
+
+def measure_with_all(steps: int, strategy=SimpleEventSelectionStrategy) -> float:
+    event_sets = {name: getattr(overtake_abstract_checker, name) for name in EVENT_SETS}
+    try:
+        for name in EVENT_SETS:
+            setattr(overtake_abstract_checker, name, All())
+        return measure(steps, overtake_abstract_checker.get_checker_threads, strategy)
+    finally:
+        for name, event_set in event_sets.items():
+            setattr(overtake_abstract_checker, name, event_set)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--steps", type=int, default=10000)
+    args = parser.parse_args()
+
+    # die Verdicts sind hier nicht von Interesse
+    overtake_abstract_checker.logger.setLevel(logging.CRITICAL)
+    events = count_events(args.steps)
+    runs = [
+        ("ohne Constraints", measure(args.steps, list)),
+        ("waitFor=All()", measure_with_all(args.steps)),
+        (
+            "All() + Subscription",
+            measure_with_all(
+                args.steps, overtake_abstract_checker.SubscriptionEventSelectionStrategy
+            ),
+        ),
+        (
+            "EventNameSet",
+            measure(args.steps, overtake_abstract_checker.get_checker_threads),
+        ),
+        (
+            "EventNameSet + Subscription",
+            measure(
+                args.steps,
+                overtake_abstract_checker.get_checker_threads,
+                overtake_abstract_checker.SubscriptionEventSelectionStrategy,
+            ),
+        ),
+    ]
+    print("{} Events ({} Steps)".format(events, args.steps))
+    print("{:>28} {:>10} {:>12}".format("", "Zeit [s]", "Events/s"))
+    for name, seconds in runs:
+        print("{:>28} {:>10.2f} {:>12.0f}".format(name, seconds, events / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Allokationen und Laufzeit der Events eines Laufs mit und ohne kompakte Event-Darstellung.
+
+Je Simulationsschritt werden POSITION_UPDATE, STEP und SPEED_UPDATE erzeugt, dazu regelmäßig LANE_CHANGE und
+SPEED_UP, am Ende END. Verglichen werden:
+  - dict: wie ursprünglich ein neues BEvent mit neuem Dict als Payload je Event,
+  - compact: die Factory-Methoden aus demo_scenarios (Singletons für STEP und END, Payloads mit __slots__).
+Gemessen werden mit tracemalloc die Anzahl der Allokationen und die Bytes, die die Events aller --steps Schritte
+belegen, sowie die kürzeste Laufzeit von --repeat BProgram-Läufen mit den Constraints über diese Events.
+
+Aufruf aus dem Repository-Root:
+    python -m benchmarks.bench_event_allocations --steps 10000
+"""
+
+import argparse
+import logging
+import time
+import tracemalloc
+
+from bppy import BEvent, BProgram, sync, thread
+
+from .common import add_checker_to_path
+
+add_checker_to_path()
+
+import demo_scenarios  # noqa: E402
+import overtake_abstract_checker  # noqa: E402
+
+DICT_FACTORIES = {
+    "position_update": lambda distance: BEvent(
+        "POSITION_UPDATE", {"distance_to_vut": distance}
+    ),
+    "step": lambda: BEvent("STEP"),
+    "speed_update": lambda speed: BEvent("SPEED_UPDATE", {"speed": speed}),
+    "lane_change": lambda step: BEvent("LANE_CHANGE", {"step": step}),
+    "speed_up": lambda step: BEvent("SPEED_UP", {"step": step}),
+    "end": lambda: BEvent("END"),
+}
+
+COMPACT_FACTORIES = {
+    "position_update": demo_scenarios.make_position_update,
+    "step": demo_scenarios.make_step,
+    "speed_update": demo_scenarios.make_speed_update,
+    "lane_change": demo_scenarios.make_lane_change,
+    "speed_up": demo_scenarios.make_speed_up,
+    "end": demo_scenarios.make_end,
+}
+
+
+def make_events(factories: dict, steps: int) -> list:
+    events = []
+    for step in range(steps):
+        events.append(factories["position_update"](step / 100 - 50))
+        events.append(factories["step"]())
+        events.append(factories["speed_update"](20.0 + step % 7))
+        if step % 40 == 5:
+            events.append(factories["lane_change"](step))
+        elif step % 40 == 20:
+            events.append(factories["speed_up"](step))
+    events.append(factories["end"]())
+    return events
+
+
+def measure_allocations(factories: dict, steps: int):
+    """
+    :return: Die Anzahl der Allokationen und die Bytes, die nach dem Erzeugen der Events belegt sind.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        events = make_events(factories, steps)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    differences = after.compare_to(before, "filename")
+    blocks = sum(difference.count_diff for difference in differences)
+    size = sum(difference.size_diff for difference in differences)
+    del events
+    return blocks, size
+
+
+@thread
+def replay(events):
+    for event in events:
+        yield sync(request=event)
+
+
+def measure_run(factories: dict, steps: int) -> float:
+    """
+    :return: Die Laufzeit eines BProgram-Laufs mit den Constraints über die Events, einschließlich ihrer Erzeugung.
+    """
+    start = time.perf_counter()
+    bp = BProgram(
+        bthreads=[replay(make_events(factories, steps))]
+        + overtake_abstract_checker.get_checker_threads(log=False),
+        event_selection_strategy=overtake_abstract_checker.SubscriptionEventSelectionStrategy(),
+    )
+    bp.run()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--steps", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # bppy loggt jedes ausgewählte Event
+    logging.disable(logging.INFO)
+    print("{} Steps".format(args.steps))
+    print(
+        "{:>10} {:>14} {:>12} {:>14} {:>10}".format(
+            "", "Allokationen", "Bytes", "Bytes/Step", "Lauf [s]"
+        )
+    )
+    for name, factories in (("dict", DICT_FACTORIES), ("compact", COMPACT_FACTORIES)):
+        blocks, size = measure_allocations(factories, args.steps)
+        seconds = min(measure_run(factories, args.steps) for _ in range(args.repeat))
+        print(
+            "{:>10} {:>14} {:>12} {:>14.1f} {:>10.2f}".format(
+                name, blocks, size, size / args.steps, seconds
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
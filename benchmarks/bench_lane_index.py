@@ -0,0 +1,120 @@
+"""
+Skalierungs-Benchmark der Lücken- und Abstandsabfragen des ObservationWrappers.
+
+Verglichen werden je Anzahl beobachteter Fahrzeuge:
+  - loop: der ursprüngliche Durchlauf über alle Zeilen in Python (als Referenz),
+  - scan: die vektorisierte Auswertung über alle beobachteten Fahrzeuge (Standard des ObservationWrappers),
+  - index: der je Frame aufgebaute LaneIndex mit binärer Suche (use_lane_index=True).
+
+Je Frame wird eine neue Observation gesetzt und für jedes kontrollierte Fahrzeug werden linke und rechte Lücke
+sowie der Abstand zum voraus- und hinterherfahrenden Fahrzeug abgefragt.
+
+Aufruf aus dem Repository-Root:
+    python -m benchmarks.bench_lane_index
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.observation_wrapper import ObservationWrapper
+
+CONTROLLED_VEHICLES = 7
+GAPS = [(5, 5), (10, 10), (25, 25), (50, 50)]
+
+
+def make_observation(rng, vehicles_count: int):
+    return tuple(
+        np.column_stack(
+            [
+                rng.uniform(-200, 200, vehicles_count),
+                rng.choice([-8, -4, 0, 4, 8], vehicles_count),
+                rng.uniform(15, 30, vehicles_count),
+                np.zeros(vehicles_count),
+            ]
+        ).astype(np.float32)
+        for _ in range(CONTROLLED_VEHICLES)
+    )
+
+
+def loop_queries(observation):
+    for values in observation:
+        for front, back in GAPS:
+            for side in (-1, 1):
+                for vehicle_i in range(1, values.shape[0]):
+                    if values[vehicle_i][1] * side > 0 and (
+                        -back <= values[vehicle_i][0] <= front
+                    ):
+                        break
+        leading, following = None, None
+        for vehicle_i in range(1, values.shape[0]):
+            if not round(values[vehicle_i][1], 1) == 0:
+                continue
+            x = values[vehicle_i][0]
+            if x > 0 and (leading is None or x < leading):
+                leading = x
+            if x < 0 and (following is None or x > following):
+                following = x
+
+
+def wrapper_queries(obs_wrapper: ObservationWrapper):
+    for vehicle_id in range(CONTROLLED_VEHICLES):
+        for front, back in GAPS:
+            obs_wrapper.is_left_lane_clear(vehicle_id, front, back)
+            obs_wrapper.is_right_lane_clear(vehicle_id, front, back)
+        obs_wrapper.get_distance_to_leading_vehicle(vehicle_id)
+        obs_wrapper.get_distance_to_following_vehicle(vehicle_id)
+
+
+def measure(frames, run_frame) -> float:
+    start = time.perf_counter()
+    for observation in frames:
+        run_frame(observation)
+    return (time.perf_counter() - start) / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--vehicles", type=int, nargs="+", default=[5, 10, 50, 100, 200, 500]
+    )
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    scan = ObservationWrapper(None)
+    index = ObservationWrapper(None, use_lane_index=True)
+
+    def run_scan(observation):
+        scan.set_observation(observation)
+        wrapper_queries(scan)
+
+    def run_index(observation):
+        index.set_observation(observation)
+        wrapper_queries(index)
+
+    print(
+        "{:>8} {:>12} {:>12} {:>12} {:>10}".format(
+            "vehicles", "loop [µs]", "scan [µs]", "index [µs]", "speedup"
+        )
+    )
+    for vehicles_count in args.vehicles:
+        frames = [make_observation(rng, vehicles_count) for _ in range(args.frames)]
+        loop_time = measure(frames, loop_queries)
+        scan_time = measure(frames, run_scan)
+        index_time = measure(frames, run_index)
+        print(
+            "{:>8} {:>12.1f} {:>12.1f} {:>12.1f} {:>9.1f}x".format(
+                vehicles_count,
+                loop_time * 1e6,
+                scan_time * 1e6,
+                index_time * 1e6,
+                loop_time / index_time,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
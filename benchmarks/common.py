@@ -0,0 +1,56 @@
+import os
+import platform
+import statistics
+import sys
+import time
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+CHECKER_DIR = (
+    Path(__file__).resolve().parent.parent / "src" / "overtake_abstract_checker"
+)
+
+
+def add_checker_to_path():
+    """
+    Die Module der Constraint-Prüfung importieren sich gegenseitig ohne Paketnamen, daher muss ihr Verzeichnis im
+    Suchpfad liegen.
+    """
+    if str(CHECKER_DIR) not in sys.path:
+        sys.path.insert(0, str(CHECKER_DIR))
+
+
+def measure(run, repeat: int = 5) -> dict:
+    """
+    Führt run repeat-mal aus.
+    :return: Dict mit Median, Minimum und Maximum der Laufzeiten in Sekunden.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {
+        "median": statistics.median(times),
+        "min": min(times),
+        "max": max(times),
+    }
+
+
+def environment_info() -> dict:
+    """
+    :return: Angaben zur Umgebung, in der die Benchmarks ausgeführt wurden.
+    """
+    packages = {}
+    for package in ("numpy", "bppy", "gymnasium", "highway-env"):
+        try:
+            packages[package] = version(package)
+        except PackageNotFoundError:
+            packages[package] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "packages": packages,
+    }
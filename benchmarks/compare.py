@@ -0,0 +1,93 @@
+"""
+Vergleicht zwei Ergebnisdateien von benchmarks.run und meldet Verschlechterungen oberhalb eines Schwellwerts.
+
+Verglichen wird der Median der Zeit je Einheit. Eine Messung gilt als Verschlechterung, wenn sie im neuen Lauf um
+mehr als threshold (relativ) langsamer ist. Sind Verschlechterungen enthalten, endet der Aufruf mit Exit-Code 1.
+
+Aufruf aus dem Repository-Root:
+    python -m benchmarks.compare baseline.json current.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+
+
+def result_key(entry: dict) -> str:
+    """
+    :return: Eindeutiger Schlüssel einer Messung aus Suite, Name und Parametern.
+    """
+    params = ",".join(
+        "{}={}".format(key, value) for key, value in sorted(entry["params"].items())
+    )
+    return "{}/{}[{}]".format(entry["suite"], entry["name"], params)
+
+
+def load_results(path: str) -> dict:
+    with open(path) as file:
+        return {result_key(entry): entry for entry in json.load(file)["results"]}
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> list:
+    """
+    :param baseline: Die Ergebnisse des Referenzlaufs je Schlüssel (siehe load_results).
+    :param current: Die Ergebnisse des neuen Laufs je Schlüssel.
+    :param threshold: Die relative Verlangsamung, ab der eine Messung als Verschlechterung gilt.
+    :return: Liste von Dicts mit "key", "baseline" und "current" (Median in Sekunden, None wenn die Messung in
+    einem der Läufe fehlt), der relativen Änderung "change" und "regression". Nur Messungen, die in beiden Läufen
+    enthalten sind, können als Verschlechterung gelten.
+    """
+    comparisons = []
+    for key in list(baseline) + [key for key in current if key not in baseline]:
+        old = baseline[key]["seconds"]["median"] if key in baseline else None
+        new = current[key]["seconds"]["median"] if key in current else None
+        change = new / old - 1 if old and new is not None else None
+        comparisons.append(
+            {
+                "key": key,
+                "baseline": old,
+                "current": new,
+                "change": change,
+                "regression": change is not None and change > threshold,
+            }
+        )
+    return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative Verlangsamung, ab der eine Messung als Verschlechterung gilt.",
+    )
+    args = parser.parse_args()
+
+    comparisons = compare(
+        load_results(args.baseline), load_results(args.current), args.threshold
+    )
+    for comparison in comparisons:
+        if comparison["change"] is None:
+            status = "nur in {}".format(
+                args.baseline if comparison["current"] is None else args.current
+            )
+        else:
+            status = "{:+.1%}{}".format(
+                comparison["change"],
+                " VERSCHLECHTERUNG" if comparison["regression"] else "",
+            )
+        print("{}: {}".format(comparison["key"], status))
+    regressions = sum(comparison["regression"] for comparison in comparisons)
+    print(
+        "{} Messungen, {} Verschlechterungen über {:.0%}".format(
+            len(comparisons), regressions, args.threshold
+        )
+    )
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Führt die Benchmark-Suites aus und speichert die Ergebnisse als JSON.
+
+Aufruf aus dem Repository-Root:
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --suite wrapper --suite checker --quick --output results.json
+"""
+
+import argparse
+import json
+import time
+
+from .common import environment_info
+from .suites import SEED, SUITES
+
+
+def run_suites(suites=None, quick: bool = False, repeat: int = 5) -> dict:
+    """
+    :param suites: Namen der Suites (siehe SUITES), None für alle.
+    :param quick: Führt die Suites mit weniger Parametern und kürzeren Läufen aus.
+    :param repeat: Die Anzahl der Wiederholungen je Messung.
+    :return: Dict mit den Angaben zur Umgebung ("environment"), den Einstellungen des Laufs ("settings") und der
+    Liste der Ergebnisse ("results").
+    """
+    suites = suites or list(SUITES)
+    results = []
+    for suite in suites:
+        results.extend(SUITES[suite](quick=quick, repeat=repeat))
+    return {
+        "environment": environment_info(),
+        "settings": {
+            "suites": suites,
+            "quick": quick,
+            "repeat": repeat,
+            "seed": SEED,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--suite",
+        action="append",
+        choices=list(SUITES),
+        help="Auszuführende Suite, mehrfach angebbar. Standard: alle Suites.",
+    )
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--output", metavar="FILE", help="Speichert die Ergebnisse als JSON."
+    )
+    args = parser.parse_args()
+
+    report = run_suites(args.suite, args.quick, args.repeat)
+    for entry in report["results"]:
+        print(
+            "{suite}/{name} {params}: {median:.6f} s/{unit} ({per_second:.1f}/s)".format(
+                median=entry["seconds"]["median"], **entry
+            )
+        )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
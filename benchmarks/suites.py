@@ -0,0 +1,245 @@
+"""
+Reproduzierbare Benchmark-Suites. Jede Suite liefert eine Liste von Ergebnissen, jeweils ein Dict mit:
+  - "suite" und "name": Suite und gemessene Operation,
+  - "params": die Parameter der Messung (z.B. die Anzahl beobachteter Fahrzeuge),
+  - "unit": die Einheit, auf die sich die Zeiten beziehen (z.B. "frame", "run", "step"),
+  - "seconds": Median, Minimum und Maximum der Zeit je Einheit über alle Wiederholungen,
+  - "per_second": die Durchsatzrate (Einheiten je Sekunde) zum Median.
+Alle Zufallsdaten werden mit festen Seeds erzeugt.
+
+  - wrapper: jede öffentliche Methode des ObservationWrappers bei verschiedenen Anzahlen beobachteter Fahrzeuge,
+  - checker: BProgram-Läufe jeder Demo-Simulation mit den Constraints bei skaliertem MAX_SIM_STEPS,
+  - env: env.step() von highway-v0 mit der Config aus main.set_config, ohne Renderer.
+"""
+
+import contextlib
+import logging
+
+import numpy as np
+
+from src.main import create_env, set_config
+from src.observation_wrapper import ObservationWrapper
+
+from .common import add_checker_to_path, measure
+
+CONTROLLED_VEHICLES = 7
+LANE_CENTERS = (0.0, 4.0, 8.0, 12.0)
+SEED = 0
+
+# je öffentlicher Methode eine Funktion, die die Methode für alle kontrollierten Fahrzeuge bzw. einmal je Frame
+# aufruft (test_benchmarks prüft, dass keine Methode fehlt)
+WRAPPER_QUERIES = {
+    "is_right_lane_clear": lambda wrapper: [
+        wrapper.is_right_lane_clear(vehicle, 25, 25)
+        for vehicle in range(CONTROLLED_VEHICLES)
+    ],
+    "is_left_lane_clear": lambda wrapper: [
+        wrapper.is_left_lane_clear(vehicle, 25, 25)
+        for vehicle in range(CONTROLLED_VEHICLES)
+    ],
+    "get_distance_to_leading_vehicle": lambda wrapper: [
+        wrapper.get_distance_to_leading_vehicle(vehicle)
+        for vehicle in range(CONTROLLED_VEHICLES)
+    ],
+    "get_distance_to_following_vehicle": lambda wrapper: [
+        wrapper.get_distance_to_following_vehicle(vehicle)
+        for vehicle in range(CONTROLLED_VEHICLES)
+    ],
+    "get_velocity": lambda wrapper: [
+        wrapper.get_velocity(vehicle) for vehicle in range(CONTROLLED_VEHICLES)
+    ],
+    "is_left_lane_safe": lambda wrapper: [
+        wrapper.is_left_lane_safe(vehicle, 2) for vehicle in range(CONTROLLED_VEHICLES)
+    ],
+    "is_right_lane_safe": lambda wrapper: [
+        wrapper.is_right_lane_safe(vehicle, 2) for vehicle in range(CONTROLLED_VEHICLES)
+    ],
+    "is_current_lane_safe": lambda wrapper: [
+        wrapper.is_current_lane_safe(vehicle, 2)
+        for vehicle in range(CONTROLLED_VEHICLES)
+    ],
+    "is_in_same_lane": lambda wrapper: [
+        wrapper.is_in_same_lane(vehicle, (vehicle + 1) % CONTROLLED_VEHICLES)
+        for vehicle in range(CONTROLLED_VEHICLES)
+    ],
+    "is_in_lane": lambda wrapper: [
+        wrapper.is_in_lane(vehicle, 1) for vehicle in range(CONTROLLED_VEHICLES)
+    ],
+    "get_lane_ids": lambda wrapper: wrapper.get_lane_ids(),
+    "are_left_lanes_clear": lambda wrapper: wrapper.are_left_lanes_clear(25, 25),
+    "are_right_lanes_clear": lambda wrapper: wrapper.are_right_lanes_clear(25, 25),
+    "get_distances_to_leading_vehicles": lambda wrapper: wrapper.get_distances_to_leading_vehicles(),
+    "get_distances_to_following_vehicles": lambda wrapper: wrapper.get_distances_to_following_vehicles(),
+    "are_lanes_safe": lambda wrapper: wrapper.are_lanes_safe(2),
+    "get_pairwise_relations": lambda wrapper: wrapper.get_pairwise_relations(),
+    "get_nearest_vehicles": lambda wrapper: wrapper.get_nearest_vehicles(3),
+    "get_velocities": lambda wrapper: wrapper.get_velocities(),
+    "get_positions": lambda wrapper: wrapper.get_positions(),
+}
+
+
+def make_observation(rng, vehicles_count: int):
+    """
+    :return: Zufällige MultiAgentObservation mit vehicles_count Zeilen je kontrolliertem Fahrzeug. Die erste Zeile
+    (das Fahrzeug selbst) ist absolut und liegt auf einer Spurmitte, die weiteren Zeilen sind relativ dazu.
+    """
+    observation = []
+    for _ in range(CONTROLLED_VEHICLES):
+        ego_y = rng.choice(LANE_CENTERS)
+        rows = np.column_stack(
+            [
+                rng.uniform(-200, 200, vehicles_count),
+                rng.choice(LANE_CENTERS, vehicles_count) - ego_y,
+                rng.uniform(-10, 10, vehicles_count),
+                np.zeros(vehicles_count),
+            ]
+        )
+        rows[0] = [rng.uniform(0, 500), ego_y, rng.uniform(15, 30), 0]
+        observation.append(rows.astype(np.float32))
+    return tuple(observation)
+
+
+def result(suite: str, name: str, params: dict, unit: str, seconds: dict) -> dict:
+    return {
+        "suite": suite,
+        "name": name,
+        "params": params,
+        "unit": unit,
+        "seconds": seconds,
+        "per_second": 1 / seconds["median"] if seconds["median"] > 0 else None,
+    }
+
+
+def wrapper_suite(quick: bool = False, repeat: int = 5) -> list:
+    """
+    Misst je Frame das Setzen einer neuen Observation und die Abfrage der jeweiligen Methode. Zum Vergleich wird
+    das Setzen der Observation allein als "set_observation" gemessen.
+    """
+    vehicle_counts = (5, 20) if quick else (5, 10, 50, 100)
+    frames = 20 if quick else 200
+    env = create_env(set_config(), render_mode=None)
+    queries = {"set_observation": lambda wrapper: None, **WRAPPER_QUERIES}
+    results = []
+    try:
+        for vehicles in vehicle_counts:
+            rng = np.random.default_rng(SEED)
+            observations = [make_observation(rng, vehicles) for _ in range(frames)]
+            wrapper = ObservationWrapper(observations[0], env)
+            for name, query in queries.items():
+
+                def run():
+                    for observation in observations:
+                        wrapper.set_observation(observation)
+                        query(wrapper)
+
+                seconds = measure(run, repeat)
+                results.append(
+                    result(
+                        "wrapper",
+                        name,
+                        {"vehicles": vehicles, "frames": frames},
+                        "frame",
+                        {key: value / frames for key, value in seconds.items()},
+                    )
+                )
+    finally:
+        env.close()
+    return results
+
+
+@contextlib.contextmanager
+def scaled_sim_steps(factor: int):
+    """
+    Setzt MAX_SIM_STEPS in den Demo-Simulationen und den Constraints vorübergehend auf das factor-fache, sodass
+    die Demo-Simulationen entsprechend länger laufen und weiterhin dieselben Verdicts liefern.
+    """
+    add_checker_to_path()
+    import demo_scenarios
+    import overtake_abstract_checker
+
+    modules = (demo_scenarios, overtake_abstract_checker)
+    original = [module.MAX_SIM_STEPS for module in modules]
+    try:
+        for module, value in zip(modules, original):
+            module.MAX_SIM_STEPS = value * factor
+        yield
+    finally:
+        for module, value in zip(modules, original):
+            module.MAX_SIM_STEPS = value
+
+
+def checker_suite(quick: bool = False, repeat: int = 5) -> list:
+    """
+    Misst je Demo-Simulation einen vollständigen BProgram-Lauf mit den Constraints, wie in campaign.run_scenario
+    mit der SubscriptionEventSelectionStrategy und einem VerdictSink statt Logging. Jede Simulation wird mit
+    einzelnen Events und mit einem STEP_FRAME je Schritt gemessen.
+    """
+    add_checker_to_path()
+    from bppy import BProgram
+    from overtake_abstract_checker import (
+        SubscriptionEventSelectionStrategy,
+        VerdictSink,
+        get_checker_threads,
+    )
+    from replay import DEMO_SIMULATIONS
+
+    factors = (1, 10) if quick else (1, 10, 100)
+    results = []
+    # bppy loggt jedes ausgewählte Event
+    logging.disable(logging.INFO)
+    try:
+        for factor in factors:
+            with scaled_sim_steps(factor):
+                for name, simulation in DEMO_SIMULATIONS.items():
+                    for frames in (False, True):
+
+                        def run():
+                            BProgram(
+                                bthreads=[simulation(frames)]
+                                + get_checker_threads(VerdictSink(), log=False),
+                                event_selection_strategy=SubscriptionEventSelectionStrategy(),
+                            ).run()
+
+                        results.append(
+                            result(
+                                "checker",
+                                name,
+                                {"max_sim_steps_factor": factor, "frames": frames},
+                                "run",
+                                measure(run, repeat),
+                            )
+                        )
+    finally:
+        logging.disable(logging.NOTSET)
+    return results
+
+
+def env_suite(quick: bool = False, repeat: int = 5) -> list:
+    """
+    Misst env.step() mit der Aktion aus main.py. Jede Wiederholung beginnt mit env.reset() mit demselben Seed.
+    """
+    steps = 5 if quick else 50
+    env = create_env(set_config(), render_mode=None)
+    action = (1, 1, 2, 4, 0, 4, 4)
+
+    def run():
+        for _ in range(steps):
+            env.step(action)
+
+    times = []
+    try:
+        for _ in range(repeat):
+            env.reset(seed=SEED)
+            times.append(measure(run, 1)["median"] / steps)
+    finally:
+        env.close()
+    times.sort()
+    seconds = {"median": float(np.median(times)), "min": times[0], "max": times[-1]}
+    return [result("env", "highway-v0", {"steps": steps}, "step", seconds)]
+
+
+SUITES = {
+    "wrapper": wrapper_suite,
+    "checker": checker_suite,
+    "env": env_suite,
+}
@@ -0,0 +1,163 @@
+"""
+Snapshots des vollständigen Zustands eines highway-env, um viele Fortsetzungen von einem gemeinsamen Präfix aus zu
+simulieren, ohne das Präfix jedes Mal ab reset() neu zu berechnen.
+
+Ein EnvSnapshot enthält das gesamte Env samt Wrappern (Straße, Fahrzeuge, Zufallsgenerator, Zeit- und
+Schrittzähler) als Bytes. Das Env wird ohne Renderer kopiert (siehe AbstractEnv.__deepcopy__). Jedes restore()
+liefert ein neues, unabhängiges Env in genau diesem Zustand. explore() führt mehrere Fortsetzungen von einem
+Snapshot aus, auf Wunsch parallel in einem ProcessPoolExecutor. Jeder Prozess erhält den Snapshot dabei nur einmal.
+
+Aufruf aus dem Repository-Root:
+    python -m src.env_snapshot --prefix 10 --length 5 --workers 4
+"""
+
+import argparse
+import copy
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Sequence
+
+import gymnasium as gym
+
+from .main import create_env, set_config
+
+DEFAULT_ACTION = (1, 1, 2, 4, 0, 4, 4)
+
+
+class EnvSnapshot:
+    """
+    Zustand eines Envs zu einem Zeitpunkt.
+
+    :attribute data: Das serialisierte Env.
+    :attribute steps: Die Anzahl der env.step()-Aufrufe seit reset() zum Zeitpunkt des Snapshots.
+    """
+
+    def __init__(self, env: gym.Env):
+        self.data = pickle.dumps(copy.deepcopy(env))
+        unwrapped = env.unwrapped
+        self.steps = round(unwrapped.time * unwrapped.config["policy_frequency"])
+
+    def restore(self) -> gym.Env:
+        """
+        :return: Ein neues Env im Zustand des Snapshots. Weitere Aufrufe liefern jeweils eigene Kopien.
+        """
+        return pickle.loads(self.data)
+
+
+def run_actions(env: gym.Env, actions: Sequence) -> Dict[str, Any]:
+    """
+    Führt die Aktionen nacheinander aus, bis sie abgearbeitet sind oder die Episode endet.
+    :param actions: Liste von Aktionen, jeweils eine Aktion je kontrolliertem Fahrzeug.
+    :return: Dict mit den ausgeführten "actions", den "observations" und "rewards" je Schritt sowie "terminated"
+    und "truncated" des letzten Schritts.
+    """
+    result = {
+        "actions": [],
+        "observations": [],
+        "rewards": [],
+        "terminated": False,
+        "truncated": False,
+    }
+    for action in actions:
+        obs, reward, terminated, truncated, info = env.step(action)
+        result["actions"].append(action)
+        result["observations"].append(obs)
+        result["rewards"].append(reward)
+        result["terminated"] = terminated
+        result["truncated"] = truncated
+        if terminated or truncated:
+            break
+    return result
+
+
+def explore(
+    snapshot: EnvSnapshot, continuations: List[Sequence], workers: int = None
+) -> List[Dict[str, Any]]:
+    """
+    Führt jede Fortsetzung mit run_actions in einem eigenen, aus dem Snapshot wiederhergestellten Env aus.
+    :param continuations: Liste von Aktionsfolgen.
+    :param workers: Die Anzahl der Prozesse, None für die Anzahl der CPU-Kerne, 0 für die Ausführung in diesem
+    Prozess.
+    :return: Die Ergebnisse von run_actions in der Reihenfolge der Fortsetzungen.
+    """
+    if workers == 0:
+        return [_run_continuation(actions, snapshot) for actions in continuations]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(snapshot,)
+    ) as executor:
+        return list(executor.map(_run_continuation, continuations))
+
+
+_worker_snapshot = None
+
+
+def _init_worker(snapshot: EnvSnapshot):
+    global _worker_snapshot
+    _worker_snapshot = snapshot
+
+
+def _run_continuation(actions: Sequence, snapshot: EnvSnapshot = None):
+    env = (snapshot or _worker_snapshot).restore()
+    try:
+        return run_actions(env, actions)
+    finally:
+        env.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Simuliert Varianten der Aktion des ersten Fahrzeugs nach einem gemeinsamen Präfix."
+    )
+    parser.add_argument("--prefix", type=int, default=10, help="Schritte des Präfix.")
+    parser.add_argument(
+        "--length", type=int, default=5, help="Schritte je Fortsetzung."
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = set_config()
+    # je Variante hält das erste Fahrzeug eine der fünf DiscreteMetaActions
+    continuations = [
+        [(action,) + DEFAULT_ACTION[1:]] * args.length for action in range(5)
+    ]
+
+    start = time.perf_counter()
+    env = create_env(config, render_mode=None)
+    for actions in continuations:
+        env.reset(seed=args.seed)
+        run_actions(env, [DEFAULT_ACTION] * args.prefix + actions)
+    from_reset = time.perf_counter() - start
+
+    start = time.perf_counter()
+    env.reset(seed=args.seed)
+    run_actions(env, [DEFAULT_ACTION] * args.prefix)
+    snapshot = EnvSnapshot(env)
+    results = explore(snapshot, continuations, args.workers)
+    from_snapshot = time.perf_counter() - start
+    env.close()
+
+    for variant, result in enumerate(results):
+        print(
+            "Variante {}: {} Schritte, Reward {:.2f}, terminated {}".format(
+                variant,
+                len(result["actions"]),
+                sum(result["rewards"]),
+                result["terminated"],
+            )
+        )
+    print(
+        "{} Varianten: ab reset() {:.2f} s, ab Snapshot ({} kB, {} Prozesse) {:.2f} s".format(
+            len(continuations),
+            from_reset,
+            len(snapshot.data) // 1024,
+            args.workers,
+            from_snapshot,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Brücke zwischen den Observations des highway-env und den Events der Constraints des abstrakten Überholszenarios.
+
+Die EventBridge leitet aus aufeinanderfolgenden Observations (über den ObservationWrapper) je Simulationsschritt die
+Events ab, die overtake_abstract_checker erwartet:
+  - STEP in jedem Schritt,
+  - POSITION_UPDATE mit dem Abstand des Agenten zum VUT in x-Richtung, begrenzt auf
+    [START_RELATIVE_POS, END_RELATIVE_POS] (die Constraints vergleichen Start- und Endposition exakt: Ein Agent, der
+    mindestens 50m hinter dem VUT ist, steht an der Startposition, einer, der mindestens 50m vor ihm ist, an der
+    Endposition),
+  - LANE_CHANGE, wenn sich die Spur des Agenten geändert hat,
+  - SPEED_UP, wenn der Agent zu beschleunigen beginnt (Zunahme der Geschwindigkeit um mindestens
+    acceleration_threshold je Schritt, im vorherigen Schritt nicht),
+  - SPEED_UPDATE mit der Geschwindigkeit des Agenten.
+
+Mit position_tolerance bzw. speed_tolerance werden POSITION_UPDATE und SPEED_UPDATE nur gesendet, wenn sich der Wert
+seit dem zuletzt gesendeten um mindestens die Toleranz geändert hat. Unabhängig davon wird immer gesendet, wenn sich
+eine Bedingung der Constraints für den Wert ändert (Start-/Endposition erreicht, Geschwindigkeit innerhalb oder
+außerhalb der Grenzen), und das erste POSITION_UPDATE. Die Constraints behandeln fehlende Updates so, als gelte der
+zuletzt gesendete Wert weiter, die Verdicts bleiben damit dieselben wie mit einem Update je Schritt.
+
+Mit frames fasst die EventBridge die Events eines Schritts zu einem STEP_FRAME zusammen (siehe
+demo_scenarios.make_step_frame), die Constraints benötigen dann nur eine Event-Auswahl je Schritt.
+
+Beispiel:
+    bridge = EventBridge(env, agent=0, vut=1, speed_tolerance=0.5)
+    checker = OnlineChecker()
+    obs, _ = env.reset()
+    for event in bridge.reset(obs):
+        checker.send(event)
+    while checker.step_allowed():
+        obs, reward, terminated, truncated, info = env.step(action)
+        for event in bridge.step(obs):
+            checker.send(event)
+        ...
+    verdicts = checker.end()
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from bppy import BEvent
+
+from .observation_wrapper import ObservationWrapper
+
+# die Module der Constraint-Prüfung importieren sich gegenseitig ohne Paketnamen
+CHECKER_DIR = str(Path(__file__).resolve().parent / "overtake_abstract_checker")
+if CHECKER_DIR not in sys.path:
+    sys.path.insert(0, CHECKER_DIR)
+
+from demo_scenarios import (  # noqa: E402
+    make_lane_change,
+    make_position_update,
+    make_speed_up,
+    make_speed_update,
+    make_step,
+    make_step_frame,
+)
+from overtake_constraints import (  # noqa: E402
+    END_RELATIVE_POS,
+    MAX_SPEED,
+    MIN_SPEED,
+    START_RELATIVE_POS,
+)
+
+# Die minimale Zunahme der Geschwindigkeit in m/s je Schritt, die als Beschleunigung (SPEED_UP) gilt
+ACCELERATION_THRESHOLD = 0.5
+
+
+def position_condition(distance: float) -> int:
+    """
+    :return: -1 an der Startposition, 1 an der Endposition, sonst 0.
+    """
+    if distance == START_RELATIVE_POS:
+        return -1
+    if distance == END_RELATIVE_POS:
+        return 1
+    return 0
+
+
+def speed_condition(speed: float) -> int:
+    """
+    :return: -1 unterhalb, 1 oberhalb der Geschwindigkeitsgrenzen, sonst 0.
+    """
+    if speed < MIN_SPEED:
+        return -1
+    if speed > MAX_SPEED:
+        return 1
+    return 0
+
+
+class EventBridge:
+    """
+    Leitet je Schritt die Events für die Constraints aus der Observation ab.
+
+    :attribute wrapper: Der ObservationWrapper mit der aktuellen Observation.
+    :attribute agent: Die Fahrzeug-ID (Position in der MultiAgentObservation) des überholenden Agenten.
+    :attribute vut: Die Fahrzeug-ID des VUT.
+    :attribute frames: Ob je Schritt ein STEP_FRAME statt der einzelnen Events geliefert wird.
+    :attribute step_count: Die Anzahl der bisherigen Schritte.
+    :attribute sent: Dict mit der Anzahl der gesendeten Events je Event-Name. Mit frames werden die im STEP_FRAME
+    enthaltenen Updates und Aktionen unter ihrem eigenen Namen gezählt.
+    :attribute suppressed: Dict mit der Anzahl der wegen der Toleranz ausgelassenen Events je Event-Name.
+    """
+
+    def __init__(
+        self,
+        env,
+        agent: int = 0,
+        vut: int = 1,
+        position_tolerance: float = 0.0,
+        speed_tolerance: float = 0.0,
+        acceleration_threshold: float = ACCELERATION_THRESHOLD,
+        frames: bool = False,
+    ):
+        """
+        :param env: Das Environment, wird zur Bestimmung der Spuren benötigt.
+        :param position_tolerance: Die minimale Änderung des Abstands zum VUT in Metern für ein neues POSITION_UPDATE.
+        :param speed_tolerance: Die minimale Änderung der Geschwindigkeit in m/s für ein neues SPEED_UPDATE.
+        :param acceleration_threshold: Die minimale Zunahme der Geschwindigkeit in m/s je Schritt, die als
+        Beschleunigung gilt.
+        :param frames: Ob je Schritt ein STEP_FRAME statt der einzelnen Events geliefert wird.
+        """
+        self.wrapper = ObservationWrapper(None, env)
+        self.agent = agent
+        self.vut = vut
+        self.position_tolerance = position_tolerance
+        self.speed_tolerance = speed_tolerance
+        self.acceleration_threshold = acceleration_threshold
+        self.frames = frames
+        self.step_count = 0
+        self.sent: Dict[str, int] = {}
+        self.suppressed: Dict[str, int] = {}
+        self.__lane = None
+        self.__speed = None
+        self.__accelerating = False
+        self.__sent_distance = None
+        self.__sent_speed = None
+
+    def reset(self, observation) -> List[BEvent]:
+        """
+        Beginnt einen neuen Lauf mit der Observation aus env.reset().
+        :return: Das initiale POSITION_UPDATE.
+        """
+        self.step_count = 0
+        self.__sent_distance = None
+        self.__sent_speed = None
+        self.__accelerating = False
+        self.wrapper.set_observation(observation)
+        self.__lane = self.__get_lane()
+        self.__speed = self.__get_speed()
+        return [make_position_update(self.__position_update())]
+
+    def step(self, observation) -> List[BEvent]:
+        """
+        Übernimmt die Observation nach env.step().
+        :return: Die Events des Schritts in der Reihenfolge STEP, POSITION_UPDATE, LANE_CHANGE, SPEED_UP,
+        SPEED_UPDATE. Nicht benötigte Events entfallen. Mit frames ein einzelnes STEP_FRAME.
+        """
+        self.step_count += 1
+        self.wrapper.set_observation(observation)
+        distance = self.__position_update()
+
+        lane = self.__get_lane()
+        lane_change = lane != self.__lane
+        self.__lane = lane
+        if lane_change:
+            self.__count("LANE_CHANGE")
+
+        speed = self.__get_speed()
+        accelerating = speed - self.__speed >= self.acceleration_threshold
+        speed_up = accelerating and not self.__accelerating
+        self.__accelerating = accelerating
+        self.__speed = speed
+        if speed_up:
+            self.__count("SPEED_UP")
+
+        speed_update = None
+        if self.__should_send(
+            self.__sent_speed, speed, self.speed_tolerance, speed_condition
+        ):
+            self.__sent_speed = speed
+            speed_update = speed
+            self.__count("SPEED_UPDATE")
+        else:
+            self.__suppress("SPEED_UPDATE")
+
+        if self.frames:
+            self.__count("STEP_FRAME")
+            return [make_step_frame(distance, speed_update, lane_change, speed_up)]
+        self.__count("STEP")
+        events = [make_step()]
+        if distance is not None:
+            events.append(make_position_update(distance))
+        if lane_change:
+            events.append(make_lane_change(self.step_count))
+        if speed_up:
+            events.append(make_speed_up(self.step_count))
+        if speed_update is not None:
+            events.append(make_speed_update(speed_update))
+        return events
+
+    def __position_update(self):
+        """
+        :return: Der Abstand zum VUT, falls ein POSITION_UPDATE gesendet werden soll, sonst None.
+        """
+        positions = self.wrapper.get_positions()
+        distance = float(positions[self.agent, 0] - positions[self.vut, 0])
+        distance = min(max(distance, START_RELATIVE_POS), END_RELATIVE_POS)
+        if not self.__should_send(
+            self.__sent_distance,
+            distance,
+            self.position_tolerance,
+            position_condition,
+        ):
+            self.__suppress("POSITION_UPDATE")
+            return None
+        self.__sent_distance = distance
+        self.__count("POSITION_UPDATE")
+        return distance
+
+    def __get_lane(self) -> int:
+        return int(self.wrapper.get_lane_ids()[self.agent])
+
+    def __get_speed(self) -> float:
+        return float(self.wrapper.get_velocities()[self.agent])
+
+    def __count(self, name: str):
+        self.sent[name] = self.sent.get(name, 0) + 1
+
+    def __suppress(self, name: str):
+        self.suppressed[name] = self.suppressed.get(name, 0) + 1
+
+    @staticmethod
+    def __should_send(sent, value, tolerance, condition) -> bool:
+        return (
+            sent is None
+            or abs(value - sent) >= tolerance
+            or condition(value) != condition(sent)
+        )
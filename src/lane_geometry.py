@@ -0,0 +1,71 @@
+import numpy as np
+from highway_env.road.lane import StraightLane
+
+
+class LaneGeometry:
+    """
+    Tabelle der Spurmitten und Spurbreiten eines RoadNetworks, mit der Lane-IDs für beliebig viele y-Koordinaten
+    über ein einziges searchsorted ermittelt werden können.
+
+    :attribute road: Die Road, aus deren RoadNetwork die Tabelle aufgebaut wurde. HighwayEnv erzeugt bei jedem
+    env.reset() eine neue Road, daher kann über diese Referenz erkannt werden, ob die Tabelle noch aktuell ist.
+    :attribute lane_count: Anzahl aller Lanes im RoadNetwork (entspricht len(network.lanes_list())).
+    :attribute centers: Die y-Koordinaten der Spurmitten, aufsteigend sortiert.
+    :attribute widths: Die Spurbreiten in der Reihenfolge von centers.
+    :attribute lane_ids: Die Lane-ID (dritter Eintrag des Lane-Index) in der Reihenfolge von centers.
+
+    Note: Die Tabelle kann nur für Netzwerke aus geraden, parallel zur x-Achse verlaufenden Spuren aufgebaut werden,
+    wie sie in HighwayEnv verwendet werden. Für alle anderen Netzwerke liefert from_road None.
+    """
+
+    def __init__(self, road, lane_count: int, centers, widths, lane_ids):
+        self.road = road
+        self.lane_count = lane_count
+        self.centers = np.asarray(centers, dtype=float)
+        self.widths = np.asarray(widths, dtype=float)
+        self.lane_ids = np.asarray(lane_ids, dtype=int)
+        # Grenze zwischen zwei benachbarten Spuren ist die Mitte zwischen oberem Rand der einen und unterem Rand
+        # der anderen Spur
+        upper_edges = self.centers[:-1] + self.widths[:-1] / 2
+        lower_edges = self.centers[1:] - self.widths[1:] / 2
+        self.boundaries = (upper_edges + lower_edges) / 2
+
+    @classmethod
+    def from_road(cls, road):
+        """
+        Baut die Tabelle aus dem RoadNetwork der übergebenen Road auf.
+        :param road: Die Road des Environments (env.unwrapped.road).
+        :return: Die LaneGeometry oder None, wenn das Netzwerk nicht nur aus parallelen, geraden Spuren besteht.
+        """
+        lanes = {}
+        for _from, to_dict in road.network.graph.items():
+            for _to, lanes_of_edge in to_dict.items():
+                for _id, lane in enumerate(lanes_of_edge):
+                    if (
+                        type(lane) is not StraightLane
+                        or abs(np.sin(lane.heading)) > 1e-6
+                    ):
+                        return None
+                    center = float(lane.position(0, 0)[1])
+                    # gleiche Spur auf mehreren aufeinanderfolgenden Kanten nur einmal aufnehmen
+                    if lanes.setdefault(center, (_id, lane.width_at(0)))[0] != _id:
+                        return None
+        if not lanes:
+            return None
+        centers = sorted(lanes)
+        return cls(
+            road,
+            len(road.network.lanes_list()),
+            centers,
+            [lanes[center][1] for center in centers],
+            [lanes[center][0] for center in centers],
+        )
+
+    def get_lane_ids(self, y) -> np.ndarray:
+        """
+        Ermittelt die Lane-IDs für die übergebenen y-Koordinaten.
+        :param y: Skalar oder Array von absoluten y-Koordinaten.
+        :return: Array der Lane-IDs in der Form von y. Liegt eine Koordinate genau auf einer Spurgrenze, wird wie bei
+        RoadNetwork.get_closest_lane_index die Spur mit der kleineren y-Koordinate gewählt.
+        """
+        return self.lane_ids[np.searchsorted(self.boundaries, y, side="left")]
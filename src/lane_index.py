@@ -0,0 +1,60 @@
+from bisect import bisect_left, bisect_right
+
+
+class LaneIndex:
+    """
+    Räumlicher Index der von einem Fahrzeug beobachteten anderen Fahrzeuge. Die Fahrzeuge werden nach ihrer Spur
+    relativ zum betrachteten Fahrzeug (links, gleiche Spur, rechts) in Buckets eingeteilt und innerhalb eines Buckets
+    nach x sortiert. Abstands- und Lückenabfragen werden dadurch zu binären Suchen.
+
+    :attribute buckets: Tupel der nach x sortierten x-Werte je relativer Spur, indiziert über LEFT, SAME und RIGHT.
+    Die Buckets sind Listen, da bisect auf den meist kleinen Buckets deutlich schneller als np.searchsorted ist.
+
+    Note: Die Einordnung in die Spuren entspricht der des ObservationWrappers. Da dort "gleiche Spur" über die auf
+    eine Stelle gerundete y-Koordinate bestimmt wird, kann ein Fahrzeug zugleich in SAME und LEFT bzw. RIGHT liegen.
+    """
+
+    LEFT = 0
+    SAME = 1
+    RIGHT = 2
+
+    def __init__(self, sorted_x, sorted_relative_lanes):
+        """
+        :param sorted_x: Die x-Werte der anderen Fahrzeuge, aufsteigend sortiert.
+        :param sorted_relative_lanes: Tupel der Masken (links, gleiche Spur, rechts) in der Reihenfolge von sorted_x.
+        """
+        self.buckets = tuple(sorted_x[mask].tolist() for mask in sorted_relative_lanes)
+
+    def get_distance_to_leading_vehicle(self, lane) -> float:
+        """
+        :param lane: Die relative Spur (LEFT, SAME oder RIGHT).
+        :return: Die Distanz zum nächsten Fahrzeug mit x > 0 auf der Spur. Gibt es keines, wird 0 zurückgegeben.
+        """
+        xs = self.buckets[lane]
+        i = bisect_right(xs, 0)
+        return xs[i] if i < len(xs) else 0
+
+    def get_distance_to_following_vehicle(self, lane) -> float:
+        """
+        :param lane: Die relative Spur (LEFT, SAME oder RIGHT).
+        :return: Die Distanz (als positiver Wert) zum nächsten Fahrzeug mit x < 0 auf der Spur. Gibt es keines,
+        wird 0 zurückgegeben.
+        """
+        xs = self.buckets[lane]
+        i = bisect_left(xs, 0)
+        return -xs[i - 1] if i > 0 else 0
+
+    def is_gap_free(
+        self, lane, minimal_distance_to_front: float, minimal_distance_to_back: float
+    ) -> bool:
+        """
+        :param lane: Die relative Spur (LEFT, SAME oder RIGHT).
+        :param minimal_distance_to_front: Der minimale Abstand (als positiver Wert) nach vorne.
+        :param minimal_distance_to_back: Der minimale Abstand (als positiver Wert) nach hinten.
+        :return: True, wenn auf der Spur kein Fahrzeug im Bereich [-minimal_distance_to_back,
+        minimal_distance_to_front] liegt.
+        """
+        xs = self.buckets[lane]
+        first = bisect_left(xs, -minimal_distance_to_back)
+        last = bisect_right(xs, minimal_distance_to_front)
+        return first == last
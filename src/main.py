@@ -1,14 +1,31 @@
+import argparse
+import sys
+import time
+from pathlib import Path
 from typing import Any, Dict, List
 
 import gymnasium as gym
 import highway_env as highway
+import numpy as np
 from bppy import *
 
+if __package__:
+    from .step_profiler import StepProfiler
+    from .trajectory_recorder import TrajectoryRecorder
+else:
+    # direkter Aufruf als Skript (cd src && python main.py): das Repository-Root wird in sys.path aufgenommen
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from src.step_profiler import StepProfiler
+    from src.trajectory_recorder import TrajectoryRecorder
+
 # BPpy Events
 
 
-def create_env(config: Dict[str, Any]) -> gym.Env:
-    env = gym.make("highway-v0", render_mode="rgb_array", config=config)
+def create_env(config: Dict[str, Any], render_mode: str = "rgb_array") -> gym.Env:
+    """
+    :param render_mode: Der Render-Modus, None für ein Env ohne Renderer.
+    """
+    env = gym.make("highway-v0", render_mode=render_mode, config=config)
     env.reset()
     return env
 
@@ -55,22 +72,112 @@ def set_config():
     return config
 
 
-def main():
+def timing_summary(step_times: List[float], seconds: float) -> Dict[str, float]:
+    """
+    :param step_times: Die Dauer der einzelnen env.step()-Aufrufe in Sekunden.
+    :param seconds: Die Dauer der gesamten Schleife in Sekunden.
+    :return: Dict mit "steps", "steps_per_second" (bezogen auf die gesamte Schleife), sowie "mean_ms" und "p99_ms"
+    der Dauer von env.step().
+    """
+    step_times = np.asarray(step_times) * 1000
+    return {
+        "steps": len(step_times),
+        "steps_per_second": len(step_times) / seconds if seconds > 0 else 0.0,
+        "mean_ms": float(step_times.mean()) if len(step_times) else 0.0,
+        "p99_ms": float(np.percentile(step_times, 99)) if len(step_times) else 0.0,
+    }
+
+
+def main(
+    record_to: str = None,
+    headless: bool = False,
+    print_every: int = 1,
+    profile_to: str = None,
+):
+    """
+    :param record_to: Verzeichnis, in das der Lauf aufgezeichnet wird.
+    :param headless: Erzeugt das Env ohne Renderer und ruft env.render() nicht auf.
+    :param print_every: Gibt die Observation jedes print_every-ten Schritts aus, 0 für keine Ausgabe.
+    :param profile_to: Datei, in die die Zeitmessung der Phasen als Chrome-Trace gespeichert wird.
+    """
+    steps = 100
     config = set_config()
-    env = create_env(config)
+    env = create_env(config, render_mode=None if headless else "rgb_array")
+    profiler = StepProfiler(enabled=profile_to is not None)
+    profiler.instrument_env(env)
     obs, _ = env.reset()
+    recorder = None
+    if record_to:
+        recorder = TrajectoryRecorder(
+            record_to,
+            steps,
+            config,
+            observation_rows=len(env.unwrapped.road.vehicles),
+        )
     # bp = BProgram(bthreads=[],
     #               event_selection_strategy=SimpleEventSelectionStrategy(), listener=PrintBProgramRunnerListener())
     # bp.run()
 
-    for _ in range(100):
+    step_times = []
+    start = time.perf_counter()
+    for step in range(steps):
         # bp.run()
-        obs = env.step((1, 1, 2, 4, 0, 4, 4))
-        print(obs)
-        env.render()
+        action = (1, 1, 2, 4, 0, 4, 4)
+        step_start = time.perf_counter()
+        obs, reward, terminated, truncated, info = env.step(action)
+        step_times.append(time.perf_counter() - step_start)
+        if recorder:
+            with profiler.span("record"):
+                recorder.record(obs, action, reward, terminated, truncated, info)
+        if print_every and step % print_every == 0:
+            with profiler.span("print"):
+                print(obs)
+        if not headless:
+            with profiler.span("render"):
+                env.render()
+    seconds = time.perf_counter() - start
 
+    if recorder:
+        recorder.close()
     env.close()
+    print(
+        "{steps} Steps: {steps_per_second:.1f} Steps/s, env.step() im Mittel {mean_ms:.1f} ms, "
+        "p99 {p99_ms:.1f} ms".format(**timing_summary(step_times, seconds))
+    )
+    if profile_to:
+        profiler.write_chrome_trace(profile_to)
+        print(profiler.format_summary())
 
 
 if __name__ == "__main__":
-    main()
+    # Aufruf aus dem Repository-Root: python -m src.main
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Zeichnet den Lauf memory-mapped in das Verzeichnis DIR auf.",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Führt den Lauf ohne Renderer aus.",
+    )
+    parser.add_argument(
+        "--print-every",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Gibt nur jede N-te Observation aus, 0 für keine Ausgabe.",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Misst die Phasen der Schritte und speichert sie als Chrome-Trace in FILE.",
+    )
+    args = parser.parse_args()
+    main(
+        record_to=args.record,
+        headless=args.headless,
+        print_every=args.print_every,
+        profile_to=args.profile,
+    )
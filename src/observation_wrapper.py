@@ -1,37 +1,170 @@
 import warnings
+from typing import Dict, NamedTuple
 
 import numpy as np
 from gymnasium import Env
+from highway_env.envs.common.observation import KinematicObservation
+from highway_env.road.lane import AbstractLane
+
+from .lane_geometry import LaneGeometry
+from .lane_index import LaneIndex
+from .occupancy_grid import OccupancyGrid, get_observation_config
+from .time_to_collision import TimeToCollisionGrid, predict_safe_lanes
 
 
 class VehicleNotFoundError(Exception):
     pass
 
 
+class InvalidObservationConfigError(ValueError):
+    pass
+
+
+# Die Features einer Kinematics-Observation, die der ObservationWrapper auswertet
+KINEMATICS_FEATURES = ("x", "y", "vx", "vy")
+
+
+def stack_observation(observation, rows: int = None) -> np.ndarray:
+    """
+    Stapelt das Tupel einer MultiAgentObservation zu einem Array der Form (Fahrzeuge x beobachtete Fahrzeuge x
+    Features).
+
+    Kinematics liefert bei "vehicles_count": 1 alle Fahrzeuge in Wahrnehmungsweite, sodass die Einträge des Tupels
+    unterschiedlich viele Zeilen haben können. Fehlende Zeilen werden mit NaN aufgefüllt. Da NaN keinen Vergleich
+    erfüllt, werden diese Zeilen von allen Abfragen wie nicht vorhandene Fahrzeuge behandelt.
+    :param observation: Das Tupel der MultiAgentObservation.
+    :param rows: Die Anzahl der Zeilen je Fahrzeug. Ohne Angabe wird die größte vorkommende Anzahl genutzt.
+    :raises ValueError: Wenn ein Eintrag des Tupels mehr als rows Zeilen hat.
+    """
+    arrays = [np.asarray(values) for values in observation]
+    if sum(values.size for values in arrays) == 0:
+        return np.zeros((0, 1, 4), dtype=np.float32)
+    shapes = {values.shape for values in arrays}
+    if len(shapes) == 1 and (rows is None or rows == arrays[0].shape[0]):
+        return np.stack(arrays)
+
+    rows = max(values.shape[0] for values in arrays) if rows is None else rows
+    stacked = np.full(
+        (len(arrays), rows, arrays[0].shape[1]),
+        np.nan,
+        dtype=np.result_type(np.float32, *arrays),
+    )
+    for vehicle_id, values in enumerate(arrays):
+        if values.shape[0] > rows:
+            raise ValueError(
+                "Observation of vehicle {} has more than {} rows.".format(
+                    vehicle_id, rows
+                )
+            )
+        stacked[vehicle_id, : values.shape[0]] = values
+    return stacked
+
+
+class PairwiseRelations(NamedTuple):
+    """
+    Beziehungen zwischen allen Paaren von Fahrzeugen der Observation, jeweils als Matrix der Form (Fahrzeuge x
+    Fahrzeuge), indiziert über die Fahrzeug-IDs [i, j].
+
+    :attribute same_lane: True, wenn i und j auf der gleichen Spur fahren (wie is_in_same_lane). Die Diagonale ist
+    True.
+    :attribute gaps: Der Abstand von i zu j in x-Richtung, positiv, wenn j vor i fährt.
+    :attribute relative_speeds: Die Geschwindigkeit von j relativ zu i in x-Richtung, positiv, wenn j schneller ist.
+    """
+
+    same_lane: np.ndarray
+    gaps: np.ndarray
+    relative_speeds: np.ndarray
+
+
 class ObservationWrapper:
     """
     Diese Klasse dient dazu eine Observation aus HighwayEnv fachlich zu interpretieren.
 
-    :attribute observation: Die von der Environment zurückgegebene Observation. Dabei müssen die features
-    ["x", "y", "vx", "vy"] in genau dieser Reihenfolge, am Anfang der Observation stehen! Sonst kann die Korrektheit
-    der Ergebnisse nicht gewährleistet werden.
+    :attribute observation: Die von der Environment zurückgegebene Observation. Eine Kinematics-Observation muss die
+    features ["x", "y", "vx", "vy"] enthalten, die Reihenfolge ist beliebig.
 
     :attribute env: Das Environment, mit dem getestet wird. Wird für Daten zum Aufbau des Environments
-    wie dem RoadNetwork benötigt, da diese nicht allein aus der Observation gelesen werden können.
+    wie dem RoadNetwork benötigt, da diese nicht allein aus der Observation gelesen werden können. Aus seiner
+    Observation-Config werden einmalig (und nach jedem env.reset() erneut) der Typ der Observation und die Spalten
+    der features gelesen und geprüft. Ohne Environment wird eine Kinematics-Observation angenommen, bei der
+    ["x", "y", "vx", "vy"] in genau dieser Reihenfolge am Anfang stehen.
 
-    Die folgenden Werte der Observation-Config müssen wie folgt gesetzt sein:
+    :attribute misses: Dict mit der Anzahl der Abfragen je Methode, deren Fahrzeug-ID nicht in der Observation
+    vorkommt. Solche Abfragen liefern den dokumentierten Standardwert (False bzw. 0).
+
+    :attribute raise_on_miss: Wenn True, lösen Abfragen mit einer Fahrzeug-ID, die nicht in der Observation vorkommt,
+    einen VehicleNotFoundError aus, statt den Standardwert zu liefern. Der Fehlschlag wird auch dann in misses
+    gezählt.
+
+    Die folgenden Werte der Observation-Config müssen wie folgt gesetzt sein, sonst wird ein
+    InvalidObservationConfigError ausgelöst:
     "absolute" = False -> Damit die Werte der anderen Fahrzeuge relativ zum betrachteten Fahrzeug angegeben werden.
 
-    Note: In dieser ersten Umsetzung wird davon ausgegangen, dass die Observation vom Typ Kinematics ist.
+    Note: Unterstützt werden Observations vom Typ Kinematics, OccupancyGrid und TimeToCollision (siehe unten).
     Zudem ist es auf Basis der HighwayEnv entwickelt, d.h. es in dieser frühen Phase ist er in anderen Environments
     mit Vorsicht zu nutzen. Zudem wird empfohlen, die Konfiguration der Obseration mit dem Parameter
     "normalize": False zu verwenden. Dann können die Distanzen fachlich in Metern interpretiert und die
     Gecshwindigkeiten in m/s werden. Ansonsten basieren die Berechnungen auf den normalisierten Werten der Observation.
+
+    Jede gesetzte Observation bildet einen Frame. Abgeleitete Werte wie die Einordnung der anderen Fahrzeuge in
+    linke/gleiche/rechte Spur, die Geschwindigkeiten und die Sortierung nach x werden erst bei der ersten Abfrage
+    berechnet und von allen weiteren Abfragen desselben Frames wiederverwendet. Einzelabfragen werten dabei nur die
+    Observation des abgefragten Fahrzeugs aus, nur die Batch-Abfragen (get_*s, are_*) stapeln alle Fahrzeuge.
+
+    :attribute use_lane_index: Wenn True, werden die Einzelabfragen zu Lücken und Abständen über einen je Frame und
+    Fahrzeug aufgebauten LaneIndex als binäre Suche beantwortet, statt alle beobachteten Fahrzeuge zu durchlaufen.
+    Lohnt sich bei vielen beobachteten Fahrzeugen und mehreren Abfragen je Frame.
+
+    Ist im Environment eine Observation vom Typ OccupancyGrid konfiguriert, werden is_left_lane_clear,
+    is_right_lane_clear, get_distance_to_leading_vehicle, get_distance_to_following_vehicle und ihre Batch-Varianten
+    automatisch über das Belegungsgitter beantwortet (siehe OccupancyGrid), die Observation ist dann das Tupel der
+    Gitter. use_lane_index wird in diesem Fall ignoriert. Entsprechend werden is_left_lane_safe, is_right_lane_safe,
+    is_current_lane_safe und are_lanes_safe bei einer TimeToCollision-Observation direkt aus deren Gitter gelesen
+    (siehe TimeToCollisionGrid), bei Kinematics wird die Vorhersage aus den relativen Positionen und
+    Geschwindigkeiten berechnet. Die übrigen Abfragen setzen eine Kinematics-Observation voraus und lösen bei einer
+    Gitter-Observation einen InvalidObservationConfigError aus.
     """
 
-    def __init__(self, observation, env: Env = None):
-        self.observation = observation
+    # Indizes der Masken aus __get_relative_lanes
+    __LEFT = LaneIndex.LEFT
+    __SAME = LaneIndex.SAME
+    __RIGHT = LaneIndex.RIGHT
+
+    # Spalten der Kinematics-Observation, wenn sie nicht aus der Config gelesen werden können
+    __DEFAULT_COLUMNS = {feature: i for i, feature in enumerate(KINEMATICS_FEATURES)}
+
+    def __init__(
+        self,
+        observation,
+        env: Env = None,
+        use_lane_index: bool = False,
+        raise_on_miss: bool = False,
+    ):
+        """
+        :raises InvalidObservationConfigError: Wenn die Observation-Config des Environments nicht ausgewertet werden
+        kann (siehe Klassenbeschreibung).
+        """
         self.env = env
+        self.use_lane_index = use_lane_index
+        self.raise_on_miss = raise_on_miss
+        self.misses: Dict[str, int] = {}
+        self.__lane_geometry = None
+        self.__lane_geometry_road = None
+        self.__backend = None
+        self.__columns = self.__DEFAULT_COLUMNS
+        self.__layout_observation_type = None
+        self.observation = observation
+
+    @property
+    def observation(self):
+        return self.__observation
+
+    @observation.setter
+    def observation(self, observation):
+        # Jede neue Observation beginnt einen neuen Frame, die abgeleiteten Werte des alten Frames werden verworfen
+        self.__observation = observation
+        self.__frame = {}
+        self.__read_layout()
 
     def set_observation(self, observation):
         self.observation = observation
@@ -52,27 +185,19 @@ class ObservationWrapper:
 
         Important: Die Fahrzeug-ID ist die Position des Fahrzeugs in der Observation.
         """
+        self.__check_observation_type("is_right_lane_clear", OccupancyGrid)
         if minimal_distance_to_front == 0 and minimal_distance_to_back == 0:
             return False
-        try:
-            values = self.__get_values_for_vehicle(vehicle_id)
-            for vehicle_i in range(1, (values.shape[0])):
-                # check, if y für die Werte aus Sicht der ego-vehicles größer 0 ist (dann rechts vom ego-vehicle)
-                # theoretisch, um nur die nächstgelegene Spur zu nehmen, muss y noch eingeschränkt werden + lane_size
-                if values[vehicle_i][1] > 0:
-                    x_of_vehicle_i = values[vehicle_i][0]
-                    if (
-                        -minimal_distance_to_back
-                        <= x_of_vehicle_i
-                        <= minimal_distance_to_front
-                    ):
-                        return False
-            return True
-        except VehicleNotFoundError:
-            warnings.warn(
-                "The Vehicle was not found in the observation. The return value will always be False"
-            )
+        if not self.__has_vehicle(vehicle_id, "is_right_lane_clear"):
             return False
+        # check, if y für die Werte aus Sicht der ego-vehicles größer 0 ist (dann rechts vom ego-vehicle)
+        # theoretisch, um nur die nächstgelegene Spur zu nehmen, muss y noch eingeschränkt werden + lane_size
+        return self.__is_lane_clear(
+            self.__RIGHT,
+            vehicle_id,
+            minimal_distance_to_front,
+            minimal_distance_to_back,
+        )
 
     def is_left_lane_clear(
         self,
@@ -90,25 +215,14 @@ class ObservationWrapper:
 
         Important: Die Fahrzeug-ID ist die Position des Fahrzeugs in der Observation.
         """
+        self.__check_observation_type("is_left_lane_clear", OccupancyGrid)
         if minimal_distance_to_front == 0 and minimal_distance_to_back == 0:
             return False
-        try:
-            values = self.__get_values_for_vehicle(vehicle_id)
-            for vehicle_i in range(1, (values.shape[0])):
-                if values[vehicle_i][1] < 0:
-                    x_of_vehicle_i = values[vehicle_i][0]
-                    if (
-                        -minimal_distance_to_back
-                        <= x_of_vehicle_i
-                        <= minimal_distance_to_front
-                    ):
-                        return False
-            return True
-        except VehicleNotFoundError:
-            warnings.warn(
-                "The Vehicle was not found in the observation. The return value will always be False"
-            )
+        if not self.__has_vehicle(vehicle_id, "is_left_lane_clear"):
             return False
+        return self.__is_lane_clear(
+            self.__LEFT, vehicle_id, minimal_distance_to_front, minimal_distance_to_back
+        )
 
     def get_distance_to_leading_vehicle(self, vehicle_id) -> float:
         """
@@ -118,26 +232,84 @@ class ObservationWrapper:
 
         Important: Die Fahrzeug-ID ist die Position des Fahrzeugs in der Observation.
         """
-        try:
-            shortest_distance: float = None
-            values = self.__get_values_for_vehicle(vehicle_id)
-            for vehicle_i in range(1, (values.shape[0])):
-                # hier wird auf eine Stelle gerundet, da sonst dieser Vergleich zu ungenau wird und nie eintritt.
-                if not round(values[vehicle_i][1], 1) == 0:
-                    continue
-                vehicle_i_distance = values[vehicle_i][0]
-                if vehicle_i_distance > 0:
-                    if shortest_distance is None:
-                        shortest_distance = vehicle_i_distance
-                    elif shortest_distance > vehicle_i_distance:
-                        shortest_distance = vehicle_i_distance
-
-            return shortest_distance if shortest_distance is not None else 0
-        except VehicleNotFoundError:
-            warnings.warn(
-                "The Vehicle was not found in the observation. The return value will always be zero."
+        self.__check_observation_type("get_distance_to_leading_vehicle", OccupancyGrid)
+        if not self.__has_vehicle(vehicle_id, "get_distance_to_leading_vehicle"):
+            return 0
+        grid = self.__get_grid()
+        if grid is not None:
+            return grid.leading_distances(self.__get_grid_of_vehicle(vehicle_id))
+        if self.use_lane_index:
+            return self.__get_lane_index(vehicle_id).get_distance_to_leading_vehicle(
+                self.__SAME
             )
+        same_lane = self.__get_lane_bucket_of_vehicle(vehicle_id, self.__SAME)
+        return min((x for x in same_lane if x > 0), default=0)
+
+    def get_distance_to_following_vehicle(self, vehicle_id) -> float:
+        """
+        Ermittelt die Distanz zu einem auf der gleichen Spur hinterherfahrenden Fahrzeug.
+        :param vehicle_id: Die ID des Fahrzeugs , für das die Überprüfung durchgeführt werden soll.
+        :returns: Die Distanz (als positiver Wert) zum hinterherfahrenden Fahrzeug. Sollte kein Fahrzeug
+        hinterherfahren, wird 0 zurückgegeben.
+
+        Important: Die Fahrzeug-ID ist die Position des Fahrzeugs in der Observation.
+        """
+        self.__check_observation_type(
+            "get_distance_to_following_vehicle", OccupancyGrid
+        )
+        if not self.__has_vehicle(vehicle_id, "get_distance_to_following_vehicle"):
             return 0
+        grid = self.__get_grid()
+        if grid is not None:
+            return grid.following_distances(self.__get_grid_of_vehicle(vehicle_id))
+        if self.use_lane_index:
+            return self.__get_lane_index(vehicle_id).get_distance_to_following_vehicle(
+                self.__SAME
+            )
+        same_lane = self.__get_lane_bucket_of_vehicle(vehicle_id, self.__SAME)
+        return -max((x for x in same_lane if x < 0), default=0)
+
+    def is_left_lane_safe(self, vehicle_id, horizon: float) -> bool:
+        """
+        Check, ob ein Spurwechsel nach links innerhalb des Zeithorizonts sicher ist, d.h. auf der linken Spur bei
+        gleichbleibender Geschwindigkeit keine Kollision vorhergesagt wird.
+        :param vehicle_id: Die ID des Fahrzeugs , für das die Überprüfung durchgeführt werden soll.
+        :param horizon: Der Zeitraum in Sekunden, in dem keine Kollision vorhergesagt sein darf.
+        :returns: True, wenn der Spurwechsel sicher ist. Gibt es keine linke Spur, wird False zurückgegeben.
+
+        Important: Die Fahrzeug-ID ist die Position des Fahrzeugs in der Observation.
+        """
+        return self.__is_lane_safe(
+            vehicle_id, self.__LEFT, horizon, "is_left_lane_safe"
+        )
+
+    def is_right_lane_safe(self, vehicle_id, horizon: float) -> bool:
+        """
+        Check, ob ein Spurwechsel nach rechts innerhalb des Zeithorizonts sicher ist, d.h. auf der rechten Spur bei
+        gleichbleibender Geschwindigkeit keine Kollision vorhergesagt wird.
+        :param vehicle_id: Die ID des Fahrzeugs , für das die Überprüfung durchgeführt werden soll.
+        :param horizon: Der Zeitraum in Sekunden, in dem keine Kollision vorhergesagt sein darf.
+        :returns: True, wenn der Spurwechsel sicher ist. Gibt es keine rechte Spur, wird False zurückgegeben.
+
+        Important: Die Fahrzeug-ID ist die Position des Fahrzeugs in der Observation.
+        """
+        return self.__is_lane_safe(
+            vehicle_id, self.__RIGHT, horizon, "is_right_lane_safe"
+        )
+
+    def is_current_lane_safe(self, vehicle_id, horizon: float) -> bool:
+        """
+        Check, ob auf der eigenen Spur bei gleichbleibender Geschwindigkeit innerhalb des Zeithorizonts keine
+        Kollision vorhergesagt wird.
+        :param vehicle_id: Die ID des Fahrzeugs , für das die Überprüfung durchgeführt werden soll.
+        :param horizon: Der Zeitraum in Sekunden, in dem keine Kollision vorhergesagt sein darf.
+        :returns: True, wenn die eigene Spur sicher ist.
+
+        Important: Die Fahrzeug-ID ist die Position des Fahrzeugs in der Observation.
+        """
+        return self.__is_lane_safe(
+            vehicle_id, self.__SAME, horizon, "is_current_lane_safe"
+        )
 
     def get_velocity(self, vehicle_id) -> float:
         """
@@ -147,20 +319,13 @@ class ObservationWrapper:
 
         Important: Die Fahrzeug-ID ist die Position des Fahrzeugs in der Observation.
         """
-        try:
-            values = self.__get_values_for_vehicle(vehicle_id)
-            vx = values[0][2]
-            vy = values[0][3]
-            """
-            Die Berechnung basiert auf den beiden unabhängigen Geschwindigkeiten vx, vy und werden mittels
-            des Satzes von Pythagoras genutzt, um die Gesamtgeschwindigkeit des Fahrzeuges zu berechnen.
-            """
-            return np.sqrt(vx**2 + vy**2)
-        except VehicleNotFoundError:
-            warnings.warn(
-                "The Vehicle was not found in the observation. The return value will always be zero."
-            )
+        self.__check_observation_type("get_velocity")
+        if not self.__has_vehicle(vehicle_id, "get_velocity"):
             return 0
+        values = self.__get_values_of_vehicle(vehicle_id)
+        return np.sqrt(
+            values[0, self.__columns["vx"]] ** 2 + values[0, self.__columns["vy"]] ** 2
+        )
 
     def is_in_same_lane(self, vehicle1_id, vehicle2_id):
         """
@@ -172,16 +337,25 @@ class ObservationWrapper:
 
         Important: Die vehicle_ids sind die Position des Fahrzeugs in der Observation.
         """
-        try:
-            values_vehicle1 = self.__get_values_for_vehicle(vehicle1_id)
-            values_vehicle2 = self.__get_values_for_vehicle(vehicle2_id)
-            return round(values_vehicle1[0][1]) == round(values_vehicle2[0][1])
-        except VehicleNotFoundError:
-            warnings.warn(
-                "At least one vehicle was not found in the observation. The return value will always be False."
-            )
+        self.__check_observation_type("is_in_same_lane")
+        if not (
+            self.__has_vehicle(vehicle1_id, "is_in_same_lane")
+            and self.__has_vehicle(vehicle2_id, "is_in_same_lane")
+        ):
             return False
 
+        y_vehicle1 = self.observation[vehicle1_id][0][self.__columns["y"]]
+        y_vehicle2 = self.observation[vehicle2_id][0][self.__columns["y"]]
+        try:
+            lane_geometry = self.__get_lane_geometry()
+        except AttributeError:
+            lane_geometry = None
+        # ohne Environment bzw. Spurtabelle kann die Spurbreite nicht berücksichtigt werden
+        if lane_geometry is None:
+            return round(y_vehicle1) == round(y_vehicle2)
+        lane_ids = lane_geometry.get_lane_ids([y_vehicle1, y_vehicle2])
+        return bool(lane_ids[0] == lane_ids[1])
+
     def is_in_lane(self, vehicle_id, lane_id) -> bool:
         """
         Prüft, ob sich ein gegebenes Fahrzeug auf einer bestimmten Lane befindet
@@ -191,26 +365,369 @@ class ObservationWrapper:
         :param env: Environment, mit dem getestet wird
         :return: True, wenn sich das Fahrzeug auf der Lane befindet. Sonst False
         """
+        self.__check_observation_type("is_in_lane")
         # False, wenn das Fahrzeug nicht exisistiert
+        if not self.__has_vehicle(vehicle_id, "is_in_lane"):
+            return False
+        vehicle_y = self.observation[vehicle_id][0][self.__columns["y"]]
+
+        # False, wenn aus Env nicht alle nötigen Daten gelesen werden können
         try:
-            vehicle_y = self.__get_values_for_vehicle(vehicle_id)[0][1]
-        except VehicleNotFoundError:
+            lane_geometry = self.__get_lane_geometry()
+        except AttributeError:
             warnings.warn(
-                "The Vehicle was not found in the observation. The return value will always be false."
+                "The Environment was not set up properly. The return value will always be false."
             )
             return False
 
-        # False, wenn aus Env nicht alle nötigen Daten gelesen werden können
+        if lane_geometry is None:
+            return self.__is_in_lane_by_network(vehicle_y, lane_id)
+
+        # False, wenn Lane nicht existiert
+        if (lane_geometry.lane_count - 1) < lane_id:
+            return False
+
+        return bool(lane_geometry.get_lane_ids(vehicle_y) == lane_id)
+
+    def get_lane_ids(self) -> np.ndarray:
+        """
+        Ermittelt die Lane-IDs aller Fahrzeuge der Observation in einem Durchlauf.
+        :return: Array mit der Lane-ID je Fahrzeug-ID. Kann die Lane aus dem Environment nicht ermittelt werden,
+        ist jeder Eintrag -1.
+        """
+        self.__check_observation_type("get_lane_ids")
+        vehicle_y = self.__get_feature("y")[:, 0]
         try:
-            abstract_env = getattr(self.env, "env")
-            highway = getattr(abstract_env, "env")
-            road = getattr(highway, "road")
-            network = getattr(road, "network")
+            lane_geometry = self.__get_lane_geometry()
         except AttributeError:
             warnings.warn(
-                "The Environment was not set up properly. The return value will always be false."
+                "The Environment was not set up properly. The return value will always be -1."
+            )
+            return np.full(vehicle_y.shape, -1)
+
+        if lane_geometry is None:
+            network = self.env.unwrapped.road.network
+            return np.array(
+                [
+                    network.get_closest_lane_index(np.array([0, y]), 0.0)[2]
+                    for y in vehicle_y
+                ],
+                dtype=int,
             )
+        return lane_geometry.get_lane_ids(vehicle_y)
+
+    def are_left_lanes_clear(
+        self, minimal_distance_to_front: float, minimal_distance_to_back: float
+    ) -> np.ndarray:
+        """
+        Batch-Variante von is_left_lane_clear für alle Fahrzeuge der Observation in einem Durchlauf.
+        :param minimal_distance_to_front: Der minimale Abstand (als positiver Wert), der nach vorne eingehalten werden soll.
+        :param minimal_distance_to_back: Der minimale Abstand (als positiver Wert), der nach hinten eingehalten werden soll.
+        :returns: Bool-Array mit einem Eintrag je Fahrzeug-ID. Der Eintrag ist True, wenn die linke Spur des
+        Fahrzeugs im Bereich des übergebenen Abstandes frei ist.
+        """
+        self.__check_observation_type("are_left_lanes_clear", OccupancyGrid)
+        if minimal_distance_to_front == 0 and minimal_distance_to_back == 0:
+            return np.zeros(self.__get_vehicle_count(), dtype=bool)
+        return self.__lanes_clear(
+            self.__LEFT, minimal_distance_to_front, minimal_distance_to_back
+        )
+
+    def are_right_lanes_clear(
+        self, minimal_distance_to_front: float, minimal_distance_to_back: float
+    ) -> np.ndarray:
+        """
+        Batch-Variante von is_right_lane_clear für alle Fahrzeuge der Observation in einem Durchlauf.
+        :param minimal_distance_to_front: Der minimale Abstand (als positiver Wert), der nach vorne eingehalten werden soll.
+        :param minimal_distance_to_back: Der minimale Abstand (als positiver Wert), der nach hinten eingehalten werden soll.
+        :returns: Bool-Array mit einem Eintrag je Fahrzeug-ID. Der Eintrag ist True, wenn die rechte Spur des
+        Fahrzeugs im Bereich des übergebenen Abstandes frei ist.
+        """
+        self.__check_observation_type("are_right_lanes_clear", OccupancyGrid)
+        if minimal_distance_to_front == 0 and minimal_distance_to_back == 0:
+            return np.zeros(self.__get_vehicle_count(), dtype=bool)
+        return self.__lanes_clear(
+            self.__RIGHT, minimal_distance_to_front, minimal_distance_to_back
+        )
+
+    def get_distances_to_leading_vehicles(self) -> np.ndarray:
+        """
+        Batch-Variante von get_distance_to_leading_vehicle für alle Fahrzeuge der Observation in einem Durchlauf.
+        :returns: Array mit der Distanz zum vorausfahrenden Fahrzeug je Fahrzeug-ID. Fährt kein Fahrzeug voraus,
+        ist der Eintrag 0.
+        """
+        self.__check_observation_type(
+            "get_distances_to_leading_vehicles", OccupancyGrid
+        )
+        return self.__get_leading_distances()
+
+    def get_distances_to_following_vehicles(self) -> np.ndarray:
+        """
+        Batch-Variante von get_distance_to_following_vehicle für alle Fahrzeuge der Observation in einem Durchlauf.
+        :returns: Array mit der Distanz zum hinterherfahrenden Fahrzeug je Fahrzeug-ID. Fährt kein Fahrzeug hinterher,
+        ist der Eintrag 0.
+        """
+        self.__check_observation_type(
+            "get_distances_to_following_vehicles", OccupancyGrid
+        )
+        return self.__get_following_distances()
+
+    def are_lanes_safe(self, horizon: float) -> np.ndarray:
+        """
+        Batch-Variante von is_left_lane_safe, is_current_lane_safe und is_right_lane_safe für alle Fahrzeuge der
+        Observation in einem Durchlauf.
+        :param horizon: Der Zeitraum in Sekunden, in dem keine Kollision vorhergesagt sein darf.
+        :returns: Bool-Array der Form (Fahrzeuge x 3), die Spalten sind über LaneIndex.LEFT, SAME und RIGHT
+        indiziert.
+        """
+        self.__check_observation_type("are_lanes_safe", TimeToCollisionGrid)
+        return self.__get_safe_lanes(horizon)
+
+    def get_pairwise_relations(self) -> PairwiseRelations:
+        """
+        Ermittelt Spur, Abstand und Geschwindigkeitsdifferenz für alle Paare von Fahrzeugen der Observation in einem
+        Durchlauf, statt is_in_same_lane und die Abstände für jedes Paar einzeln abzufragen.
+        :returns: Die PairwiseRelations des aktuellen Frames.
+        """
+        self.__check_observation_type("get_pairwise_relations")
+
+        def compute():
+            lanes = self.__get_lanes_of_vehicles(self.__get_feature("y")[:, 0])
+            x = self.__get_feature("x")[:, 0]
+            vx = self.__get_feature("vx")[:, 0]
+            return PairwiseRelations(
+                lanes[:, np.newaxis] == lanes[np.newaxis, :],
+                x[np.newaxis, :] - x[:, np.newaxis],
+                vx[np.newaxis, :] - vx[:, np.newaxis],
+            )
+
+        return self.__get_from_frame("pairwise_relations", compute)
+
+    def get_nearest_vehicles(self, k: int, same_lane: bool = False):
+        """
+        Ermittelt je Fahrzeug die k nächsten anderen Fahrzeuge der Observation nach dem Abstand in x-Richtung.
+        :param k: Die Anzahl der gesuchten Fahrzeuge.
+        :param same_lane: Wenn True, werden nur Fahrzeuge auf der gleichen Spur berücksichtigt.
+        :returns: Tupel (IDs, Abstände) zweier Arrays der Form (Fahrzeuge x k), aufsteigend nach dem Betrag des
+        Abstands sortiert. Gibt es weniger als k passende Fahrzeuge, sind die übrigen IDs -1 und die Abstände inf.
+        """
+        self.__check_observation_type("get_nearest_vehicles")
+        relations = self.get_pairwise_relations()
+        distances = np.abs(relations.gaps).astype(float)
+        # das Fahrzeug selbst und ggf. Fahrzeuge auf anderen Spuren können nicht gewählt werden
+        np.fill_diagonal(distances, np.inf)
+        if same_lane:
+            distances[~relations.same_lane] = np.inf
+
+        count = len(distances)
+        candidates = min(k, count)
+        if 0 < candidates < count:
+            nearest = np.argpartition(distances, candidates - 1, axis=1)[:, :candidates]
+        else:
+            nearest = np.tile(np.arange(candidates), (count, 1))
+        order = np.take_along_axis(distances, nearest, axis=1).argsort(axis=1)
+        ids = np.take_along_axis(nearest, order, axis=1)
+        nearest_distances = np.take_along_axis(distances, ids, axis=1)
+
+        ids = np.pad(ids, ((0, 0), (0, k - candidates)), constant_values=-1)
+        nearest_distances = np.pad(
+            nearest_distances, ((0, 0), (0, k - candidates)), constant_values=np.inf
+        )
+        ids[np.isinf(nearest_distances)] = -1
+        return ids, nearest_distances
+
+    def get_velocities(self) -> np.ndarray:
+        """
+        Batch-Variante von get_velocity für alle Fahrzeuge der Observation in einem Durchlauf.
+        :returns: Array mit der Gesamtgeschwindigkeit je Fahrzeug-ID.
+        """
+        self.__check_observation_type("get_velocities")
+        return self.__get_speeds()[:, 0]
+
+    def get_positions(self) -> np.ndarray:
+        """
+        Ermittelt die Positionen aller Fahrzeuge der Observation. Mit "absolute" = False ist nur die erste Zeile
+        (das betrachtete Fahrzeug selbst) absolut angegeben, die weiteren Zeilen sind relativ dazu.
+        :returns: Array der Form (Fahrzeuge x 2) mit der absoluten x- und y-Position je Fahrzeug-ID.
+        """
+        self.__check_observation_type("get_positions")
+        return np.stack(
+            [self.__get_feature("x")[:, 0], self.__get_feature("y")[:, 0]], axis=-1
+        )
+
+    def __is_lane_clear(
+        self, side, vehicle_id, minimal_distance_to_front, minimal_distance_to_back
+    ) -> bool:
+        grid = self.__get_grid()
+        if grid is not None:
+            return bool(
+                grid.lanes_clear(
+                    self.__get_grid_of_vehicle(vehicle_id),
+                    side,
+                    minimal_distance_to_front,
+                    minimal_distance_to_back,
+                )
+            )
+        if self.use_lane_index:
+            return self.__get_lane_index(vehicle_id).is_gap_free(
+                side, minimal_distance_to_front, minimal_distance_to_back
+            )
+        return not any(
+            -minimal_distance_to_back <= x <= minimal_distance_to_front
+            for x in self.__get_lane_bucket_of_vehicle(vehicle_id, side)
+        )
+
+    def __is_lane_safe(self, vehicle_id, lane, horizon, method: str) -> bool:
+        self.__check_observation_type(method, TimeToCollisionGrid)
+        if not self.__has_vehicle(vehicle_id, method):
             return False
+        time_to_collision_grid = self.__get_time_to_collision_grid()
+        if time_to_collision_grid is not None:
+            grid = self.__get_grid_of_vehicle(vehicle_id)
+            return bool(time_to_collision_grid.lanes_safe(grid, horizon)[lane])
+        values = self.__get_values_of_vehicle(vehicle_id)
+        return bool(self.__predict_safe_lanes(values, horizon)[lane])
+
+    def __get_lanes_of_vehicles(self, vehicle_y) -> np.ndarray:
+        """
+        :return: Je Fahrzeug eine Kennung der Spur, die wie in is_in_same_lane bestimmt wird: die Lane-ID aus der
+        Spurtabelle oder ohne Environment bzw. Spurtabelle die gerundete y-Koordinate.
+        """
+        try:
+            lane_geometry = self.__get_lane_geometry()
+        except AttributeError:
+            lane_geometry = None
+        if lane_geometry is None:
+            return np.round(vehicle_y)
+        return lane_geometry.get_lane_ids(vehicle_y)
+
+    def __has_vehicle(self, vehicle_id, method: str) -> bool:
+        """
+        Prüft, ob die Fahrzeug-ID in der Observation vorkommt (wie beim Indizieren eines Tupels sind auch negative IDs
+        erlaubt). Fehlt das Fahrzeug, wird das in misses unter dem Namen der Methode gezählt.
+        :raises VehicleNotFoundError: Wenn das Fahrzeug fehlt und raise_on_miss gesetzt ist.
+        """
+        count = self.__get_vehicle_count()
+        if -count <= vehicle_id < count:
+            return True
+        self.misses[method] = self.misses.get(method, 0) + 1
+        if self.raise_on_miss:
+            raise VehicleNotFoundError(
+                "Vehicle {} not found in observation.".format(vehicle_id)
+            )
+        return False
+
+    def __get_vehicle_count(self) -> int:
+        # ein einzelnes Gitter als ndarray ist die Observation genau eines Fahrzeugs
+        if self.__is_single_grid():
+            return 1
+        return len(self.observation)
+
+    def __is_single_grid(self) -> bool:
+        return (
+            self.__backend is not None
+            and isinstance(self.observation, np.ndarray)
+            and self.observation.ndim == 3
+        )
+
+    def __check_observation_type(self, method: str, *grid_types):
+        """
+        Prüft, ob die Abfrage für den konfigurierten Typ der Observation beantwortet werden kann. Kinematics wird von
+        allen Abfragen unterstützt, Gitter nur von den Abfragen, die grid_types übergeben.
+        :raises InvalidObservationConfigError: Wenn eine Gitter-Observation konfiguriert ist, die die Abfrage nicht
+        unterstützt.
+        """
+        if self.__backend is not None and not isinstance(self.__backend, grid_types):
+            raise InvalidObservationConfigError(
+                "{} needs a Kinematics observation, got {}.".format(
+                    method, type(self.__backend).__name__
+                )
+            )
+
+    def __get_lane_geometry(self):
+        """
+        Liefert die Spurtabelle zur aktuellen Road des Environments. Da HighwayEnv bei jedem env.reset() eine neue
+        Road erzeugt, wird die Tabelle neu aufgebaut, sobald sich die Road geändert hat.
+        :raises AttributeError: Wenn das Environment keine Road bereitstellt.
+        :return: Die LaneGeometry oder None, wenn das RoadNetwork nicht tabellarisch abgebildet werden kann.
+        """
+        road = self.env.unwrapped.road
+        if road is not self.__lane_geometry_road:
+            self.__lane_geometry = LaneGeometry.from_road(road)
+            self.__lane_geometry_road = road
+        return self.__lane_geometry
+
+    def __read_layout(self):
+        """
+        Liest die Observation-Config aus dem Environment, prüft sie und legt die Auswertung sowie die Spalten der
+        features fest. Da HighwayEnv bei jedem env.reset() den ObservationType neu erzeugt, wird die Config nur
+        erneut gelesen, wenn sich dieser geändert hat.
+        :raises InvalidObservationConfigError: Wenn die Config nicht ausgewertet werden kann.
+        """
+        try:
+            observation_type = self.env.unwrapped.observation_type
+            if observation_type is self.__layout_observation_type:
+                return
+            config = get_observation_config(self.env)
+        except (AttributeError, KeyError):
+            return
+
+        if config.get("absolute", False):
+            raise InvalidObservationConfigError(
+                'The observation config must set "absolute" to False.'
+            )
+        backend = None
+        columns = self.__DEFAULT_COLUMNS
+        if config.get("type") == "Kinematics":
+            features = list(config.get("features") or KinematicObservation.FEATURES)
+            missing = [
+                feature for feature in KINEMATICS_FEATURES if feature not in features
+            ]
+            if missing:
+                raise InvalidObservationConfigError(
+                    "The Kinematics observation is missing the features {}.".format(
+                        missing
+                    )
+                )
+            columns = {
+                feature: features.index(feature) for feature in KINEMATICS_FEATURES
+            }
+        elif config.get("type") == "OccupancyGrid":
+            try:
+                backend = OccupancyGrid.from_config(config, self.__get_lane_width())
+            except ValueError as error:
+                raise InvalidObservationConfigError(str(error)) from error
+        elif config.get("type") == "TimeToCollision":
+            backend = TimeToCollisionGrid.from_config(
+                config, self.env.unwrapped.config["policy_frequency"]
+            )
+        else:
+            raise InvalidObservationConfigError(
+                "Observation type {} is not supported.".format(config.get("type"))
+            )
+        self.__backend = backend
+        self.__columns = columns
+        self.__layout_observation_type = observation_type
+
+    def __get_grid(self):
+        return self.__backend if isinstance(self.__backend, OccupancyGrid) else None
+
+    def __get_time_to_collision_grid(self):
+        if isinstance(self.__backend, TimeToCollisionGrid):
+            return self.__backend
+        return None
+
+    def __get_lane_width(self) -> float:
+        try:
+            lane_geometry = self.__get_lane_geometry()
+        except AttributeError:
+            lane_geometry = None
+        if lane_geometry is None:
+            return AbstractLane.DEFAULT_WIDTH
+        return float(lane_geometry.widths[0])
+
+    def __is_in_lane_by_network(self, vehicle_y, lane_id) -> bool:
+        network = self.env.unwrapped.road.network
 
         # False, wenn Lane nicht existiert
         if (len(network.lanes_list()) - 1) < lane_id:
@@ -222,8 +739,245 @@ class ObservationWrapper:
         # Tupel enthält "from", "to", "index"
         return index[2] == lane_id
 
-    def __get_values_for_vehicle(self, vehicle_id):
+    def __get_from_frame(self, key, compute):
+        """
+        Liefert einen abgeleiteten Wert des aktuellen Frames. Beim ersten Zugriff wird er über compute berechnet,
+        danach bis zur nächsten Observation wiederverwendet.
+        """
         try:
-            return self.observation[vehicle_id]
-        except IndexError:
-            raise VehicleNotFoundError("Vehicle not found in observation.")
+            return self.__frame[key]
+        except KeyError:
+            value = self.__frame[key] = compute()
+            return value
+
+    def __get_values_of_vehicle(self, vehicle_id) -> np.ndarray:
+        """
+        Die Kinematics-Observation eines Fahrzeugs (beobachtete Fahrzeuge x Features). Einzelabfragen lesen nur diese
+        Zeilen, das Stapeln aller Fahrzeuge lohnt sich erst für die Batch-Abfragen.
+        """
+        return np.asarray(self.observation[vehicle_id])
+
+    def __get_grid_of_vehicle(self, vehicle_id) -> np.ndarray:
+        """
+        Das Gitter einer OccupancyGrid- bzw. TimeToCollision-Observation eines Fahrzeugs.
+        """
+        if self.__is_single_grid():
+            return self.observation[np.newaxis][vehicle_id]
+        return np.asarray(self.observation[vehicle_id])
+
+    def __get_lane_bucket_of_vehicle(self, vehicle_id, side) -> list:
+        """
+        Einzelabfrage-Variante von __get_relative_lanes, die nur die Zeilen des Fahrzeugs und nur die abgefragte
+        relative Spur auswertet.
+        :return: Die x-Werte der anderen Fahrzeuge (ab Zeile 1) auf der relativen Spur als Liste. Die Einzelabfragen
+        durchlaufen sie in Python, da NumPy-Operationen auf den meist wenigen Werten einer Spur teurer sind als der
+        Durchlauf selbst.
+        """
+
+        def split():
+            values = self.__get_values_of_vehicle(vehicle_id)
+            mask = self.__classify_lane(values[1:, self.__columns["y"]], side)
+            return values[1:, self.__columns["x"]][mask].tolist()
+
+        return self.__get_from_frame(("lane_bucket", vehicle_id, side), split)
+
+    @classmethod
+    def __classify_lanes(cls, y):
+        return tuple(
+            cls.__classify_lane(y, side)
+            for side in (cls.__LEFT, cls.__SAME, cls.__RIGHT)
+        )
+
+    @classmethod
+    def __classify_lane(cls, y, side) -> np.ndarray:
+        if side == cls.__LEFT:
+            return y < 0
+        if side == cls.__RIGHT:
+            return y > 0
+        # hier wird auf eine Stelle gerundet, da sonst der Vergleich zu ungenau wird und nie eintritt.
+        return np.round(y, 1) == 0
+
+    def __get_stacked_observation(self) -> np.ndarray:
+        """
+        Das Tupel der MultiAgentObservation als Array der Form (Fahrzeuge x beobachtete Fahrzeuge x Features).
+        """
+
+        return self.__get_from_frame(
+            "values", lambda: stack_observation(self.observation)
+        )
+
+    def __get_feature(self, feature) -> np.ndarray:
+        """
+        Die Spalte des übergebenen Features der gestapelten Observation (Fahrzeuge x beobachtete Fahrzeuge).
+        """
+        values = self.__get_stacked_observation()
+        if values.shape[0] == 0:
+            return values[..., 0]
+        return values[..., self.__columns[feature]]
+
+    def __get_grids(self) -> np.ndarray:
+        """
+        Das Tupel der OccupancyGrid-Observations als Array der Form (Fahrzeuge x Features x Zellen in x x Zellen in y).
+        """
+
+        def stack():
+            if self.__is_single_grid():
+                return self.observation[np.newaxis]
+            return np.stack([np.asarray(grid) for grid in self.observation])
+
+        return self.__get_from_frame("grids", stack)
+
+    def __get_relative_lanes(self):
+        """
+        Klassifiziert alle anderen Fahrzeuge (ab Zeile 1) relativ zum betrachteten Fahrzeug.
+        :return: Tupel der Masken (links, gleiche Spur, rechts), jeweils der Form (Fahrzeuge x andere Fahrzeuge).
+        """
+
+        return self.__get_from_frame(
+            "relative_lanes",
+            lambda: self.__classify_lanes(self.__get_feature("y")[:, 1:]),
+        )
+
+    def __get_speeds(self) -> np.ndarray:
+        """
+        Die Berechnung basiert auf den beiden unabhängigen Geschwindigkeiten vx, vy und werden mittels
+        des Satzes von Pythagoras genutzt, um die Gesamtgeschwindigkeit des Fahrzeuges zu berechnen.
+        :return: Die Gesamtgeschwindigkeit jeder Zeile der Observation (Fahrzeuge x beobachtete Fahrzeuge).
+        """
+
+        def norm():
+            return np.sqrt(
+                self.__get_feature("vx") ** 2 + self.__get_feature("vy") ** 2
+            )
+
+        return self.__get_from_frame("speeds", norm)
+
+    def __get_x_order(self) -> np.ndarray:
+        """
+        :return: Die Indizes, die die anderen Fahrzeuge (ab Zeile 1) je betrachtetem Fahrzeug nach x sortieren.
+        """
+        return self.__get_from_frame(
+            "x_order",
+            lambda: np.argsort(self.__get_feature("x")[:, 1:], axis=1),
+        )
+
+    def __get_leading_distances(self) -> np.ndarray:
+        def find_leading():
+            grid = self.__get_grid()
+            if grid is not None:
+                return grid.leading_distances(self.__get_grids())
+            x = self.__get_feature("x")[:, 1:]
+            if x.shape[1] == 0:
+                return np.zeros(x.shape[0], dtype=x.dtype)
+            same = self.__get_relative_lanes()[self.__SAME]
+            order = self.__get_x_order()
+            sorted_x = np.take_along_axis(x, order, axis=1)
+            # das erste Fahrzeug in x-Reihenfolge, das auf gleicher Spur vorausfährt, ist das nächste
+            leading = np.take_along_axis(same & (x > 0), order, axis=1)
+            first = leading.argmax(axis=1)
+            return np.where(
+                leading.any(axis=1), sorted_x[np.arange(x.shape[0]), first], 0
+            )
+
+        return self.__get_from_frame("leading_distances", find_leading)
+
+    def __get_following_distances(self) -> np.ndarray:
+        def find_following():
+            grid = self.__get_grid()
+            if grid is not None:
+                return grid.following_distances(self.__get_grids())
+            x = self.__get_feature("x")[:, 1:]
+            following = self.__get_relative_lanes()[self.__SAME] & (x < 0)
+            closest = np.where(following, x, -np.inf).max(axis=1, initial=-np.inf)
+            return np.where(np.isinf(closest), 0, -closest)
+
+        return self.__get_from_frame("following_distances", find_following)
+
+    def __get_safe_lanes(self, horizon) -> np.ndarray:
+        """
+        Ermittelt für alle Fahrzeuge, auf welcher relativen Spur innerhalb von horizon Sekunden keine Kollision
+        vorhergesagt wird. Bei einer TimeToCollision-Observation wird das Gitter gelesen, sonst wird die Vorhersage
+        aus der Kinematics-Observation berechnet.
+        :return: Bool-Array der Form (Fahrzeuge x 3), indiziert über LaneIndex.LEFT, SAME und RIGHT.
+        """
+
+        def compute():
+            time_to_collision_grid = self.__get_time_to_collision_grid()
+            if time_to_collision_grid is not None:
+                return time_to_collision_grid.lanes_safe(self.__get_grids(), horizon)
+            values = self.__get_stacked_observation()
+            if values.shape[0] == 0:
+                return np.zeros((0, 3), dtype=bool)
+            return self.__predict_safe_lanes(values, horizon)
+
+        return self.__get_from_frame(("safe_lanes", horizon), compute)
+
+    def __predict_safe_lanes(self, values, horizon) -> np.ndarray:
+        """
+        :param values: Die Kinematics-Observation eines Fahrzeugs (beobachtete Fahrzeuge x Features), auch gestapelt
+        für mehrere Fahrzeuge mit vorangestellter Achse.
+        :return: Bool-Array der Form (... x 3), indiziert über LaneIndex.LEFT, SAME und RIGHT.
+        """
+        columns = self.__columns
+        safe = predict_safe_lanes(
+            values[..., 1:, columns["x"]],
+            values[..., 1:, columns["y"]],
+            values[..., 1:, columns["vx"]],
+            horizon,
+            1 / self.__get_policy_frequency(),
+            self.__get_lane_width(),
+        )
+        try:
+            lane_geometry = self.__get_lane_geometry()
+        except AttributeError:
+            lane_geometry = None
+        # wie in der TimeToCollision-Observation sind Spuren außerhalb der Straße nicht sicher
+        if lane_geometry is not None:
+            position = np.searchsorted(
+                lane_geometry.boundaries, values[..., 0, columns["y"]]
+            )
+            safe[..., self.__LEFT] &= position > 0
+            safe[..., self.__RIGHT] &= position < len(lane_geometry.centers) - 1
+        return safe
+
+    def __get_policy_frequency(self) -> float:
+        try:
+            return self.env.unwrapped.config["policy_frequency"]
+        except (AttributeError, KeyError):
+            # Standardwert von HighwayEnv
+            return 1
+
+    def __get_lane_index(self, vehicle_id) -> LaneIndex:
+        """
+        Liefert den LaneIndex des Fahrzeugs für den aktuellen Frame. Er wird aus der bereits berechneten
+        x-Sortierung und Spureinordnung aufgebaut, sodass keine weitere Sortierung nötig ist.
+        """
+
+        def build():
+            values = self.__get_values_of_vehicle(vehicle_id)
+            x = values[1:, self.__columns["x"]]
+            relative_lanes = self.__classify_lanes(values[1:, self.__columns["y"]])
+            order = np.argsort(x)
+            return LaneIndex(x[order], tuple(mask[order] for mask in relative_lanes))
+
+        return self.__get_from_frame(("lane_index", vehicle_id), build)
+
+    def __lanes_clear(
+        self, side, minimal_distance_to_front, minimal_distance_to_back
+    ) -> np.ndarray:
+        grid = self.__get_grid()
+        if grid is not None:
+            return grid.lanes_clear(
+                self.__get_grids(),
+                side,
+                minimal_distance_to_front,
+                minimal_distance_to_back,
+            )
+        # Zeile 0 ist das betrachtete Fahrzeug selbst und wird daher ausgelassen
+        x = self.__get_feature("x")[:, 1:]
+        blocking = (
+            self.__get_relative_lanes()[side]
+            & (-minimal_distance_to_back <= x)
+            & (x <= minimal_distance_to_front)
+        )
+        return ~blocking.any(axis=-1)
@@ -0,0 +1,144 @@
+import numpy as np
+from highway_env.envs.common.observation import OccupancyGridObservation
+
+from .lane_index import LaneIndex
+
+
+def get_observation_config(env) -> dict:
+    """
+    Liest die Observation-Config eines Fahrzeugs aus dem Environment. Bei einer MultiAgentObservation ist das die
+    "observation_config", die für alle gesteuerten Fahrzeuge gilt.
+    :param env: Das Environment (auch gewrappt).
+    :return: Die Config der Observation eines Fahrzeugs.
+    """
+    config = env.unwrapped.config["observation"]
+    if config.get("type") == "MultiAgentObservation":
+        return config["observation_config"]
+    return config
+
+
+class OccupancyGrid:
+    """
+    Beantwortet die Spurabfragen des ObservationWrappers über eine OccupancyGrid-Observation, indem das Belegungsgitter
+    zeilen- und spaltenweise geschnitten wird. Der Aufwand einer Abfrage hängt damit nur von der Größe des Gitters ab,
+    nicht von der Anzahl der Fahrzeuge in Wahrnehmungsweite.
+
+    Das Gitter einer Observation hat die Form (Features x Zellen in x x Zellen in y) und ist relativ zum betrachteten
+    Fahrzeug, das selbst im Gitter eingetragen ist. Eine Zelle mit Index (i, j) deckt in x den Bereich
+    [grid_size[0][0] + i * grid_step[0], grid_size[0][0] + (i + 1) * grid_step[0]) ab, in y entsprechend.
+
+    :attribute presence_layer: Der Index des Features "presence" im Gitter.
+    :attribute x_lower: Die untere x-Grenze jeder Zellzeile.
+    :attribute x_upper: Die obere x-Grenze jeder Zellzeile.
+    :attribute lanes: Tupel der Spaltenmasken (links, gleiche Spur, rechts), indiziert über LaneIndex.LEFT, SAME
+    und RIGHT. Eine Spalte gehört zu der relativen Spur, in der ihre Mitte liegt.
+    :attribute ego_row: Die Zeile, in der das betrachtete Fahrzeug selbst liegt.
+
+    Note: Die Genauigkeit ist durch grid_step begrenzt. Eine Lücke gilt als frei, wenn keine Zelle belegt ist, die
+    den Bereich der Lücke überlappt. Damit ist das Ergebnis im Zweifel "nicht frei". Für eine eindeutige Zuordnung
+    der Spalten zu den Spuren sollte grid_step in y der Spurbreite entsprechen und die Spurmitten sollten in den
+    Spaltenmitten liegen (z.B. grid_size [[-50, 50], [-14, 14]], grid_step [5, 4] bei 4m breiten Spuren).
+    Fahrzeuge in der Zeile des betrachteten Fahrzeugs werden von diesem verdeckt.
+    """
+
+    def __init__(self, grid_size, grid_step, features, lane_width: float = 4.0):
+        """
+        :param grid_size: [[min_x, max_x], [min_y, max_y]] wie in der Observation-Config.
+        :param grid_step: [step_x, step_y] wie in der Observation-Config.
+        :param features: Die Features der Observation, "presence" muss enthalten sein.
+        :param lane_width: Die Spurbreite, nach der die Spalten den relativen Spuren zugeordnet werden.
+        :raises ValueError: Wenn "presence" nicht in den Features enthalten ist.
+        """
+        if "presence" not in features:
+            raise ValueError(
+                'OccupancyGrid observation needs the feature "presence", got {}.'.format(
+                    list(features)
+                )
+            )
+        self.presence_layer = list(features).index("presence")
+        grid_size = np.asarray(grid_size, dtype=float)
+        grid_step = np.asarray(grid_step, dtype=float)
+        shape = np.floor((grid_size[:, 1] - grid_size[:, 0]) / grid_step).astype(int)
+
+        self.x_lower = grid_size[0, 0] + np.arange(shape[0]) * grid_step[0]
+        self.x_upper = self.x_lower + grid_step[0]
+        y_centers = grid_size[1, 0] + (np.arange(shape[1]) + 0.5) * grid_step[1]
+        lanes = [None] * 3
+        lanes[LaneIndex.LEFT] = y_centers <= -lane_width / 2
+        lanes[LaneIndex.SAME] = np.abs(y_centers) < lane_width / 2
+        lanes[LaneIndex.RIGHT] = y_centers >= lane_width / 2
+        self.lanes = tuple(lanes)
+        self.ego_row = int(np.floor(-grid_size[0, 0] / grid_step[0]))
+
+    @classmethod
+    def from_config(cls, config: dict, lane_width: float = 4.0):
+        """
+        Baut das Gitter aus der Observation-Config eines Fahrzeugs auf. Fehlende Werte werden wie in HighwayEnv durch
+        die Standardwerte der OccupancyGridObservation ersetzt.
+        :param config: Die Observation-Config (siehe get_observation_config).
+        :return: Das OccupancyGrid oder None, wenn die Observation nicht vom Typ OccupancyGrid ist.
+        """
+        if config.get("type") != "OccupancyGrid":
+            return None
+        return cls(
+            config.get("grid_size") or OccupancyGridObservation.GRID_SIZE,
+            config.get("grid_step") or OccupancyGridObservation.GRID_STEP,
+            config.get("features") or OccupancyGridObservation.FEATURES,
+            lane_width,
+        )
+
+    def lanes_clear(
+        self,
+        grids: np.ndarray,
+        lane,
+        minimal_distance_to_front: float,
+        minimal_distance_to_back: float,
+    ) -> np.ndarray:
+        """
+        :param grids: Die Gitter der Form (Features x Zellen in x x Zellen in y), auch gestapelt für mehrere
+        Fahrzeuge mit vorangestellten Achsen.
+        :param lane: Die relative Spur (LaneIndex.LEFT oder RIGHT).
+        :param minimal_distance_to_front: Der minimale Abstand (als positiver Wert) nach vorne.
+        :param minimal_distance_to_back: Der minimale Abstand (als positiver Wert) nach hinten.
+        :return: True je Gitter, wenn keine Zelle der Spur im Bereich [-minimal_distance_to_back,
+        minimal_distance_to_front] belegt ist.
+        """
+        rows = (self.x_lower <= minimal_distance_to_front) & (
+            self.x_upper > -minimal_distance_to_back
+        )
+        presence = grids[..., self.presence_layer, :, :]
+        cells = presence[..., rows, :][..., self.lanes[lane]]
+        return ~(cells > 0).any(axis=(-2, -1))
+
+    def leading_distances(self, grids: np.ndarray) -> np.ndarray:
+        """
+        :param grids: Die Gitter der Form (Features x Zellen in x x Zellen in y), auch gestapelt für mehrere
+        Fahrzeuge mit vorangestellten Achsen.
+        :return: Je Gitter die untere x-Grenze der ersten belegten Zelle vor dem Fahrzeug auf der gleichen Spur, also
+        eine um höchstens grid_step[0] zu kleine Distanz. Ist keine Zelle belegt, ist der Eintrag 0.
+        """
+        ahead = grids[..., self.presence_layer, self.ego_row + 1 :, :]
+        occupied = (ahead[..., self.lanes[LaneIndex.SAME]] > 0).any(axis=-1)
+        if occupied.shape[-1] == 0:
+            return np.zeros(occupied.shape[:-1])
+        first = occupied.argmax(axis=-1)
+        return np.where(
+            occupied.any(axis=-1), self.x_lower[self.ego_row + 1 :][first], 0
+        )
+
+    def following_distances(self, grids: np.ndarray) -> np.ndarray:
+        """
+        :param grids: Die Gitter der Form (Features x Zellen in x x Zellen in y), auch gestapelt für mehrere
+        Fahrzeuge mit vorangestellten Achsen.
+        :return: Je Gitter der Betrag der oberen x-Grenze der letzten belegten Zelle hinter dem Fahrzeug auf der
+        gleichen Spur, also eine um höchstens grid_step[0] zu kleine Distanz (als positiver Wert). Ist keine Zelle
+        belegt, ist der Eintrag 0. Liegt die Zelle direkt hinter der Zelle des Fahrzeugs, kann auch eine belegte
+        Zelle die Distanz 0 liefern.
+        """
+        behind = grids[..., self.presence_layer, : self.ego_row, :]
+        occupied = (behind[..., self.lanes[LaneIndex.SAME]] > 0).any(axis=-1)
+        if occupied.shape[-1] == 0:
+            return np.zeros(occupied.shape[:-1])
+        # die letzte belegte Zeile ist die nächste zum Fahrzeug
+        last = occupied.shape[-1] - 1 - occupied[..., ::-1].argmax(axis=-1)
+        return np.where(occupied.any(axis=-1), -self.x_upper[: self.ego_row][last], 0)
@@ -0,0 +1,308 @@
+"""
+Kampagnen-Runner für Szenario-Prüfungen mit den Constraints des abstrakten Überholszenarios.
+
+Eine Kampagne ist eine Liste von Szenarien, jeweils als Tupel (Modul, Name der b-thread-Factory, Argumente), z.B.
+("demo_scenarios", "invalid_speed_simulation", ()). Die Factories werden über Modul und Namen angegeben, da die
+mit @thread dekorierten Funktionen nicht an andere Prozesse übergeben werden können.
+
+Jedes Szenario wird in einem ProcessPoolExecutor in einem eigenen BProgram zusammen mit get_checker_threads()
+ausgeführt. Die Ergebnisse werden zurückgegeben, sobald ein Lauf fertig ist, unabhängig von der Reihenfolge der
+Kampagne. Mit timeout wird ein Lauf nach der angegebenen Zeit abgebrochen: Nach jedem Event prüft ein Listener
+die Deadline, zusätzlich bricht (sofern vom Betriebssystem unterstützt) ein Timer-Signal auch b-threads ab, die
+keine Events mehr erzeugen.
+Mit fail_fast blockieren verletzte Constraints weitere STEP-Events, der Lauf endet dann vorzeitig (STOPPED).
+
+Aufruf (aus diesem Verzeichnis):
+    python campaign.py --workers 4 --repeat 100 --timeout 10
+"""
+
+import argparse
+import importlib
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bppy import BProgram, BProgramRunnerListener
+from overtake_abstract_checker import (
+    CONSTRAINT_NAMES,
+    PENDING,
+    SATISFIED,
+    VIOLATED,
+    OnlineMonitor,
+    SubscriptionEventSelectionStrategy,
+    get_checker_threads,
+)
+from replay import DEMO_SIMULATIONS
+
+FINISHED = "finished"
+STOPPED = "stopped"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+DEMO_CAMPAIGN = [("demo_scenarios", name, ()) for name in DEMO_SIMULATIONS]
+
+
+class RunTimeoutError(Exception):
+    pass
+
+
+class DeadlineListener(BProgramRunnerListener):
+    """
+    Zählt die ausgewählten Events und unterbricht das BProgram, sobald die Deadline überschritten ist.
+
+    :attribute deadline: Zeitpunkt (time.monotonic) des Abbruchs, None für keine Deadline.
+    :attribute events: Die Anzahl der bisher ausgewählten Events.
+    :attribute timed_out: True, wenn das BProgram wegen der Deadline unterbrochen wurde.
+    """
+
+    def __init__(self, deadline: float = None):
+        self.deadline = deadline
+        self.events = 0
+        self.timed_out = False
+
+    def event_selected(self, b_program, event):
+        self.events += 1
+        self.timed_out = self.deadline is not None and time.monotonic() > self.deadline
+        return self.timed_out
+
+    def starting(self, b_program):
+        pass
+
+    def started(self, b_program):
+        pass
+
+    def super_step_done(self, b_program):
+        pass
+
+    def ended(self, b_program):
+        pass
+
+    def assertion_failed(self, b_program):
+        pass
+
+    def b_thread_added(self, b_program):
+        pass
+
+    def b_thread_removed(self, b_program):
+        pass
+
+    def b_thread_done(self, b_program):
+        pass
+
+    def halted(self, b_program):
+        pass
+
+
+def run_scenario(
+    module: str,
+    name: str,
+    args=(),
+    timeout: float = None,
+    fail_fast: bool = False,
+) -> dict:
+    """
+    Führt ein Szenario zusammen mit den Constraints aus. Die Constraints loggen nicht, sondern übergeben ihre
+    Verdicts an einen VerdictSink.
+    :param module: Das Modul der b-thread-Factory.
+    :param name: Der Name der b-thread-Factory im Modul.
+    :param args: Die Argumente für die b-thread-Factory.
+    :param timeout: Die maximale Laufzeit in Sekunden, None für keine Begrenzung.
+    :param fail_fast: Ob der Lauf nach der ersten Verletzung eines Constraints beendet wird.
+    :return: Dict mit "module", "name", "args", dem "status" (FINISHED, STOPPED, TIMEOUT oder ERROR), "passed"
+    (True, wenn der Lauf beendet wurde und alle Constraints ein erfülltes Verdict geliefert haben), den "verdicts",
+    den "statuses" des OnlineMonitors je Constraint, dem "error" (Beschreibung der Exception bei ERROR, sonst None),
+    der Anzahl der "events" und der Laufzeit in "seconds".
+    """
+    sink = OnlineMonitor(fail_fast)
+    listener = DeadlineListener(
+        time.monotonic() + timeout if timeout is not None else None
+    )
+    # Signal-Handler können nur im Haupt-Thread gesetzt werden, wie in den Prozessen des ProcessPoolExecutors
+    use_timer = (
+        timeout is not None
+        and hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+    status = FINISHED
+    error = None
+    previous_handler = signal.SIG_DFL
+    start = time.perf_counter()
+    try:
+        if use_timer:
+            previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+            # der Listener bricht zuerst ab, der Timer nur, wenn keine Events mehr erzeugt werden
+            signal.setitimer(signal.ITIMER_REAL, timeout * 1.5)
+        scenario = getattr(importlib.import_module(module), name)
+        bp = BProgram(
+            bthreads=[scenario(*args)] + get_checker_threads(sink, log=False),
+            event_selection_strategy=SubscriptionEventSelectionStrategy(),
+            listener=listener,
+        )
+        bp.run()
+        if listener.timed_out:
+            status = TIMEOUT
+        elif len(sink.verdicts) < len(CONSTRAINT_NAMES) and sink.status == VIOLATED:
+            status = STOPPED
+    except RunTimeoutError:
+        status = TIMEOUT
+    except Exception as e:
+        status = ERROR
+        error = "{}: {}".format(type(e).__name__, e)
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            # None, wenn der vorherige Handler nicht aus Python gesetzt wurde
+            signal.signal(
+                signal.SIGALRM,
+                previous_handler if previous_handler is not None else signal.SIG_DFL,
+            )
+    # ohne END-Event liefern die Constraints kein Verdict, der Lauf gilt dann nicht als bestanden
+    passed = (
+        status == FINISHED
+        and len(sink.verdicts) == len(CONSTRAINT_NAMES)
+        and all(verdict.passed for verdict in sink.verdicts)
+    )
+    return {
+        "module": module,
+        "name": name,
+        "args": tuple(args),
+        "status": status,
+        "passed": passed,
+        "verdicts": sink.verdicts,
+        "statuses": sink.statuses,
+        "error": error,
+        "events": listener.events,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def run_scenarios(scenarios, timeout: float = None, fail_fast: bool = False) -> list:
+    """
+    Führt mehrere Szenarien nacheinander mit run_scenario aus.
+    """
+    return [
+        run_scenario(module, name, args, timeout, fail_fast)
+        for module, name, args in scenarios
+    ]
+
+
+def run_campaign(
+    scenarios,
+    workers: int = None,
+    timeout: float = None,
+    chunksize: int = 1,
+    fail_fast: bool = False,
+):
+    """
+    Führt die Szenarien parallel in einem ProcessPoolExecutor aus.
+    :param scenarios: Liste von Tupeln (Modul, Name der b-thread-Factory, Argumente).
+    :param workers: Die Anzahl der Prozesse, None für die Anzahl der CPU-Kerne.
+    :param timeout: Die maximale Laufzeit je Szenario in Sekunden, None für keine Begrenzung.
+    :param chunksize: Die Anzahl der Szenarien, die zusammen an einen Prozess übergeben werden. Bei vielen kurzen
+    Szenarien verringern größere Werte den Aufwand für die Kommunikation zwischen den Prozessen, die Ergebnisse
+    werden dann jeweils gemeinsam zurückgegeben, wenn alle Szenarien eines Pakets fertig sind.
+    :param fail_fast: Ob Läufe nach der ersten Verletzung eines Constraints beendet werden.
+    :return: Generator, der die Ergebnisse von run_scenario in der Reihenfolge ihrer Fertigstellung liefert.
+    """
+    scenarios = [(module, name, tuple(args)) for module, name, args in scenarios]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                run_scenarios, scenarios[i : i + chunksize], timeout, fail_fast
+            )
+            for i in range(0, len(scenarios), chunksize)
+        ]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def _raise_timeout(signum, frame):
+    raise RunTimeoutError()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Führt die Demo-Szenarien parallel mit den Constraints aus."
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Wiederholungen der Demo-Kampagne."
+    )
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--chunksize", type=int, default=1)
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Beendet Läufe nach der ersten Verletzung eines Constraints.",
+    )
+    parser.add_argument(
+        "--quiet", action="store_true", help="Gibt nur die Zusammenfassung aus."
+    )
+    args = parser.parse_args()
+
+    counts = {FINISHED: 0, STOPPED: 0, TIMEOUT: 0, ERROR: 0}
+    statuses = {
+        name: {SATISFIED: 0, VIOLATED: 0, PENDING: 0} for name in CONSTRAINT_NAMES
+    }
+    failed = 0
+    events = 0
+    start = time.perf_counter()
+    for result in run_campaign(
+        DEMO_CAMPAIGN * args.repeat,
+        args.workers,
+        args.timeout,
+        args.chunksize,
+        args.fail_fast,
+    ):
+        counts[result["status"]] += 1
+        failed += not result["passed"]
+        events += result["events"]
+        for name, status in result["statuses"].items():
+            statuses[name][status] += 1
+        if not args.quiet:
+            violations = [
+                name
+                for name, status in result["statuses"].items()
+                if status == VIOLATED
+            ]
+            print(
+                "{} {}: {}".format(
+                    result["name"],
+                    result["status"],
+                    result["error"]
+                    or ", ".join(violations)
+                    or "alle Constraints erfüllt",
+                )
+            )
+    seconds = time.perf_counter() - start
+    runs = sum(counts.values())
+    print(
+        "{} Läufe ({} beendet, {} vorzeitig beendet, {} Timeout, {} Fehler), {} nicht bestanden, "
+        "{:.2f} s mit {} Prozessen: {:.1f} Läufe/s, {:.0f} Events/s".format(
+            runs,
+            counts[FINISHED],
+            counts[STOPPED],
+            counts[TIMEOUT],
+            counts[ERROR],
+            failed,
+            seconds,
+            args.workers,
+            runs / seconds,
+            events / seconds,
+        )
+    )
+    for name, constraint_statuses in statuses.items():
+        print(
+            "{}: {} erfüllt, {} verletzt, {} offen".format(
+                name,
+                constraint_statuses[SATISFIED],
+                constraint_statuses[VIOLATED],
+                constraint_statuses[PENDING],
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
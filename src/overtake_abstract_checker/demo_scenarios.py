@@ -11,40 +11,208 @@ Folgende Simulationen sind enthalten:
   - invalid_functional_action_simulation: Verletzung der Functional Action Constraint
       (Intervall zwischen LANE_CHANGE und SPEED_UP zu kurz).
   - invalid_speed_simulation: Verletzung der Speed Limit Constraint (Geschwindigkeit außerhalb des zulässigen Bereichs).
+
+Mit frames=True senden die Simulationen je Schritt ein einzelnes STEP_FRAME-Event mit allen Daten des Schritts,
+statt STEP, POSITION_UPDATE, LANE_CHANGE, SPEED_UP und SPEED_UPDATE einzeln (siehe make_step_frame). Die Verdicts
+sind in beiden Modi dieselben, mit STEP_FRAME ist aber nur eine Event-Auswahl je Schritt nötig.
+
+Die Factory-Methoden erzeugen möglichst wenige Objekte: STEP und END sind Singletons (STEP_EVENT, END_EVENT), die als
+FrozenEvent nicht verändert werden können, die Payloads der übrigen Events sind Payload-Objekte mit festen Feldern in __slots__ statt Dicts. Sie
+verhalten sich wie unveränderliche Mappings (get, [], Vergleich mit Dicts), BPpy und die Constraints können sie
+daher wie die bisherigen Dicts verwenden.
 """
 
+from collections.abc import Mapping
+
 from bppy import BEvent, sync, thread
-from overtake_constraints import (END_RELATIVE_POS, MAX_SIM_STEPS,
-                                  START_RELATIVE_POS)
+from overtake_constraints import END_RELATIVE_POS, MAX_SIM_STEPS, START_RELATIVE_POS
+
+
+class Payload(Mapping):
+    """
+    Payload eines Events mit den in __slots__ der Unterklasse festgelegten Feldern. Felder mit dem Wert None oder
+    False gelten als nicht gesetzt und sind nicht Teil des Mappings, wie ein fehlender Schlüssel im Dict. Der
+    Vergleich erfolgt über die Identität, boolesche Felder müssen daher im Konstruktor mit bool() normalisiert
+    werden (np.False_ ist nicht False). Ein Payload wird nach dem Erzeugen nicht mehr verändert.
+    Der Payload ohne Felder ist der leere Payload der Singletons STEP_EVENT und END_EVENT.
+    """
+
+    __slots__ = ()
+
+    def get(self, key, default=None):
+        # schneller als Mapping.get, das fehlende Schlüssel über KeyError erkennt
+        if key in self.__slots__:
+            value = getattr(self, key)
+            if value is not None and value is not False:
+                return value
+        return default
+
+    def items(self):
+        # BEvent vergleicht und hasht über frozenset(data.items()), eine Liste ist dafür schneller als ItemsView
+        items = []
+        for key in self.__slots__:
+            value = getattr(self, key)
+            if value is not None and value is not False:
+                items.append((key, value))
+        return items
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        for key in self.__slots__:
+            value = getattr(self, key)
+            if value is not None and value is not False:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class PositionPayload(Payload):
+    __slots__ = ("distance_to_vut",)
+
+    def __init__(self, distance_to_vut: float):
+        self.distance_to_vut = distance_to_vut
+
+
+class SpeedPayload(Payload):
+    __slots__ = ("speed",)
+
+    def __init__(self, speed: float):
+        self.speed = speed
+
+
+class ActionPayload(Payload):
+    """
+    Payload von LANE_CHANGE und SPEED_UP.
+    """
+
+    __slots__ = ("step",)
+
+    def __init__(self, step: int):
+        self.step = step
+
+
+class StepFramePayload(Payload):
+    __slots__ = ("distance_to_vut", "speed", "lane_change", "speed_up")
+
+    def __init__(
+        self,
+        distance_to_vut: float = None,
+        speed: float = None,
+        lane_change: bool = False,
+        speed_up: bool = False,
+    ):
+        self.distance_to_vut = distance_to_vut
+        self.speed = speed
+        # z.B. np.False_ aus einem Vergleich von Arrays gilt sonst als gesetzt
+        self.lane_change = bool(lane_change)
+        self.speed_up = bool(speed_up)
+
+
+class FrozenEvent(BEvent):
+    """
+    BEvent, dessen Name und Payload nach dem Erzeugen nicht mehr zugewiesen werden können. Die Singletons werden von
+    allen Simulationen und Checkern geteilt, eine Zuweisung würde sie überall verändern.
+    """
+
+    def __init__(self, name="", data=None):
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "data", data if data is not None else Payload())
+
+    def __setattr__(self, key, value):
+        raise AttributeError("FrozenEvent {} is immutable.".format(self.name))
+
+    def __delattr__(self, key):
+        raise AttributeError("FrozenEvent {} is immutable.".format(self.name))
+
+
+STEP_EVENT = FrozenEvent("STEP")
+END_EVENT = FrozenEvent("END")
 
 
 # Neue, spezifische Factory-Methoden für Events:
 def make_position_update(distance: float) -> BEvent:
-    return BEvent("POSITION_UPDATE", data={"distance_to_vut": distance})
+    return BEvent("POSITION_UPDATE", PositionPayload(distance))
 
 
 def make_step() -> BEvent:
-    return BEvent("STEP")
+    return STEP_EVENT
 
 
 def make_lane_change(step: int) -> BEvent:
-    return BEvent("LANE_CHANGE", data={"step": step})
+    return BEvent("LANE_CHANGE", ActionPayload(step))
 
 
 def make_speed_up(step: int) -> BEvent:
-    return BEvent("SPEED_UP", data={"step": step})
+    return BEvent("SPEED_UP", ActionPayload(step))
 
 
 def make_speed_update(speed: float) -> BEvent:
-    return BEvent("SPEED_UPDATE", data={"speed": speed})
+    return BEvent("SPEED_UPDATE", SpeedPayload(speed))
+
+
+def make_step_frame(
+    distance_to_vut: float = None,
+    speed: float = None,
+    lane_change: bool = False,
+    speed_up: bool = False,
+) -> BEvent:
+    """
+    Event für einen vollständigen Schritt, gleichbedeutend mit STEP, gefolgt von POSITION_UPDATE, LANE_CHANGE,
+    SPEED_UP und SPEED_UPDATE. Die Nummer des Schritts für LANE_CHANGE und SPEED_UP zählen die Constraints selbst.
+    :param distance_to_vut: Die relative Position des Agenten zum VUT, None, wenn sie nicht aktualisiert wird.
+    :param speed: Die Geschwindigkeit des Agenten, None, wenn sie nicht aktualisiert wird.
+    :param lane_change: Ob der Agent in diesem Schritt die Spur gewechselt hat.
+    :param speed_up: Ob der Agent in diesem Schritt beschleunigt hat.
+    """
+    return BEvent(
+        "STEP_FRAME", StepFramePayload(distance_to_vut, speed, lane_change, speed_up)
+    )
 
 
 def make_end() -> BEvent:
-    return BEvent("END")
+    return END_EVENT
+
+
+def step_syncs(
+    step: int,
+    distance_to_vut: float = None,
+    speed: float = None,
+    lane_change: bool = False,
+    speed_up: bool = False,
+    frames: bool = False,
+):
+    """
+    Fordert die Events eines Schritts an, mit frames als ein STEP_FRAME, sonst einzeln in der Reihenfolge STEP,
+    POSITION_UPDATE, LANE_CHANGE, SPEED_UP, SPEED_UPDATE. Aufruf in einer Simulation mit yield from.
+    :param step: Die Nummer des Schritts, beginnend bei 1.
+    """
+    if frames:
+        yield sync(
+            request=make_step_frame(distance_to_vut, speed, lane_change, speed_up)
+        )
+        return
+    yield sync(request=make_step())
+    if distance_to_vut is not None:
+        yield sync(request=make_position_update(distance_to_vut))
+    if lane_change:
+        yield sync(request=make_lane_change(step))
+    if speed_up:
+        yield sync(request=make_speed_up(step))
+    if speed is not None:
+        yield sync(request=make_speed_update(speed))
 
 
 @thread
-def valid_demo_simulation():
+def valid_demo_simulation(frames: bool = False):
     """
     Simuliert exemplarisch Events für das Szenario:
       - Initiale POSITION_UPDATE mit START_RELATIVE_POS. (Startposition: 50m hinter VUT)
@@ -53,142 +221,103 @@ def valid_demo_simulation():
       - SPEED_UPDATE-Events mit zulässiger Geschwindigkeit.
       - Abschließende POSITION_UPDATE mit END_RELATIVE_POS.
       - Am Ende wird ein END-Event gesendet.
+    :param frames: Ob je Schritt ein STEP_FRAME statt der einzelnen Events gesendet wird.
     """
-    step = 0
     # Startposition
     yield sync(request=make_position_update(START_RELATIVE_POS))
-    while True:
-        step += 1
-        yield sync(request=make_step())
-
-        if step == MAX_SIM_STEPS:
-            yield sync(request=make_position_update(END_RELATIVE_POS))
-        else:
-            yield sync(request=make_position_update(0))
-
-        if step == 2:
-            yield sync(request=make_lane_change(step))
-        if step == 15:
-            yield sync(request=make_speed_up(step))
-
-        yield sync(request=make_speed_update(20.0))
-
-        if step >= MAX_SIM_STEPS:
-            break
+    for step in range(1, MAX_SIM_STEPS + 1):
+        yield from step_syncs(
+            step,
+            END_RELATIVE_POS if step == MAX_SIM_STEPS else 0,
+            20.0,
+            lane_change=step == 2,
+            speed_up=step == 15,
+            frames=frames,
+        )
 
     yield sync(request=make_end())
 
 
 @thread
-def invalid_position_simulation():
+def invalid_position_simulation(frames: bool = False):
     """
     Simulation, die die Position Constraint verletzt.
     Hier werden falsche Start- und Endpositionen gesendet.
+    :param frames: Ob je Schritt ein STEP_FRAME statt der einzelnen Events gesendet wird.
     """
-    step = 0
     # Falsche Startposition: statt -50 wird 0 gesendet.
     yield sync(request=make_position_update(0))
-    while True:
-        step += 1
-        yield sync(request=make_step())
-
-        # Immer falsche Positionsupdates
-        yield sync(request=make_position_update(0))
-
-        if step == MAX_SIM_STEPS:
-            # Falsche Endposition: statt 50 wird 0 gesendet.
-            yield sync(request=make_position_update(0))
-            break
-
-        if step == 2:
-            yield sync(request=make_lane_change(step))
-        if step == 15:
-            yield sync(request=make_speed_up(step))
-
-        yield sync(request=make_speed_update(20.0))
+    for step in range(1, MAX_SIM_STEPS + 1):
+        # Immer falsche Positionsupdates, auch am Ende: statt 50 wird 0 gesendet.
+        yield from step_syncs(
+            step,
+            0,
+            None if step == MAX_SIM_STEPS else 20.0,
+            lane_change=step == 2,
+            speed_up=step == 15,
+            frames=frames,
+        )
     yield sync(request=make_end())
 
 
 @thread
-def invalid_duration_simulation():
+def invalid_duration_simulation(frames: bool = False):
     """
     Simulation, die die Duration Constraint verletzt, indem sie zu wenige STEP-Events liefert.
     Hier wird die Simulation bereits nach 5 Steps beendet (5 < MIN_SIM_STEPS).
+    :param frames: Ob je Schritt ein STEP_FRAME statt der einzelnen Events gesendet wird.
     """
-    step = 0
     yield sync(request=make_position_update(START_RELATIVE_POS))
-    while True:
-        step += 1
-        yield sync(request=make_step())
-        yield sync(request=make_position_update(0))
-
-        if step == 2:
-            yield sync(request=make_lane_change(step))
-        if step == 3:
-            yield sync(request=make_speed_up(step))
-
-        yield sync(request=make_speed_update(20.0))
-        if step >= 5:
-            break
+    for step in range(1, 6):
+        yield from step_syncs(
+            step,
+            0,
+            20.0,
+            lane_change=step == 2,
+            speed_up=step == 3,
+            frames=frames,
+        )
     yield sync(request=make_end())
 
 
 @thread
-def invalid_functional_action_simulation():
+def invalid_functional_action_simulation(frames: bool = False):
     """
     Simulation, die die Functional Action Constraint verletzt,
     indem das Intervall zwischen LANE_CHANGE und SPEED_UP zu kurz ist.
     Hier wird LANE_CHANGE bei Step 2 und SPEED_UP bereits bei Step 5 gesendet (Intervall = 3, zu kurz).
+    :param frames: Ob je Schritt ein STEP_FRAME statt der einzelnen Events gesendet wird.
     """
-    step = 0
     yield sync(request=make_position_update(START_RELATIVE_POS))
-    while True:
-        step += 1
-        yield sync(request=make_step())
-
-        if step == MAX_SIM_STEPS:
-            yield sync(request=make_position_update(END_RELATIVE_POS))
-        else:
-            yield sync(request=make_position_update(0))
-
-        if step == 2:
-            yield sync(request=make_lane_change(step))
-        if step == 5:
-            yield sync(request=make_speed_up(step))
-
-        yield sync(request=make_speed_update(20.0))
-
-        if step >= MAX_SIM_STEPS:
-            break
+    for step in range(1, MAX_SIM_STEPS + 1):
+        yield from step_syncs(
+            step,
+            END_RELATIVE_POS if step == MAX_SIM_STEPS else 0,
+            20.0,
+            lane_change=step == 2,
+            speed_up=step == 5,
+            frames=frames,
+        )
     yield sync(request=make_end())
 
 
 @thread
-def invalid_speed_simulation():
+def invalid_speed_simulation(frames: bool = False):
     """
     Simulation, die die Speed Limit Constraint verletzt,
     indem ein SPEED_UPDATE-Event eine Geschwindigkeit außerhalb des zulässigen Bereichs meldet.
     Hier wird z. B. eine Geschwindigkeit von 30.0 m/s gesendet (über MAX_SPEED).
+    :param frames: Ob je Schritt ein STEP_FRAME statt der einzelnen Events gesendet wird.
     """
-    step = 0
     yield sync(request=make_position_update(START_RELATIVE_POS))
-    while True:
-        step += 1
-        yield sync(request=make_step())
-
-        if step == MAX_SIM_STEPS:
-            yield sync(request=make_position_update(END_RELATIVE_POS))
-        else:
-            yield sync(request=make_position_update(0))
-
-        if step == 2:
-            yield sync(request=make_lane_change(step))
-        if step == 15:
-            yield sync(request=make_speed_up(step))
-
+    for step in range(1, MAX_SIM_STEPS + 1):
         # Verletzung: Geschwindigkeit außerhalb des zulässigen Bereichs (z. B. 30.0 m/s)
-        yield sync(request=make_speed_update(30.0))
-
-        if step >= MAX_SIM_STEPS:
-            break
+        yield from step_syncs(
+            step,
+            END_RELATIVE_POS if step == MAX_SIM_STEPS else 0,
+            30.0,
+            lane_change=step == 2,
+            speed_up=step == 15,
+            frames=frames,
+        )
     yield sync(request=make_end())
@@ -0,0 +1,95 @@
+"""
+Online-Prüfung der Constraints des abstrakten Überholszenarios direkt aus der Schleife, die env.step() aufruft.
+
+Anders als beim Abspielen mit BProgram.run() gibt es keinen b-thread, der die Events anfordert: Die Schleife übergibt
+die Events eines Simulationsschritts mit send() und fragt vor dem nächsten env.step() mit step_allowed(), ob der
+Lauf fortgesetzt werden soll. Ist ein Constraint verletzt, blockiert er im fail-fast-Modus weitere STEP-Events und
+der Lauf kann abgebrochen werden, statt die Episode bis zum Ende zu simulieren.
+
+Beispiel:
+    checker = OnlineChecker(fail_fast=True)
+    while checker.step_allowed():
+        obs, reward, terminated, truncated, info = env.step(action)
+        checker.send(make_step())
+        checker.send(make_position_update(distance_to_vut))
+        checker.send(make_speed_update(speed))
+        if terminated or truncated:
+            break
+    verdicts = checker.end()
+"""
+
+from bppy import BEvent, BProgram
+from demo_scenarios import END_EVENT, STEP_EVENT
+from overtake_abstract_checker import (
+    OnlineMonitor,
+    SubscriptionEventSelectionStrategy,
+    get_checker_threads,
+)
+
+
+class OnlineChecker:
+    """
+    Treibt die Constraints Event für Event ohne BProgram.run().
+
+    :attribute monitor: Der OnlineMonitor mit dem aktuellen Zustand je Constraint und den Verdicts.
+    :attribute ended: True, sobald das END-Event übergeben wurde.
+    """
+
+    def __init__(self, fail_fast: bool = True, log: bool = False):
+        """
+        :param fail_fast: Ob verletzte Constraints weitere STEP-Events blockieren.
+        :param log: Ob die Constraints ihre Ergebnisse am Ende loggen.
+        """
+        self.monitor = OnlineMonitor(fail_fast)
+        self.ended = False
+        self.__bp = BProgram(
+            bthreads=get_checker_threads(self.monitor, log),
+            event_selection_strategy=SubscriptionEventSelectionStrategy(),
+        )
+        self.__bp.setup()
+
+    @property
+    def status(self) -> str:
+        """
+        :return: Der Gesamtzustand des Laufs (siehe OnlineMonitor.status).
+        """
+        return self.monitor.status
+
+    def is_blocked(self, event: BEvent) -> bool:
+        """
+        :return: True, wenn ein Constraint das Event aktuell blockiert.
+        """
+        for ticket in self.__bp.tickets:
+            block = ticket.get("block")
+            if block is None:
+                continue
+            if block == event if isinstance(block, BEvent) else event in block:
+                return True
+        return False
+
+    def step_allowed(self) -> bool:
+        """
+        :return: False, wenn der Lauf beendet ist oder ein verletzter Constraint weitere STEP-Events blockiert.
+        """
+        return not self.ended and not self.is_blocked(STEP_EVENT)
+
+    def send(self, event: BEvent) -> bool:
+        """
+        Übergibt ein Event an die Constraints.
+        :return: False, wenn das Event nicht verarbeitet wurde, weil der Lauf beendet ist oder das Event blockiert
+        ist.
+        """
+        if self.ended or self.is_blocked(event):
+            return False
+        self.__bp.advance_bthreads(self.__bp.tickets, event)
+        if event.name == END_EVENT.name:
+            self.ended = True
+        return True
+
+    def end(self) -> list:
+        """
+        Übergibt das END-Event, falls noch nicht geschehen, sodass alle Constraints ein Verdict liefern.
+        :return: Die Verdicts der Constraints.
+        """
+        self.send(END_EVENT)
+        return self.monitor.verdicts
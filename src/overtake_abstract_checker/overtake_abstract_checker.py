@@ -9,6 +9,12 @@ Constraints:
 
 Alle Constraints warten abschließend auf ein END-Event, das am Ende der Simulation ausgelöst wird.
 Hinweis: Zum Vergleich von Events verwenden wir ausschließlich Matcher-Funktionen, die den Event-Namen prüfen.
+Jeder Constraint wartet nur auf die für ihn relevanten Events und END (siehe EventNameSet), andere Events wecken
+den b-thread nicht auf.
+Am Ende übergibt jeder Constraint ein Verdict an einen optionalen VerdictSink (siehe get_checker_threads). Das
+Logging der Ergebnisse kann abgeschaltet werden.
+Mit einem OnlineMonitor als Sink melden die Constraints zusätzlich nach jedem Event, sobald sie entschieden sind
+(SATISFIED oder VIOLATED), und blockieren mit fail_fast nach einer Verletzung alle weiteren STEP-Events.
 
 
 Vorgaben zur Nutzung:
@@ -18,23 +24,40 @@ In jeder Iteration müssen gesendet werden:
    Dabei ist der Wert von "distance_to_vut" die relative Position (Entfernung in Meter) des Agenten zum VUT.
 -- Ein Event mit dem Namen "STEP" wird gesendet, um die Simulationsschritte zu zählen.
 -- Ein Event mit dem Namen "SPEED_UPDATE" und dem Payload-Feld "speed" wird gesendet, um die Geschwindigkeit des Agenten zu aktualisieren.
+POSITION_UPDATE und SPEED_UPDATE dürfen entfallen, solange sich der Wert nicht wesentlich geändert hat und die
+Bedingungen der Constraints (Start-/Endposition, Geschwindigkeitsgrenzen) für ihn gleich ausfallen. Bis zum nächsten
+Update gilt der zuletzt gesendete Wert (siehe event_bridge.EventBridge im Paket src).
 
 Optional können folgende Events gesendet werden:
 -- Ein Event mit dem Namen "LANE_CHANGE" wird gesendet, wenn der Agent die Spur wechselt.
 -- Ein Event mit dem Namen "SPEED_UP" wird gesendet, wenn der Agent positiv beschleunigt.
 
+Statt der einzelnen Events kann je Schritt ein Event mit dem Namen "STEP_FRAME" gesendet werden. Es steht für
+STEP, gefolgt von POSITION_UPDATE (Payload-Feld "distance_to_vut"), LANE_CHANGE (Payload-Feld "lane_change": True),
+SPEED_UP (Payload-Feld "speed_up": True) und SPEED_UPDATE (Payload-Feld "speed"), jeweils nur, wenn das Feld gesetzt
+ist (siehe demo_scenarios.make_step_frame). Die Nummer des Schritts für LANE_CHANGE und SPEED_UP ergibt sich aus der
+Anzahl der Schritte. Damit genügt eine Event-Auswahl je Schritt statt drei oder mehr. Die Initiale POSITION_UPDATE
+wird weiterhin einzeln vor dem ersten Schritt gesendet.
+
 Am Ende der Simulation muss ein Event mit dem Namen "END" gesendet werden, damit die Constraints abschließend
 ausgewertet werden können.
 """
 
 import logging
+from typing import NamedTuple
 
 import demo_scenarios
-from bppy import All, BProgram, SimpleEventSelectionStrategy, sync, thread
-from overtake_constraints import (END_RELATIVE_POS, MAX_ACTION_INTERVAL_STEPS,
-                                  MAX_SIM_STEPS, MAX_SPEED,
-                                  MIN_ACTION_INTERVAL_STEPS, MIN_SIM_STEPS,
-                                  MIN_SPEED, START_RELATIVE_POS)
+from bppy import BEvent, BProgram, EventSet, SimpleEventSelectionStrategy, sync, thread
+from overtake_constraints import (
+    END_RELATIVE_POS,
+    MAX_ACTION_INTERVAL_STEPS,
+    MAX_SIM_STEPS,
+    MAX_SPEED,
+    MIN_ACTION_INTERVAL_STEPS,
+    MIN_SIM_STEPS,
+    MIN_SPEED,
+    START_RELATIVE_POS,
+)
 
 # Logging konfigurieren
 logging.basicConfig(
@@ -45,53 +68,354 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class EventNameSet(EventSet):
+    """
+    EventSet aller Events mit einem der übergebenen Namen.
+    Die Zugehörigkeit wird direkt über den Namen geprüft. EventSet.__contains__ ermittelt bei jeder Prüfung die
+    Signatur des Prädikats, was bei vielen Events einen Großteil der Laufzeit ausmacht.
+    """
+
+    def __init__(self, *names):
+        self.names = frozenset(names)
+        super().__init__(lambda e: e.name in self.names)
+
+    def __contains__(self, event):
+        return event.name in self.names
+
+    def __hash__(self):
+        return hash(self.names)
+
+    def __eq__(self, other):
+        return isinstance(other, EventNameSet) and self.names == other.names
+
+    def __str__(self):
+        return "EventNameSet({})".format(", ".join(sorted(self.names)))
+
+
+class SubscriptionEventSelectionStrategy(SimpleEventSelectionStrategy):
+    """
+    SimpleEventSelectionStrategy, die fehlende request-, waitFor- und block-Angaben eines sync-Statements
+    überspringt. SimpleEventSelectionStrategy setzt dafür je Prüfung ein EmptyEventSet ein, dessen Prüfung über
+    EventSet.__contains__ genauso teuer ist wie die eines echten EventSets. Die Auswahl der Events und die
+    Entscheidung, welche b-threads fortgesetzt werden, sind identisch.
+    """
+
+    def is_satisfied(self, event, statement):
+        block = statement.get("block")
+        if block is not None and self.__contains(block, event):
+            return False
+        request = statement.get("request")
+        if request is not None and self.__contains(request, event):
+            return True
+        wait_for = statement.get("waitFor")
+        return wait_for is not None and self.__contains(wait_for, event)
+
+    @staticmethod
+    def __contains(events, event):
+        if isinstance(events, BEvent):
+            # das ausgewählte Event ist meist genau das angeforderte Objekt, der Vergleich über die Payloads entfällt
+            return events is event or events == event
+        return event in events
+
+
+class Verdict(NamedTuple):
+    """
+    Ergebnis eines Constraints für einen Lauf.
+
+    :attribute name: Der Name des Constraints (siehe CONSTRAINT_NAMES).
+    :attribute passed: True, wenn der Constraint erfüllt ist.
+    :attribute counters: Die Zähler und Zustände des Constraints am Ende des Laufs.
+    :attribute first_violation_step: Die Anzahl der STEP-Events bis zur ersten erkannten Verletzung, None wenn der
+    Constraint erfüllt ist. Verletzungen, die erst am Ende erkannt werden (z.B. fehlende Endposition), werden mit
+    der Anzahl aller STEP-Events angegeben.
+    """
+
+    name: str
+    passed: bool
+    counters: dict
+    first_violation_step: int = None
+
+
+CONSTRAINT_NAMES = ("position", "duration", "functional_action", "speed_limit")
+
+SATISFIED = "satisfied"
+VIOLATED = "violated"
+PENDING = "pending"
+
+
+class VerdictSink:
+    """
+    Sammelt die Verdicts der Constraints und zählt je Constraint die erfüllten und verletzten Läufe.
+    Sinks mehrerer Läufe oder Prozesse können mit merge zusammengeführt werden, ohne die Verdicts erneut
+    auszuwerten.
+
+    :attribute verdicts: Die gesammelten Verdicts, sofern keep_verdicts gesetzt ist.
+    :attribute passed: Dict mit der Anzahl der erfüllten Läufe je Constraint.
+    :attribute failed: Dict mit der Anzahl der verletzten Läufe je Constraint.
+    :attribute fail_fast: Ob verletzte Constraints weitere STEP-Events blockieren (siehe OnlineMonitor).
+    """
+
+    fail_fast = False
+
+    def __init__(self, keep_verdicts: bool = True):
+        self.keep_verdicts = keep_verdicts
+        self.verdicts = []
+        self.passed = {}
+        self.failed = {}
+
+    def publish(self, verdict: Verdict):
+        if self.keep_verdicts:
+            self.verdicts.append(verdict)
+        counts = self.passed if verdict.passed else self.failed
+        counts[verdict.name] = counts.get(verdict.name, 0) + 1
+
+    def update(self, name: str, status: str):
+        """
+        Wird von den Constraints aufgerufen, sobald sie vor dem END-Event entschieden sind. Ein VerdictSink
+        ignoriert diese Zwischenstände.
+        :param name: Der Name des Constraints.
+        :param status: SATISFIED oder VIOLATED.
+        """
+        pass
+
+    def merge(self, other: "VerdictSink"):
+        """
+        Übernimmt die Verdicts und Zählungen eines anderen Sinks.
+        """
+        if self.keep_verdicts:
+            self.verdicts.extend(other.verdicts)
+        for counts, other_counts in (
+            (self.passed, other.passed),
+            (self.failed, other.failed),
+        ):
+            for name, count in other_counts.items():
+                counts[name] = counts.get(name, 0) + count
+
+    def summary(self) -> dict:
+        """
+        :return: Dict je Constraint mit der Anzahl der erfüllten ("passed") und verletzten ("failed") Läufe.
+        """
+        return {
+            name: {
+                "passed": self.passed.get(name, 0),
+                "failed": self.failed.get(name, 0),
+            }
+            for name in sorted(self.passed.keys() | self.failed.keys())
+        }
+
+
+class StepCounter:
+    """
+    Anzahl der STEP-Events eines Laufs. Nur duration_constraint abonniert STEP und zählt, die übrigen Constraints
+    lesen den Stand, wenn sie eine Verletzung erkennen oder eine Aktion zuordnen. So werden sie nicht bei jedem
+    Schritt geweckt. Ein STEP ist gezählt, bevor das nächste Event ausgewählt wird.
+
+    STEP_FRAME abonnieren dagegen alle Constraints. Würde es hier gezählt, hinge der Stand, den die übrigen
+    Constraints beim selben STEP_FRAME lesen, davon ab, ob duration_constraint vor ihnen fortgesetzt wird. Jeder
+    Constraint zählt die STEP_FRAMEs daher selbst in seiner StepClock (siehe clock).
+
+    :attribute steps: Die Anzahl der bisherigen STEP-Events.
+    """
+
+    __slots__ = ("steps",)
+
+    def __init__(self):
+        self.steps = 0
+
+    def clock(self) -> "StepClock":
+        return StepClock(self)
+
+
+class StepClock:
+    """
+    Sicht eines Constraints auf den StepCounter des Laufs, fortgeschrieben mit jedem Event, das der Constraint
+    erhält (siehe __wait).
+
+    :attribute count: Die Anzahl der bisherigen Schritte einschließlich des zuletzt erhaltenen Events (STEP_FRAME
+    zählt als STEP).
+    """
+
+    __slots__ = ("counter", "frames")
+
+    def __init__(self, counter: StepCounter):
+        self.counter = counter
+        self.frames = 0
+
+    def observe(self, event):
+        if event.name == "STEP_FRAME":
+            self.frames += 1
+
+    @property
+    def count(self) -> int:
+        return self.counter.steps + self.frames
+
+
+class OnlineMonitor(VerdictSink):
+    """
+    VerdictSink für einen einzelnen Lauf, der nach jedem Event den aktuellen Zustand jedes Constraints kennt:
+    SATISFIED oder VIOLATED, sobald das Ergebnis feststeht, sonst PENDING. Mit dem END-Event sind alle Constraints
+    entschieden.
+
+    Mit fail_fast blockiert ein verletzter Constraint alle weiteren STEP-Events, da das Ergebnis des Laufs feststeht.
+    Die Schleife, die env.step() aufruft, kann den Lauf dann beenden (siehe online_checker.OnlineChecker).
+
+    :attribute statuses: Dict mit dem aktuellen Zustand je Constraint.
+    """
+
+    def __init__(self, fail_fast: bool = True, keep_verdicts: bool = True):
+        super().__init__(keep_verdicts)
+        self.fail_fast = fail_fast
+        self.statuses = dict.fromkeys(CONSTRAINT_NAMES, PENDING)
+
+    def update(self, name: str, status: str):
+        self.statuses[name] = status
+
+    def publish(self, verdict: Verdict):
+        super().publish(verdict)
+        self.statuses[verdict.name] = SATISFIED if verdict.passed else VIOLATED
+
+    @property
+    def status(self) -> str:
+        """
+        :return: VIOLATED, sobald ein Constraint verletzt ist, SATISFIED, wenn alle Constraints erfüllt sind,
+        sonst PENDING.
+        """
+        statuses = self.statuses.values()
+        if VIOLATED in statuses:
+            return VIOLATED
+        if all(status == SATISFIED for status in statuses):
+            return SATISFIED
+        return PENDING
+
+
+# STEP_FRAME enthält die Updates aller Constraints und wird daher von allen abonniert, STEP nur von
+# duration_constraint (siehe StepCounter)
+POSITION_EVENTS = EventNameSet("POSITION_UPDATE", "STEP_FRAME", "END")
+DURATION_EVENTS = EventNameSet("STEP", "STEP_FRAME", "END")
+STEP_EVENTS = EventNameSet("STEP", "STEP_FRAME")
+FUNCTIONAL_ACTION_EVENTS = EventNameSet("LANE_CHANGE", "SPEED_UP", "STEP_FRAME", "END")
+SPEED_LIMIT_EVENTS = EventNameSet("SPEED_UPDATE", "STEP_FRAME", "END")
+# solange die zuletzt gemeldete Geschwindigkeit außerhalb der Grenzen liegt, zählt jeder Schritt ohne Update
+SPEED_LIMIT_HOLD_EVENTS = EventNameSet("SPEED_UPDATE", "STEP", "STEP_FRAME", "END")
+
+
+def __is_step_frame(e):
+    return e.name == "STEP_FRAME"
+
+
 def __is_position_update(e):
-    return e.name == "POSITION_UPDATE"
+    return e.name == "POSITION_UPDATE" or __is_step_frame(e)
 
 
 def __is_step(e):
-    return e.name == "STEP"
+    return e.name == "STEP" or __is_step_frame(e)
 
 
 def __is_lane_change(e):
-    return e.name == "LANE_CHANGE"
+    return e.name == "LANE_CHANGE" or (
+        __is_step_frame(e) and e.data.get("lane_change", False)
+    )
 
 
 def __is_speed_up(e):
-    return e.name == "SPEED_UP"
+    return e.name == "SPEED_UP" or (
+        __is_step_frame(e) and e.data.get("speed_up", False)
+    )
 
 
 def __is_speed_update(e):
-    return e.name == "SPEED_UPDATE"
+    return e.name == "SPEED_UPDATE" or __is_step_frame(e)
+
+
+def __action_step(e, step_count):
+    # STEP_FRAME enthält keine Schrittnummer, die Aktion gehört zum aktuellen Schritt
+    if __is_step_frame(e):
+        return step_count
+    return e.data.get("step", 0)
 
 
 def __is_end(e):
     return e.name == "END"
 
 
+def __is_speed_violation(speed):
+    return speed is not None and (speed < MIN_SPEED or speed > MAX_SPEED)
+
+
+def __publish(sink, verdict):
+    if sink is not None:
+        sink.publish(verdict)
+
+
+def __update(sink, name, status):
+    if sink is not None:
+        sink.update(name, status)
+
+
+def __sync(wait_for, sink, violated):
+    # im fail-fast-Modus blockiert ein verletzter Constraint weitere STEP-Events, das Ergebnis steht fest
+    if violated and sink is not None and sink.fail_fast:
+        return sync(waitFor=wait_for, block=STEP_EVENTS)
+    return sync(waitFor=wait_for)
+
+
+def __wait(clock, wait_for, sink, violated):
+    """
+    Wartet auf das nächste Event (siehe __sync) und schreibt die StepClock des Constraints fort, bevor er das Event
+    auswertet. Aufruf mit evt = yield from __wait(...).
+    """
+    evt = yield __sync(wait_for, sink, violated)
+    clock.observe(evt)
+    return evt
+
+
 @thread
-def position_constraint():
+def position_constraint(sink=None, log=True, steps=None):
     """
     Prüft, ob der Agent zu Beginn am START und am Ende am END ist.
     Erwartet POSITION_UPDATE-Events mit dem Payload-Feld "distance_to_vut" (Angabe der Distanz zwischen Agent und VUT).
+    :param sink: Optionaler VerdictSink, an den das Verdict übergeben wird.
+    :param log: Ob das Ergebnis zusätzlich geloggt wird.
+    :param steps: Der StepCounter, den duration_constraint fortschreibt (siehe get_checker_threads).
     """
+    steps = (steps or StepCounter()).clock()
     start_valid = None
     end_valid = False
+    first_violation_step = None
     while True:
-        evt = yield sync(waitFor=All())
+        evt = yield from __wait(
+            steps, POSITION_EVENTS, sink, first_violation_step is not None
+        )
         if __is_end(evt):
             break
-        if not __is_position_update(evt):
-            continue
         pos = evt.data.get("distance_to_vut")
         if pos is None:
             continue
         if start_valid is None:
             start_valid = pos == START_RELATIVE_POS
+            if not start_valid:
+                first_violation_step = steps.count
+                __update(sink, "position", VIOLATED)
         if pos == END_RELATIVE_POS:
             end_valid = True
+            if start_valid:
+                __update(sink, "position", SATISFIED)
     # Finales Reporting auf Basis des END-Events
-    if start_valid is True and end_valid:
+    passed = start_valid is True and end_valid
+    if not passed and first_violation_step is None:
+        first_violation_step = steps.count
+    __publish(
+        sink,
+        Verdict(
+            "position",
+            passed,
+            {"start_valid": bool(start_valid), "end_valid": end_valid},
+            None if passed else first_violation_step,
+        ),
+    )
+    if not log:
+        return
+    if passed:
         logger.info("Position Constraint erfüllt.")
     else:
         logger.error(
@@ -100,20 +424,41 @@ def position_constraint():
 
 
 @thread
-def duration_constraint():
+def duration_constraint(sink=None, log=True, steps=None):
     """
     Überwacht die Simulationsdauer anhand von STEP-Events.
     Final: Es muss eine Anzahl von Steps zwischen MIN_SIM_STEPS und MAX_SIM_STEPS liegen.
+    :param sink: Optionaler VerdictSink, an den das Verdict übergeben wird.
+    :param log: Ob das Ergebnis zusätzlich geloggt wird.
+    :param steps: Der StepCounter, in dem die STEP-Events für die übrigen Constraints gezählt werden.
     """
-    step_count = 0
+    counter = steps or StepCounter()
+    steps = counter.clock()
     while True:
-        evt = yield sync(waitFor=All())
+        evt = yield from __wait(
+            steps, DURATION_EVENTS, sink, steps.count > MAX_SIM_STEPS
+        )
         if __is_end(evt):
             break
         if not __is_step(evt):
             continue
-        step_count += 1
-    if MIN_SIM_STEPS <= step_count <= MAX_SIM_STEPS:
+        if not __is_step_frame(evt):
+            counter.steps += 1
+        if steps.count == MAX_SIM_STEPS + 1:
+            __update(sink, "duration", VIOLATED)
+    step_count = steps.count
+    passed = MIN_SIM_STEPS <= step_count <= MAX_SIM_STEPS
+    # zu lange Läufe sind mit dem ersten Step über MAX_SIM_STEPS verletzt, zu kurze erst am Ende
+    first_violation_step = None
+    if not passed:
+        first_violation_step = min(step_count, MAX_SIM_STEPS + 1)
+    __publish(
+        sink,
+        Verdict("duration", passed, {"step_count": step_count}, first_violation_step),
+    )
+    if not log:
+        return
+    if passed:
         logger.info("Duration Constraint erfüllt: {} Steps.".format(step_count))
     else:
         logger.error(
@@ -124,29 +469,34 @@ def duration_constraint():
 
 
 @thread
-def functional_action_order():
+def functional_action_order(sink=None, log=True, steps=None):
     """
     Prüft, dass zuerst LANE_CHANGE, dann SPEED_UP auftritt.
     Prüft, dass das Intervall (Payload "step") zwischen den Aktionen in [MIN_ACTION_INTERVAL_STEPS, MAX_ACTION_INTERVAL_STEPS] liegt.
     Zusätzlich müssen mindestens ein LANE_CHANGE und ein SPEED_UP erfolgt sein.
+    :param sink: Optionaler VerdictSink, an den das Verdict übergeben wird.
+    :param log: Ob das Ergebnis zusätzlich geloggt wird.
+    :param steps: Der StepCounter, den duration_constraint fortschreibt (siehe get_checker_threads).
     """
+    steps = (steps or StepCounter()).clock()
     lane_change_step = None
     lane_change_count = 0
     speed_up_count = 0
     valid_time_between_actions = False
     order_violation = False
+    first_violation_step = None
     while True:
-        evt = yield sync(waitFor=All())
+        evt = yield from __wait(steps, FUNCTIONAL_ACTION_EVENTS, sink, order_violation)
         if __is_end(evt):
             break
         if __is_lane_change(evt):
-            lane_change_step = evt.data.get("step", 0)
+            lane_change_step = __action_step(evt, steps.count)
             lane_change_count += 1
-        elif __is_speed_up(evt):
+        if __is_speed_up(evt):
             if lane_change_step is None:
                 order_violation = True
             else:
-                speed_up_step = evt.data.get("step", 0)
+                speed_up_step = __action_step(evt, steps.count)
                 interval = speed_up_step - lane_change_step
                 if MIN_ACTION_INTERVAL_STEPS <= interval <= MAX_ACTION_INTERVAL_STEPS:
                     valid_time_between_actions = True
@@ -154,12 +504,34 @@ def functional_action_order():
                     order_violation = True
                 speed_up_count += 1
                 lane_change_step = None
-    if (
+            if order_violation and first_violation_step is None:
+                first_violation_step = steps.count
+                __update(sink, "functional_action", VIOLATED)
+    passed = (
         lane_change_count >= 1
         and speed_up_count >= 1
         and valid_time_between_actions
         and not order_violation
-    ):
+    )
+    if not passed and first_violation_step is None:
+        first_violation_step = steps.count
+    __publish(
+        sink,
+        Verdict(
+            "functional_action",
+            passed,
+            {
+                "lane_change_count": lane_change_count,
+                "speed_up_count": speed_up_count,
+                "valid_time_between_actions": valid_time_between_actions,
+                "order_violation": order_violation,
+            },
+            None if passed else first_violation_step,
+        ),
+    )
+    if not log:
+        return
+    if passed:
         logger.info("Functional Action Constraint erfüllt.")
     else:
         logger.error(
@@ -173,21 +545,61 @@ def functional_action_order():
 
 
 @thread
-def speed_limit_constraint():
+def speed_limit_constraint(sink=None, log=True, steps=None):
     """
     Stellt sicher, dass alle SPEED_UPDATE-Events (Payload: "speed") innerhalb der zulässigen Grenzen liegen.
+    Ein Schritt ohne SPEED_UPDATE behält die zuletzt gemeldete Geschwindigkeit, liegt sie außerhalb der Grenzen,
+    zählt der Schritt ebenfalls als Verstoß. So ergeben dezimierte Updates (nur bei Änderungen) dieselben Zähler
+    wie ein Update je Schritt. STEP-Events werden dafür nur abonniert, solange die Geschwindigkeit außerhalb der
+    Grenzen liegt.
+    :param sink: Optionaler VerdictSink, an den das Verdict übergeben wird.
+    :param log: Ob das Ergebnis zusätzlich geloggt wird.
+    :param steps: Der StepCounter, den duration_constraint fortschreibt (siehe get_checker_threads).
     """
+    steps = (steps or StepCounter()).clock()
     violation_count = 0
+    first_violation_step = None
+    speed = None
+    # vor dem ersten STEP gibt es keinen Schritt, der die Geschwindigkeit halten könnte
+    updated = True
     while True:
-        evt = yield sync(waitFor=All())
-        if __is_end(evt):
-            break
+        wait_for = (
+            SPEED_LIMIT_HOLD_EVENTS
+            if __is_speed_violation(speed)
+            else SPEED_LIMIT_EVENTS
+        )
+        evt = yield from __wait(steps, wait_for, sink, violation_count > 0)
+        if __is_end(evt) or __is_step(evt):
+            if not updated and __is_speed_violation(speed):
+                violation_count += 1
+            if __is_end(evt):
+                break
+            updated = False
         if not __is_speed_update(evt):
             continue
-        speed = evt.data.get("speed")
-        if speed is not None and (speed < MIN_SPEED or speed > MAX_SPEED):
+        value = evt.data.get("speed")
+        if value is None:
+            continue
+        speed = value
+        updated = True
+        if __is_speed_violation(speed):
             violation_count += 1
-    if violation_count == 0:
+            if first_violation_step is None:
+                first_violation_step = steps.count
+                __update(sink, "speed_limit", VIOLATED)
+    passed = violation_count == 0
+    __publish(
+        sink,
+        Verdict(
+            "speed_limit",
+            passed,
+            {"violation_count": violation_count},
+            first_violation_step,
+        ),
+    )
+    if not log:
+        return
+    if passed:
         logger.info("Speed Limit Constraint erfüllt.")
     else:
         logger.error(
@@ -197,12 +609,19 @@ def speed_limit_constraint():
         )
 
 
-def get_checker_threads():
+def get_checker_threads(sink: VerdictSink = None, log: bool = True):
+    """
+    :param sink: Optionaler VerdictSink, an den jeder Constraint am Ende sein Verdict übergibt.
+    :param log: Ob die Constraints ihre Ergebnisse loggen. Für große Mengen an Läufen sollte ein Sink ohne
+    Logging genutzt werden.
+    """
+    # die Reihenfolge der Threads ist beliebig (siehe StepCounter)
+    steps = StepCounter()
     return [
-        position_constraint(),
-        duration_constraint(),
-        functional_action_order(),
-        speed_limit_constraint(),
+        duration_constraint(sink, log, steps),
+        position_constraint(sink, log, steps),
+        functional_action_order(sink, log, steps),
+        speed_limit_constraint(sink, log, steps),
     ]
 
 
@@ -213,7 +632,7 @@ def main():
     bthreads.extend(get_checker_threads())
     bp = BProgram(
         bthreads=bthreads,
-        event_selection_strategy=SimpleEventSelectionStrategy(),
+        event_selection_strategy=SubscriptionEventSelectionStrategy(),
     )
     bp.run()
 
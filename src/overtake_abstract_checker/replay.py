@@ -0,0 +1,229 @@
+"""
+Offline-Auswertung aufgezeichneter Event-Traces mit den Constraints des abstrakten Überholszenarios.
+
+Ein Trace ist eine JSON-Lines-Datei mit einem Event je Zeile, z.B.:
+  {"name": "POSITION_UPDATE", "data": {"distance_to_vut": -50}}
+  {"name": "STEP"}
+  {"name": "SPEED_UPDATE", "data": {"speed": 20.0}}
+  ...
+  {"name": "END"}
+
+Jeder Trace wird in einem eigenen BProgram zusammen mit get_checker_threads() abgespielt. Endet ein Trace ohne
+END-Event, wird es ergänzt, damit die Constraints abschließend ausgewertet werden. Gymnasium und HighwayEnv werden
+dafür nicht benötigt.
+
+Aufruf (aus diesem Verzeichnis):
+    python replay.py <Verzeichnis mit Traces>
+    python replay.py --export-demo <Verzeichnis>   # schreibt die Simulationen aus demo_scenarios als Traces
+    python replay.py --engine vectorized <Verzeichnis>   # Auswertung mit vectorized_constraints statt b-threads
+"""
+
+import argparse
+import functools
+import json
+import time
+from pathlib import Path
+
+import demo_scenarios
+import vectorized_constraints
+from bppy import All, BEvent, BProgram, sync, thread
+from overtake_abstract_checker import (
+    SubscriptionEventSelectionStrategy,
+    VerdictSink,
+    get_checker_threads,
+)
+
+DEMO_SIMULATIONS = {
+    "valid_demo_simulation": demo_scenarios.valid_demo_simulation,
+    "invalid_position_simulation": demo_scenarios.invalid_position_simulation,
+    "invalid_duration_simulation": demo_scenarios.invalid_duration_simulation,
+    "invalid_functional_action_simulation": demo_scenarios.invalid_functional_action_simulation,
+    "invalid_speed_simulation": demo_scenarios.invalid_speed_simulation,
+}
+
+
+def read_trace(path) -> list:
+    """
+    Liest einen Trace aus einer JSON-Lines-Datei.
+    :return: Die Events des Traces als Liste von BEvents.
+    """
+    with open(path) as trace_file:
+        return [
+            BEvent(record["name"], record.get("data"))
+            for record in map(json.loads, trace_file)
+        ]
+
+
+def write_trace(path, events):
+    """
+    Schreibt die übergebenen BEvents als JSON-Lines-Datei. Events ohne Daten werden ohne "data"-Feld geschrieben.
+    """
+    with open(path, "w") as trace_file:
+        for event in events:
+            record = {"name": event.name}
+            if event.data:
+                record["data"] = dict(event.data)
+            trace_file.write(json.dumps(record) + "\n")
+
+
+@thread
+def trace_replay(events):
+    """
+    Fordert die Events des Traces nacheinander an und ergänzt am Ende ein END-Event, falls es fehlt.
+    """
+    for event in events:
+        yield sync(request=event)
+    if not events or events[-1].name != "END":
+        yield sync(request=BEvent("END"))
+
+
+@thread
+def event_recorder(events):
+    """
+    Hängt jedes ausgewählte Event an die übergebene Liste an.
+    """
+    while True:
+        evt = yield sync(waitFor=All())
+        events.append(evt)
+
+
+def record_trace(simulation_thread) -> list:
+    """
+    Spielt eine Simulation (z.B. aus demo_scenarios) ohne Constraints ab und liefert die erzeugten Events.
+    """
+    events = []
+    bp = BProgram(
+        bthreads=[simulation_thread(), event_recorder(events)],
+        event_selection_strategy=SubscriptionEventSelectionStrategy(),
+    )
+    bp.run()
+    return events
+
+
+def replay_trace(events, sink: VerdictSink = None, log: bool = True):
+    """
+    Spielt einen Trace zusammen mit den Constraints ab.
+    :param sink: Optionaler VerdictSink für die Verdicts der Constraints.
+    :param log: Ob die Constraints ihre Ergebnisse loggen.
+    """
+    bp = BProgram(
+        bthreads=[trace_replay(events)] + get_checker_threads(sink, log),
+        event_selection_strategy=SubscriptionEventSelectionStrategy(),
+    )
+    bp.run()
+
+
+def replay_directory(
+    directory, pattern: str = "*.jsonl", engine: str = "bp", log: bool = False
+) -> dict:
+    """
+    Spielt alle Traces eines Verzeichnisses nacheinander ab.
+    :param directory: Das Verzeichnis mit den Traces.
+    :param pattern: Glob-Pattern der Trace-Dateien.
+    :param engine: "bp" spielt jeden Trace mit den b-threads ab, "vectorized" liest alle Traces ein und wertet sie
+    gemeinsam mit vectorized_constraints aus.
+    :param log: Ob die Constraints bei "bp" ihre Ergebnisse je Trace loggen.
+    :return: Dict mit der Anzahl der Traces und Events, der benötigten Zeit in Sekunden, dem Durchsatz in
+    Traces/s und Events/s und "violations" mit der Anzahl der verletzenden Traces je Constraint. Das Einlesen der
+    Dateien ist in der Zeit enthalten.
+    """
+    traces = 0
+    events = 0
+    start = time.perf_counter()
+    paths = sorted(Path(directory).glob(pattern))
+    if engine == "vectorized":
+        columns = vectorized_constraints.ColumnarTraces.from_traces(
+            [read_trace(path) for path in paths]
+        )
+        results = vectorized_constraints.evaluate(columns)
+        traces = columns.trace_count
+        events = len(columns.kinds)
+        violations = {
+            name: int((~results[name]).sum())
+            for name in vectorized_constraints.CONSTRAINTS
+        }
+    else:
+        sink = VerdictSink(keep_verdicts=False)
+        for path in paths:
+            trace = read_trace(path)
+            replay_trace(trace, sink, log)
+            traces += 1
+            events += len(trace)
+        violations = {
+            name: sink.failed.get(name, 0)
+            for name in vectorized_constraints.CONSTRAINTS
+        }
+    seconds = time.perf_counter() - start
+    return {
+        "traces": traces,
+        "events": events,
+        "seconds": seconds,
+        "traces_per_second": traces / seconds if seconds > 0 else 0.0,
+        "events_per_second": events / seconds if seconds > 0 else 0.0,
+        "violations": violations,
+    }
+
+
+def export_demo_traces(directory, copies: int = 1, frames: bool = False):
+    """
+    Schreibt die Simulationen aus demo_scenarios als Traces, jeweils copies-mal.
+    :param frames: Ob die Simulationen je Schritt ein STEP_FRAME statt der einzelnen Events senden.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, simulation in DEMO_SIMULATIONS.items():
+        events = record_trace(functools.partial(simulation, frames))
+        if copies == 1:
+            write_trace(directory / (name + ".jsonl"), events)
+            continue
+        for copy in range(copies):
+            write_trace(directory / "{}_{:05d}.jsonl".format(name, copy), events)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Offline-Auswertung aufgezeichneter Event-Traces."
+    )
+    parser.add_argument("directory", help="Verzeichnis mit den Traces")
+    parser.add_argument("--pattern", default="*.jsonl")
+    parser.add_argument("--engine", choices=["bp", "vectorized"], default="bp")
+    parser.add_argument(
+        "--log",
+        action="store_true",
+        help="Gibt die Ergebnisse der Constraints je Trace aus (nur mit --engine bp).",
+    )
+    parser.add_argument(
+        "--export-demo",
+        action="store_true",
+        help="Schreibt die Simulationen aus demo_scenarios als Traces in das Verzeichnis.",
+    )
+    parser.add_argument(
+        "--copies",
+        type=int,
+        default=1,
+        help="Anzahl der Kopien je Simulation für --export-demo.",
+    )
+    parser.add_argument(
+        "--frames",
+        action="store_true",
+        help="Exportiert mit --export-demo ein STEP_FRAME je Schritt statt der einzelnen Events.",
+    )
+    args = parser.parse_args()
+
+    if args.export_demo:
+        export_demo_traces(args.directory, args.copies, args.frames)
+        return
+
+    stats = replay_directory(args.directory, args.pattern, args.engine, args.log)
+    print(
+        "{traces} Traces mit {events} Events in {seconds:.2f} s: "
+        "{traces_per_second:.1f} Traces/s, {events_per_second:.1f} Events/s".format(
+            **stats
+        )
+    )
+    for name, count in stats["violations"].items():
+        print("{}: {} verletzt".format(name, count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import signal
+import unittest
+
+from bppy import sync, thread
+
+from src.overtake_abstract_checker.campaign import *
+from src.overtake_abstract_checker.demo_scenarios import make_step
+
+TEST_MODULE = "src.overtake_abstract_checker.test_campaign"
+
+
+@thread
+def endless_simulation():
+    while True:
+        yield sync(request=make_step())
+
+
+@thread
+def stuck_simulation():
+    yield sync(request=make_step())
+    while True:
+        pass
+
+
+class TestCampaign(unittest.TestCase):
+
+    def test_demo_campaign(self):
+        results = {
+            result["name"]: result for result in run_campaign(DEMO_CAMPAIGN, workers=2)
+        }
+
+        self.assertEqual({name for _, name, _ in DEMO_CAMPAIGN}, set(results))
+        self.assertTrue(results["valid_demo_simulation"]["passed"])
+        self.assertEqual(
+            ["speed_limit"],
+            [
+                verdict.name
+                for verdict in results["invalid_speed_simulation"]["verdicts"]
+                if not verdict.passed
+            ],
+        )
+        self.assertTrue(
+            all(result["status"] == FINISHED for result in results.values())
+        )
+
+    # ein nicht endendes Szenario darf die übrigen Läufe nicht aufhalten
+    def test_timeout(self):
+        scenarios = [
+            (TEST_MODULE, "endless_simulation", ()),
+            (TEST_MODULE, "stuck_simulation", ()),
+            ("demo_scenarios", "valid_demo_simulation", ()),
+        ]
+        results = {
+            result["name"]: result
+            for result in run_campaign(scenarios, workers=2, timeout=0.5)
+        }
+
+        self.assertEqual(TIMEOUT, results["endless_simulation"]["status"])
+        self.assertEqual(TIMEOUT, results["stuck_simulation"]["status"])
+        self.assertEqual(FINISHED, results["valid_demo_simulation"]["status"])
+        self.assertFalse(results["endless_simulation"]["passed"])
+        self.assertEqual([], results["endless_simulation"]["verdicts"])
+
+    @unittest.skipUnless(hasattr(signal, "setitimer"), "SIGALRM-Timer nicht verfügbar")
+    def test_timeout_restores_signal_handler(self):
+        def handler(signum, frame):
+            pass
+
+        previous = signal.signal(signal.SIGALRM, handler)
+        try:
+            result = run_scenario(TEST_MODULE, "endless_simulation", timeout=0.2)
+            self.assertEqual(TIMEOUT, result["status"])
+            self.assertIs(handler, signal.getsignal(signal.SIGALRM))
+        finally:
+            signal.signal(signal.SIGALRM, previous)
+
+    def test_unknown_scenario(self):
+        result = run_scenario("demo_scenarios", "unknown_simulation")
+
+        self.assertEqual(ERROR, result["status"])
+        self.assertIn("AttributeError", result["error"])
+        self.assertFalse(result["passed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
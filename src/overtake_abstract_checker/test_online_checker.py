@@ -0,0 +1,80 @@
+import unittest
+
+from src.overtake_abstract_checker.campaign import *
+from src.overtake_abstract_checker.demo_scenarios import make_position_update, make_step
+from src.overtake_abstract_checker.online_checker import *
+from src.overtake_abstract_checker.overtake_abstract_checker import (
+    PENDING,
+    SATISFIED,
+    VIOLATED,
+)
+from src.overtake_abstract_checker.replay import DEMO_SIMULATIONS, record_trace
+
+
+def drive(checker: OnlineChecker, simulation_thread):
+    """
+    Übergibt die Events einer Simulation wie eine Schleife um env.step() und bricht ab, sobald kein weiterer STEP
+    erlaubt ist.
+    :return: Die Anzahl der ausgeführten Steps.
+    """
+    steps = 0
+    for event in record_trace(simulation_thread):
+        if event.name == "END":
+            break
+        if event.name == "STEP":
+            if not checker.step_allowed():
+                break
+            steps += 1
+        checker.send(event)
+    checker.end()
+    return steps
+
+
+class TestOnlineChecker(unittest.TestCase):
+
+    def test_valid_demo_simulation(self):
+        checker = OnlineChecker()
+        steps = drive(checker, DEMO_SIMULATIONS["valid_demo_simulation"])
+
+        self.assertEqual(40, steps)
+        self.assertEqual(SATISFIED, checker.status)
+        self.assertEqual(4, len(checker.monitor.verdicts))
+
+    # die Geschwindigkeit ist ab dem ersten Step zu hoch, der Lauf wird danach abgebrochen
+    def test_fail_fast(self):
+        checker = OnlineChecker(fail_fast=True)
+        steps = drive(checker, DEMO_SIMULATIONS["invalid_speed_simulation"])
+
+        self.assertEqual(1, steps)
+        self.assertEqual(VIOLATED, checker.status)
+        self.assertFalse(checker.send(make_step()))
+        self.assertEqual(4, len(checker.end()))
+
+    def test_without_fail_fast(self):
+        checker = OnlineChecker(fail_fast=False)
+        steps = drive(checker, DEMO_SIMULATIONS["invalid_speed_simulation"])
+
+        self.assertEqual(40, steps)
+        self.assertEqual(VIOLATED, checker.monitor.statuses["speed_limit"])
+
+    def test_pending_until_decided(self):
+        checker = OnlineChecker()
+        checker.send(make_position_update(-50))
+        checker.send(make_step())
+        self.assertEqual(PENDING, checker.status)
+
+        checker.send(make_position_update(50))
+        self.assertEqual(SATISFIED, checker.monitor.statuses["position"])
+        self.assertEqual(PENDING, checker.status)
+
+    def test_campaign_fail_fast(self):
+        result = run_scenario(
+            "demo_scenarios", "invalid_speed_simulation", fail_fast=True
+        )
+        self.assertEqual(STOPPED, result["status"])
+        self.assertEqual(VIOLATED, result["statuses"]["speed_limit"])
+        self.assertLess(result["events"], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,18 @@
+import functools
 import io
+import pickle
 import unittest
 
+import numpy as np
+from bppy import All
+
 from src.overtake_abstract_checker.demo_scenarios import *
 from src.overtake_abstract_checker.overtake_abstract_checker import *
 
 
-def run_bp_with_simulation(simulation_thread):
+def run_bp_with_simulation(
+    simulation_thread, event_selection_strategy=SimpleEventSelectionStrategy
+):
     log_stream = io.StringIO()
     handler = logging.StreamHandler(log_stream)
     handler.setLevel(logging.INFO)
@@ -19,7 +26,7 @@ def run_bp_with_simulation(simulation_thread):
 
     bp = BProgram(
         bthreads=bthreads,
-        event_selection_strategy=SimpleEventSelectionStrategy(),
+        event_selection_strategy=event_selection_strategy(),
     )
     bp.run()
 
@@ -53,5 +60,189 @@ class TestDemoScenarios(unittest.TestCase):
         self.assertIn("Speed Limit Constraint verletzt", log_output)
 
 
+def run_bp_with_sink(simulation_thread):
+    sink = VerdictSink()
+    bthreads = [simulation_thread()]
+    bthreads.extend(get_checker_threads(sink, log=False))
+    bp = BProgram(
+        bthreads=bthreads,
+        event_selection_strategy=SubscriptionEventSelectionStrategy(),
+    )
+    bp.run()
+    return {verdict.name: verdict for verdict in sink.verdicts}
+
+
+class TestVerdicts(unittest.TestCase):
+
+    def test_valid_demo_simulation(self):
+        verdicts = run_bp_with_sink(valid_demo_simulation)
+        self.assertEqual(set(CONSTRAINT_NAMES), set(verdicts))
+        self.assertTrue(all(verdict.passed for verdict in verdicts.values()))
+        self.assertIsNone(verdicts["speed_limit"].first_violation_step)
+        self.assertEqual(1, verdicts["functional_action"].counters["speed_up_count"])
+
+    def test_invalid_speed_simulation(self):
+        verdict = run_bp_with_sink(invalid_speed_simulation)["speed_limit"]
+        self.assertFalse(verdict.passed)
+        self.assertEqual(40, verdict.counters["violation_count"])
+        self.assertEqual(1, verdict.first_violation_step)
+
+    def test_invalid_duration_simulation(self):
+        verdict = run_bp_with_sink(invalid_duration_simulation)["duration"]
+        self.assertFalse(verdict.passed)
+        self.assertEqual(5, verdict.counters["step_count"])
+        self.assertEqual(5, verdict.first_violation_step)
+
+    def test_only_duration_waits_for_step(self):
+        bp = BProgram(
+            bthreads=get_checker_threads(log=False),
+            event_selection_strategy=SubscriptionEventSelectionStrategy(),
+        )
+        bp.setup()
+
+        waiting = [STEP_EVENT in ticket["waitFor"] for ticket in bp.tickets]
+        self.assertEqual([True, False, False, False], waiting)
+
+    def test_sink_merge(self):
+        sink = VerdictSink(keep_verdicts=False)
+        for simulation in (valid_demo_simulation, invalid_speed_simulation):
+            run_sink = VerdictSink()
+            run_sink.publish(run_bp_with_sink(simulation)["speed_limit"])
+            sink.merge(run_sink)
+
+        self.assertEqual({"speed_limit": {"passed": 1, "failed": 1}}, sink.summary())
+        self.assertEqual([], sink.verdicts)
+
+
+class TestStepFrames(unittest.TestCase):
+
+    def test_same_verdicts_as_single_events(self):
+        for simulation in (
+            valid_demo_simulation,
+            invalid_position_simulation,
+            invalid_duration_simulation,
+            invalid_functional_action_simulation,
+            invalid_speed_simulation,
+        ):
+            with self.subTest(simulation.__name__):
+                self.assertEqual(
+                    run_bp_with_sink(simulation),
+                    run_bp_with_sink(functools.partial(simulation, True)),
+                )
+
+    # die Schritte werden unabhängig von der Reihenfolge der Threads gezählt, auch wenn duration_constraint nicht
+    # als erster Thread ein STEP_FRAME erhält
+    def test_verdicts_independent_of_thread_order(self):
+        for index, simulation in enumerate(
+            (
+                valid_demo_simulation,
+                invalid_position_simulation,
+                invalid_duration_simulation,
+                invalid_functional_action_simulation,
+                invalid_speed_simulation,
+            )
+        ):
+            for frames in (False, True):
+                with self.subTest(simulation=index, frames=frames):
+                    sink = VerdictSink()
+                    BProgram(
+                        bthreads=[simulation(frames)]
+                        + get_checker_threads(sink, log=False)[::-1],
+                        event_selection_strategy=SubscriptionEventSelectionStrategy(),
+                    ).run()
+                    verdicts = {verdict.name: verdict for verdict in sink.verdicts}
+                    self.assertEqual(
+                        run_bp_with_sink(functools.partial(simulation, frames)),
+                        verdicts,
+                    )
+                    if simulation is invalid_speed_simulation:
+                        self.assertEqual(
+                            1, verdicts["speed_limit"].first_violation_step
+                        )
+
+    def test_one_selection_per_step(self):
+        selections = []
+
+        @thread
+        def recorder():
+            while True:
+                selections.append((yield sync(waitFor=All())))
+
+        bp = BProgram(
+            bthreads=[valid_demo_simulation(True), recorder()]
+            + get_checker_threads(log=False),
+            event_selection_strategy=SubscriptionEventSelectionStrategy(),
+        )
+        bp.run()
+
+        # initiales POSITION_UPDATE, ein STEP_FRAME je Schritt und END
+        self.assertEqual(MAX_SIM_STEPS + 2, len(selections))
+
+    def test_step_frame_payload(self):
+        self.assertEqual({}, make_step_frame().data)
+        self.assertEqual(
+            {"distance_to_vut": 0, "speed": 20.0, "lane_change": True},
+            make_step_frame(0, 20.0, lane_change=True).data,
+        )
+
+
+class TestCompactEvents(unittest.TestCase):
+
+    def test_singletons(self):
+        self.assertIs(STEP_EVENT, make_step())
+        self.assertIs(END_EVENT, make_end())
+        self.assertEqual(BEvent("STEP"), make_step())
+        self.assertEqual(0, len(make_end().data))
+        # geteilte Singletons dürfen nicht verändert werden
+        with self.assertRaises(AttributeError):
+            make_step().name = "END"
+        with self.assertRaises(AttributeError):
+            make_end().data = {"speed": 20.0}
+        self.assertEqual(STEP_EVENT, pickle.loads(pickle.dumps(STEP_EVENT)))
+
+    def test_payload_like_dict(self):
+        event = make_speed_update(20.0)
+        self.assertEqual({"speed": 20.0}, event.data)
+        self.assertEqual(20.0, event.data["speed"])
+        self.assertEqual(20.0, event.data.get("speed"))
+        self.assertIsNone(event.data.get("distance_to_vut"))
+        self.assertRaises(KeyError, lambda: event.data["step"])
+        self.assertFalse(hasattr(event.data, "__dict__"))
+        # BPpy vergleicht und hasht Events über ihre Payload
+        self.assertEqual(BEvent("SPEED_UPDATE", {"speed": 20.0}), event)
+        self.assertEqual(hash(BEvent("SPEED_UPDATE", {"speed": 20.0})), hash(event))
+        self.assertNotEqual(make_speed_update(21.0), event)
+
+    def test_payload_numpy_bool(self):
+        event = make_step_frame(lane_change=np.False_, speed_up=np.True_)
+        self.assertEqual({"speed_up": True}, event.data)
+        self.assertEqual(make_step_frame(speed_up=True), event)
+
+    def test_payload_pickle(self):
+        event = make_step_frame(0, 20.0, speed_up=True)
+        self.assertEqual(event, pickle.loads(pickle.dumps(event)))
+        self.assertEqual(
+            {"distance_to_vut": 0, "speed": 20.0, "speed_up": True}, event.data
+        )
+
+
+class TestEventSubscriptions(unittest.TestCase):
+
+    def test_event_name_set(self):
+        self.assertIn(make_step(), DURATION_EVENTS)
+        self.assertIn(make_end(), DURATION_EVENTS)
+        self.assertNotIn(make_speed_update(20.0), DURATION_EVENTS)
+        self.assertIn(make_step_frame(), DURATION_EVENTS)
+        # im fail-fast-Modus werden auch STEP_FRAME-Events blockiert
+        self.assertIn(make_step_frame(), STEP_EVENTS)
+
+    def test_subscription_strategy_same_verdicts(self):
+        log_output = run_bp_with_simulation(
+            invalid_functional_action_simulation, SubscriptionEventSelectionStrategy
+        )
+        self.assertIn("Functional Action Constraint verletzt", log_output)
+        self.assertNotIn("Speed Limit Constraint verletzt", log_output)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,61 @@
+import io
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.overtake_abstract_checker.replay import *
+
+
+def replay_with_log(events):
+    log_stream = io.StringIO()
+    handler = logging.StreamHandler(log_stream)
+    handler.setLevel(logging.INFO)
+    logger = logging.getLogger()
+    logger.addHandler(handler)
+
+    replay_trace(events)
+
+    logger.removeHandler(handler)
+    return log_stream.getvalue()
+
+
+class TestReplay(unittest.TestCase):
+
+    def test_write_and_read_trace(self):
+        events = record_trace(DEMO_SIMULATIONS["valid_demo_simulation"])
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "trace.jsonl"
+            write_trace(path, events)
+            self.assertEqual(events, read_trace(path))
+        self.assertEqual("END", events[-1].name)
+
+    def test_replay_invalid_traces(self):
+        expected = {
+            "invalid_position_simulation": "Position Constraint verletzt",
+            "invalid_duration_simulation": "Duration Constraint verletzt",
+            "invalid_functional_action_simulation": "Functional Action Constraint verletzt",
+            "invalid_speed_simulation": "Speed Limit Constraint verletzt",
+        }
+        for name, message in expected.items():
+            with self.subTest(name):
+                events = record_trace(DEMO_SIMULATIONS[name])
+                self.assertIn(message, replay_with_log(events))
+
+    # ohne END-Event wird es beim Abspielen ergänzt und die Constraints werden trotzdem ausgewertet
+    def test_missing_end_appended(self):
+        events = record_trace(DEMO_SIMULATIONS["invalid_speed_simulation"])
+        self.assertIn("Speed Limit Constraint verletzt", replay_with_log(events[:-1]))
+
+    def test_replay_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            export_demo_traces(directory, copies=2)
+            stats = replay_directory(directory)
+
+        self.assertEqual(2 * len(DEMO_SIMULATIONS), stats["traces"])
+        self.assertGreater(stats["events"], stats["traces"])
+        self.assertGreater(stats["events_per_second"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import functools
+import random
+import unittest
+
+from src.overtake_abstract_checker.demo_scenarios import *
+from src.overtake_abstract_checker.replay import *
+from src.overtake_abstract_checker.vectorized_constraints import *
+
+
+def bp_verdicts(events):
+    sink = VerdictSink()
+    replay_trace(events, sink, log=False)
+    return {verdict.name: verdict.passed for verdict in sink.verdicts}
+
+
+def bp_counters(events):
+    sink = VerdictSink()
+    replay_trace(events, sink, log=False)
+    return {verdict.name: verdict.counters for verdict in sink.verdicts}
+
+
+def random_trace(rng: random.Random):
+    events = []
+    for _ in range(rng.randint(0, 60)):
+        name = rng.choice(
+            ["POSITION_UPDATE", "STEP", "STEP", "SPEED_UPDATE", "LANE_CHANGE"]
+            + ["SPEED_UP", "END", "OTHER", "STEP_FRAME"]
+        )
+        data = None
+        if name == "POSITION_UPDATE" and rng.random() < 0.9:
+            data = {"distance_to_vut": rng.choice([-50, 50, 0, -40])}
+        elif name == "SPEED_UPDATE" and rng.random() < 0.9:
+            data = {"speed": rng.uniform(10, 30)}
+        elif name in ("LANE_CHANGE", "SPEED_UP") and rng.random() < 0.9:
+            data = {"step": rng.randint(0, 50)}
+        elif name == "STEP_FRAME":
+            event = make_step_frame(
+                rng.choice([-50, 50, 0, None]),
+                rng.choice([rng.uniform(10, 30), None]),
+                rng.random() < 0.2,
+                rng.random() < 0.2,
+            )
+            events.append(event)
+            continue
+        events.append(BEvent(name, data))
+    return events
+
+
+class TestVectorizedConstraints(unittest.TestCase):
+
+    def assert_same_verdicts(self, traces):
+        results = evaluate(ColumnarTraces.from_traces(traces))
+        for trace_id, events in enumerate(traces):
+            expected = bp_verdicts(events)
+            actual = {name: bool(results[name][trace_id]) for name in CONSTRAINTS}
+            self.assertEqual(expected, actual, "Trace {}".format(trace_id))
+
+    def test_demo_scenarios_match_bthreads(self):
+        traces = [record_trace(simulation) for simulation in DEMO_SIMULATIONS.values()]
+        self.assert_same_verdicts(traces)
+
+        results = evaluate(ColumnarTraces.from_traces(traces))
+        self.assertTrue(all(results[name][0] for name in CONSTRAINTS))
+
+    def test_step_frames_match_bthreads(self):
+        traces = [
+            record_trace(functools.partial(simulation, True))
+            for simulation in DEMO_SIMULATIONS.values()
+        ]
+        self.assert_same_verdicts(traces)
+
+    # zufällige Traces decken auch fehlende Payloads, Events nach END und falsche Reihenfolgen ab
+    def test_random_traces_match_bthreads(self):
+        rng = random.Random(0)
+        self.assert_same_verdicts([random_trace(rng) for _ in range(150)])
+
+    def test_random_traces_match_speed_violation_count(self):
+        rng = random.Random(1)
+        traces = [random_trace(rng) for _ in range(150)]
+        results = evaluate(ColumnarTraces.from_traces(traces))
+        for trace_id, events in enumerate(traces):
+            self.assertEqual(
+                bp_counters(events)["speed_limit"]["violation_count"],
+                results["speed_violation_count"][trace_id],
+                "Trace {}".format(trace_id),
+            )
+
+    # Schritte ohne SPEED_UPDATE behalten die zuletzt gemeldete Geschwindigkeit
+    def test_held_speed(self):
+        trace = [make_speed_update(30.0), make_step(), make_step()]
+        trace += [make_speed_update(20.0), make_step(), make_end()]
+        results = evaluate(ColumnarTraces.from_traces([trace]))
+
+        self.assertEqual(
+            [bp_counters(trace)["speed_limit"]["violation_count"]],
+            results["speed_violation_count"].tolist(),
+        )
+        self.assertEqual([2], results["speed_violation_count"].tolist())
+
+    def test_counters(self):
+        trace = [make_step(), make_lane_change(2), make_step(), make_speed_up(15)]
+        trace += [make_speed_update(30.0), make_end(), make_step()]
+        results = evaluate(ColumnarTraces.from_traces([[], trace]))
+
+        self.assertEqual([0, 2], results["step_count"].tolist())
+        self.assertEqual([0, 1], results["lane_change_count"].tolist())
+        self.assertEqual([0, 1], results["speed_up_count"].tolist())
+        self.assertEqual([0, 1], results["speed_violation_count"].tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
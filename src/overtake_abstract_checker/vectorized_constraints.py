@@ -0,0 +1,214 @@
+"""
+Vektorisierte Auswertung der Constraints des abstrakten Überholszenarios über viele Traces gleichzeitig.
+
+Die Constraints aus overtake_abstract_checker werden hier nicht Event für Event in b-threads ausgewertet, sondern
+mit NumPy über spaltenweise abgelegte Traces (ColumnarTraces). Die Verdicts entsprechen denen der b-threads:
+  - STEP_FRAME-Events werden beim Einlesen in die gleichbedeutenden einzelnen Events zerlegt (siehe
+    ColumnarTraces.from_traces).
+  - Events nach dem ersten END eines Traces werden ignoriert. Endet ein Trace ohne END, wird er so ausgewertet,
+    als folge ein END (wie beim Abspielen mit replay.py).
+  - Position: Das erste POSITION_UPDATE mit "distance_to_vut" muss START_RELATIVE_POS sein, irgendein
+    POSITION_UPDATE muss END_RELATIVE_POS sein.
+  - Duration: Die Anzahl der STEP-Events muss zwischen MIN_SIM_STEPS und MAX_SIM_STEPS liegen.
+  - Functional Action: Da ein SPEED_UP den gemerkten LANE_CHANGE zurücksetzt und ein LANE_CHANGE ihn überschreibt,
+    hängt die Auswertung eines SPEED_UP nur von der vorherigen fachlichen Aktion desselben Traces ab. Ist diese
+    ein LANE_CHANGE, zählt der SPEED_UP und das Intervall wird geprüft, sonst liegt eine Reihenfolgeverletzung vor.
+  - Speed Limit: Kein SPEED_UPDATE darf außerhalb von [MIN_SPEED, MAX_SPEED] liegen. Schritte ohne SPEED_UPDATE
+    behalten die zuletzt gemeldete Geschwindigkeit und zählen als Verstoß, wenn diese außerhalb liegt.
+"""
+
+import numpy as np
+from overtake_constraints import (
+    END_RELATIVE_POS,
+    MAX_ACTION_INTERVAL_STEPS,
+    MAX_SIM_STEPS,
+    MAX_SPEED,
+    MIN_ACTION_INTERVAL_STEPS,
+    MIN_SIM_STEPS,
+    MIN_SPEED,
+    START_RELATIVE_POS,
+)
+
+POSITION_UPDATE = 0
+STEP = 1
+SPEED_UPDATE = 2
+LANE_CHANGE = 3
+SPEED_UP = 4
+END = 5
+OTHER = -1
+
+EVENT_KINDS = {
+    "POSITION_UPDATE": POSITION_UPDATE,
+    "STEP": STEP,
+    "SPEED_UPDATE": SPEED_UPDATE,
+    "LANE_CHANGE": LANE_CHANGE,
+    "SPEED_UP": SPEED_UP,
+    "END": END,
+}
+
+# Payload-Feld je Event-Art und Wert, falls das Feld fehlt (wie evt.data.get in den b-threads)
+VALUE_KEYS = {
+    POSITION_UPDATE: ("distance_to_vut", np.nan),
+    SPEED_UPDATE: ("speed", np.nan),
+    LANE_CHANGE: ("step", 0),
+    SPEED_UP: ("step", 0),
+}
+
+CONSTRAINTS = ("position", "duration", "functional_action", "speed_limit")
+
+
+class ColumnarTraces:
+    """
+    Spaltenweise Ablage vieler Traces. Alle Events aller Traces liegen hintereinander, nach Trace sortiert und
+    innerhalb eines Traces in ihrer ursprünglichen Reihenfolge.
+
+    :attribute trace_ids: Index des Traces je Event.
+    :attribute kinds: Art des Events (siehe EVENT_KINDS), OTHER für unbekannte Events.
+    :attribute values: Der für die Event-Art relevante Payload-Wert, NaN falls er fehlt.
+    :attribute trace_count: Die Anzahl der Traces, auch Traces ohne Events werden gezählt.
+    """
+
+    def __init__(self, trace_ids, kinds, values, trace_count: int = None):
+        self.trace_ids = np.asarray(trace_ids, dtype=np.int64)
+        self.kinds = np.asarray(kinds, dtype=np.int8)
+        self.values = np.asarray(values, dtype=np.float64)
+        if trace_count is None:
+            trace_count = int(self.trace_ids[-1]) + 1 if len(self.trace_ids) else 0
+        self.trace_count = trace_count
+
+    @classmethod
+    def from_traces(cls, traces):
+        """
+        :param traces: Liste von Traces, jeweils eine Liste von BEvents (z.B. aus replay.read_trace). Ein
+        STEP_FRAME wird als STEP, POSITION_UPDATE, LANE_CHANGE, SPEED_UP und SPEED_UPDATE abgelegt, soweit die
+        jeweiligen Felder gesetzt sind. LANE_CHANGE und SPEED_UP erhalten dabei die Nummer des Schritts.
+        """
+        trace_ids = []
+        kinds = []
+        values = []
+        for trace_id, events in enumerate(traces):
+            step_count = 0
+            for event in events:
+                if event.name == "STEP_FRAME":
+                    step_count += 1
+                    data = event.data
+                    frame = [(STEP, np.nan)]
+                    if data.get("distance_to_vut") is not None:
+                        frame.append((POSITION_UPDATE, data["distance_to_vut"]))
+                    if data.get("lane_change", False):
+                        frame.append((LANE_CHANGE, step_count))
+                    if data.get("speed_up", False):
+                        frame.append((SPEED_UP, step_count))
+                    if data.get("speed") is not None:
+                        frame.append((SPEED_UPDATE, data["speed"]))
+                    for kind, value in frame:
+                        trace_ids.append(trace_id)
+                        kinds.append(kind)
+                        values.append(value)
+                    continue
+                kind = EVENT_KINDS.get(event.name, OTHER)
+                if kind == STEP:
+                    step_count += 1
+                key, default = VALUE_KEYS.get(kind, (None, np.nan))
+                value = event.data.get(key, default) if key is not None else default
+                trace_ids.append(trace_id)
+                kinds.append(kind)
+                values.append(np.nan if value is None else value)
+        return cls(trace_ids, kinds, values, len(traces))
+
+
+def evaluate(traces: ColumnarTraces) -> dict:
+    """
+    Wertet alle Constraints für alle Traces aus.
+    :return: Dict mit je einem booleschen Array (True = erfüllt) für "position", "duration", "functional_action"
+    und "speed_limit" sowie den Zählern "step_count", "lane_change_count", "speed_up_count" und
+    "speed_violation_count" je Trace.
+    """
+    trace_ids, kinds, values = traces.trace_ids, traces.kinds, traces.values
+    n = traces.trace_count
+
+    def count(mask):
+        return np.bincount(trace_ids[mask], minlength=n)
+
+    # nur Events vor dem ersten END eines Traces werden ausgewertet
+    is_end = kinds == END
+    ends_before = np.cumsum(is_end) - is_end
+    trace_starts = np.searchsorted(trace_ids, np.arange(n))
+    ends_before -= ends_before[trace_starts[trace_ids]]
+    active = (ends_before == 0) & ~is_end
+
+    # Position
+    positions = active & (kinds == POSITION_UPDATE) & ~np.isnan(values)
+    start_valid = np.zeros(n, dtype=bool)
+    position_traces, first = np.unique(trace_ids[positions], return_index=True)
+    start_valid[position_traces] = values[positions][first] == START_RELATIVE_POS
+    end_valid = count(positions & (values == END_RELATIVE_POS)) > 0
+
+    # Duration
+    step_count = count(active & (kinds == STEP))
+
+    # Functional Action
+    actions = active & ((kinds == LANE_CHANGE) | (kinds == SPEED_UP))
+    action_traces = trace_ids[actions]
+    action_kinds = kinds[actions]
+    action_steps = values[actions]
+    previous_is_lane_change = np.zeros(len(action_kinds), dtype=bool)
+    previous_is_lane_change[1:] = (action_kinds[:-1] == LANE_CHANGE) & (
+        action_traces[:-1] == action_traces[1:]
+    )
+    intervals = np.full(len(action_kinds), np.nan)
+    intervals[1:] = action_steps[1:] - action_steps[:-1]
+    speed_ups = action_kinds == SPEED_UP
+    counted = speed_ups & previous_is_lane_change
+    in_interval = (MIN_ACTION_INTERVAL_STEPS <= intervals) & (
+        intervals <= MAX_ACTION_INTERVAL_STEPS
+    )
+    lane_change_count = np.bincount(
+        action_traces[action_kinds == LANE_CHANGE], minlength=n
+    )
+    speed_up_count = np.bincount(action_traces[counted], minlength=n)
+    valid_time_between_actions = (
+        np.bincount(action_traces[counted & in_interval], minlength=n) > 0
+    )
+    order_violation = (
+        np.bincount(action_traces[speed_ups & ~(counted & in_interval)], minlength=n)
+        > 0
+    )
+
+    # Speed Limit
+    speeds = active & (kinds == SPEED_UPDATE) & ~np.isnan(values)
+    out_of_limits = (values < MIN_SPEED) | (values > MAX_SPEED)
+    speed_violation_count = count(speeds & out_of_limits)
+    # Ein Schritt reicht vom STEP bis zum nächsten STEP, zum ersten END bzw. zum Ende des Traces. Enthält er kein
+    # SPEED_UPDATE, gilt die zuletzt gemeldete Geschwindigkeit weiter.
+    trace_ends = np.searchsorted(trace_ids, np.arange(n), side="right")
+    first_ends = np.flatnonzero(is_end & (ends_before == 0))
+    trace_ends[trace_ids[first_ends]] = first_ends
+    step_positions = np.flatnonzero(active & (kinds == STEP))
+    step_traces = trace_ids[step_positions]
+    step_ends = trace_ends[step_traces]
+    same_trace = step_traces[1:] == step_traces[:-1]
+    step_ends[:-1][same_trace] = step_positions[1:][same_trace]
+    updates = np.cumsum(speeds)
+    updates_in_step = updates[step_ends - 1] - updates[step_positions]
+    # Index des letzten SPEED_UPDATE bis zu jedem Event, -1 wenn es im Trace noch keins gab
+    last_update = np.maximum.accumulate(np.where(speeds, np.arange(len(kinds)), -1))
+    held = last_update[step_positions]
+    held_valid = held >= trace_starts[step_traces]
+    held_violation = (updates_in_step == 0) & held_valid
+    held_violation[held_valid] &= out_of_limits[held[held_valid]]
+    speed_violation_count += np.bincount(step_traces[held_violation], minlength=n)
+
+    return {
+        "position": start_valid & end_valid,
+        "duration": (MIN_SIM_STEPS <= step_count) & (step_count <= MAX_SIM_STEPS),
+        "functional_action": (lane_change_count >= 1)
+        & (speed_up_count >= 1)
+        & valid_time_between_actions
+        & ~order_violation,
+        "speed_limit": speed_violation_count == 0,
+        "step_count": step_count,
+        "lane_change_count": lane_change_count,
+        "speed_up_count": speed_up_count,
+        "speed_violation_count": speed_violation_count,
+    }
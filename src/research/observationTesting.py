@@ -1,7 +1,18 @@
+import argparse
+import sys
+from pathlib import Path
+
 import gymnasium as gym
 import highway_env as highway
 import numpy as np
 
+# das Skript wird direkt aufgerufen, die Module aus src werden über das Repository-Root importiert
+ROOT = str(Path(__file__).resolve().parents[2])
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.trajectory_recorder import TrajectoryRecorder  # noqa: E402
+
 
 def kinematics_observation():
     return {
@@ -164,6 +175,25 @@ def action_name(action) -> str:
 
 
 if __name__ == "__main__":
+    # Aufruf aus dem Repository-Root: python -m src.research.<script>
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Zeichnet den Lauf memory-mapped in das Verzeichnis DIR auf.",
+    )
+    args = parser.parse_args()
+    recorder = (
+        TrajectoryRecorder(
+            args.record,
+            15,
+            env.unwrapped.config,
+            observation_rows=len(env.unwrapped.road.vehicles),
+        )
+        if args.record
+        else None
+    )
+
     for i in range(15):
         action1 = calc_action_1(i)
         action2 = calc_action_2()
@@ -173,6 +203,10 @@ if __name__ == "__main__":
         print("Action 3: ", action_name(action3))
 
         obs, reward, done, truncated, info = env.step((action1, action2, action3))
+        if recorder:
+            recorder.record(
+                obs, (action1, action2, action3), reward, done, truncated, info
+            )
 
         controlled_vehicle_count = 0
         for obs_i in zip(obs):
@@ -190,3 +224,6 @@ if __name__ == "__main__":
         """
 
         env.render()
+
+    if recorder:
+        recorder.close()
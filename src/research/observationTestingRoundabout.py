@@ -1,6 +1,17 @@
+import argparse
+import sys
+from pathlib import Path
+
 import gymnasium as gym
 import highway_env as highway
 
+# das Skript wird direkt aufgerufen, die Module aus src werden über das Repository-Root importiert
+ROOT = str(Path(__file__).resolve().parents[2])
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.trajectory_recorder import TrajectoryRecorder  # noqa: E402
+
 
 def kinematics_observation():
     return {
@@ -89,8 +100,29 @@ def action_name(action) -> str:
 
 
 if __name__ == "__main__":
+    # Aufruf aus dem Repository-Root: python -m src.research.<script>
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Zeichnet den Lauf memory-mapped in das Verzeichnis DIR auf.",
+    )
+    args = parser.parse_args()
+    recorder = (
+        TrajectoryRecorder(
+            args.record,
+            15,
+            env.unwrapped.config,
+            observation_rows=len(env.unwrapped.road.vehicles),
+        )
+        if args.record
+        else None
+    )
+
     for i in range(15):
         obs, reward, done, truncated, info = env.step(1)
+        if recorder:
+            recorder.record(obs, 1, reward, done, truncated, info)
         print(obs)
 
         # for grayscale observation example for the first vehicle in a multiagent setting with 3 vehicles
@@ -101,3 +133,6 @@ if __name__ == "__main__":
         plt.show()
         """
         env.render()
+
+    if recorder:
+        recorder.close()
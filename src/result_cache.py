@@ -0,0 +1,222 @@
+"""
+Inhaltsadressierter Cache für Simulationsergebnisse auf der Festplatte.
+
+Der Schlüssel eines Ergebnisses ist der SHA-256-Hash über alle Eingaben, die es bestimmen: die Env-Id, die Config,
+den Seed, die Aktionsfolge, die Versionen der beteiligten Pakete sowie weitere Parameter (z.B. Agent und VUT).
+Die Eingaben werden dafür in kanonisches JSON (sortierte Schlüssel, Tupel als Listen) umgewandelt, der Schlüssel
+ist damit über Prozesse und Läufe hinweg stabil.
+
+Die Ergebnisse werden mit pickle je Schlüssel in einer eigenen Datei abgelegt. Überschreitet die Gesamtgröße
+max_bytes, werden die am längsten nicht verwendeten Einträge gelöscht (LRU). Die letzte Verwendung wird als
+Änderungszeit der Datei gespeichert und bleibt so auch für spätere Prozesse erhalten.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, Dict, Sequence
+
+PACKAGES = ("highway-env", "gymnasium", "numpy", "bppy")
+
+
+def package_versions() -> Dict[str, str]:
+    """
+    :return: Die installierten Versionen der Pakete, die ein Simulationsergebnis beeinflussen.
+    """
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def cache_key(
+    env_id: str,
+    config: Dict[str, Any],
+    seed: int,
+    actions: Sequence,
+    versions: Dict[str, str] = None,
+    **params,
+) -> str:
+    """
+    :param versions: Die Paketversionen, None für package_versions().
+    :param params: Weitere Parameter, die das Ergebnis beeinflussen.
+    :return: Der Hash über alle Eingaben als Hex-String.
+    """
+    content = {
+        "env_id": env_id,
+        "config": config,
+        "seed": seed,
+        "actions": actions,
+        "versions": versions if versions is not None else package_versions(),
+        "params": params,
+    }
+    encoded = json.dumps(
+        content, sort_keys=True, separators=(",", ":"), default=_to_json
+    )
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Cache mit einer Datei je Ergebnis im Verzeichnis directory.
+
+    :attribute directory: Das Verzeichnis des Caches.
+    :attribute max_bytes: Die maximale Gesamtgröße der Einträge, None für unbegrenzt.
+    :attribute hits: Die Anzahl der Abfragen, die aus dem Cache beantwortet wurden.
+    :attribute misses: Die Anzahl der Abfragen ohne Eintrag.
+    :attribute stores: Die Anzahl der gespeicherten Ergebnisse.
+    :attribute evictions: Die Anzahl der wegen max_bytes gelöschten Einträge.
+    """
+
+    SUFFIX = ".pkl"
+
+    def __init__(self, directory: str, max_bytes: int = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        # Schlüssel -> Größe in Bytes, vom am längsten nicht verwendeten zum zuletzt verwendeten Eintrag
+        self.__entries = OrderedDict()
+        files = sorted(
+            (path.stat().st_mtime, path.stem, path.stat().st_size)
+            for path in self.directory.glob("*" + self.SUFFIX)
+        )
+        for _, key, size in files:
+            self.__entries[key] = size
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key: str):
+        return key in self.__entries or self.__path(key).exists()
+
+    @property
+    def size(self) -> int:
+        """
+        :return: Die Gesamtgröße der Einträge in Bytes.
+        """
+        return sum(self.__entries.values())
+
+    def get(self, key: str, default=None):
+        """
+        :return: Das gespeicherte Ergebnis zum Schlüssel, default, wenn es keinen Eintrag gibt. Einträge, die eine
+        andere Instanz nach dem Aufbau des Index gespeichert hat, werden über ihre Datei gefunden und in den Index
+        aufgenommen.
+        """
+        path = self.__path(key)
+        if key not in self.__entries and not path.exists():
+            self.misses += 1
+            return default
+        try:
+            with open(path, "rb") as file:
+                value = pickle.load(file)
+                size = os.fstat(file.fileno()).st_size
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            # von einem anderen Prozess gelöscht oder unvollständig
+            self.__entries.pop(key, None)
+            self.misses += 1
+            return default
+        self.__entries[key] = size
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value):
+        """
+        Speichert das Ergebnis zum Schlüssel. Die Datei wird unter einem temporären Namen geschrieben und erst danach
+        mit os.replace umbenannt. Ein Leser findet also den alten, den neuen oder keinen Eintrag, aber nie einen halb
+        geschriebenen. Andere Instanzen auf demselben Verzeichnis finden den Eintrag über get, rechnen ihn aber erst
+        danach in ihre Größe für max_bytes ein.
+        """
+        file, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file, "wb") as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.__path(key))
+        except BaseException:
+            # z.B. ein nicht serialisierbares Ergebnis, die temporäre Datei darf nicht liegen bleiben
+            try:
+                os.remove(temporary)
+            except FileNotFoundError:
+                pass
+            raise
+        self.__entries[key] = self.__path(key).stat().st_size
+        self.__entries.move_to_end(key)
+        self.stores += 1
+        self.__evict()
+
+    def get_or_compute(self, key: str, compute):
+        """
+        :param compute: Funktion ohne Parameter, die das Ergebnis berechnet, falls es nicht im Cache liegt.
+        :return: Das gespeicherte oder neu berechnete Ergebnis.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        for key in list(self.__entries):
+            self.__remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        :return: Dict mit "hits", "misses", "hit_rate", "stores", "evictions", der Anzahl der "entries" und der
+        Gesamtgröße in "bytes".
+        """
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": len(self.__entries),
+            "bytes": self.size,
+        }
+
+    def __path(self, key: str) -> Path:
+        return self.directory / (key + self.SUFFIX)
+
+    def __remove(self, key: str):
+        del self.__entries[key]
+        try:
+            os.remove(self.__path(key))
+        except FileNotFoundError:
+            pass
+
+    def __evict(self):
+        if self.max_bytes is None:
+            return
+        size = self.size
+        # der zuletzt gespeicherte Eintrag bleibt auch erhalten, wenn er allein größer als max_bytes ist
+        while size > self.max_bytes and len(self.__entries) > 1:
+            key, entry_size = next(iter(self.__entries.items()))
+            self.__remove(key)
+            size -= entry_size
+            self.evictions += 1
+
+
+_MISSING = object()
+
+
+def _to_json(value):
+    # NumPy-Werte und -Arrays sowie Mengen, Tupel kodiert json bereits als Listen
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError("{} is not JSON serializable".format(type(value).__name__))
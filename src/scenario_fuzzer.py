@@ -0,0 +1,418 @@
+"""
+Fuzzer für konkrete Szenarien des abstrakten Überholszenarios.
+
+Der Fuzzer erzeugt zufällige Folgen von DiscreteMetaActions für die kontrollierten Fahrzeuge und prüft jede Folge
+(einen Kandidaten) in highway-v0 mit den Constraints aus overtake_abstract_checker. Alle Kandidaten starten im
+selben Zustand (EnvSnapshot nach reset() mit dem Seed des Szenarios). Die Kandidaten werden parallel in einem
+ProcessPoolExecutor ausgewertet.
+
+Nach jedem env.step() leitet eine EventBridge (siehe event_bridge) aus der Observation die Events für die
+Constraints ab, die an einen OnlineChecker im fail-fast-Modus übergeben werden. Sobald ein Constraint sicher
+verletzt ist, wird der Kandidat nicht weiter simuliert (pruned). Die übrigen Kandidaten erhalten am Ende ihrer
+Aktionsfolge (oder wenn die Episode endet) das END-Event.
+
+Aufruf aus dem Repository-Root:
+    python -m src.scenario_fuzzer --candidates 20 --workers 4
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from .env_snapshot import EnvSnapshot
+from .event_bridge import ACCELERATION_THRESHOLD, EventBridge
+from .main import create_env, set_config
+from .result_cache import ResultCache, cache_key, package_versions
+
+# isort: split
+# event_bridge nimmt das Verzeichnis der Constraint-Prüfung in sys.path auf (siehe event_bridge.CHECKER_DIR)
+from online_checker import OnlineChecker
+from overtake_abstract_checker import VIOLATED
+from overtake_constraints import MAX_SIM_STEPS, MIN_SIM_STEPS
+
+ENV_ID = "highway-v0"
+ACTIONS = (0, 1, 2, 3, 4)  # LANE_LEFT, IDLE, LANE_RIGHT, FASTER, SLOWER
+DEFAULT_ACTION = (1, 1, 2, 4, 0, 4, 4)
+
+
+def random_actions(
+    rng: np.random.Generator,
+    length: int,
+    vehicles: Sequence[int],
+    default_action: Sequence[int] = DEFAULT_ACTION,
+    hold: float = 0.7,
+) -> List[tuple]:
+    """
+    Erzeugt eine zufällige Aktionsfolge. Jedes Fahrzeug aus vehicles behält seine vorherige Aktion mit der
+    Wahrscheinlichkeit hold bei und wählt sonst eine zufällige Aktion, die übrigen Fahrzeuge führen immer ihre
+    Aktion aus default_action aus.
+    :param length: Die Anzahl der Schritte.
+    :param vehicles: Die Indizes der kontrollierten Fahrzeuge, deren Aktionen variiert werden.
+    :return: Liste mit einem Tupel (Aktion je kontrolliertem Fahrzeug) je Schritt.
+    """
+    action = list(default_action)
+    for vehicle in vehicles:
+        action[vehicle] = int(rng.choice(ACTIONS))
+    actions = []
+    for _ in range(length):
+        for vehicle in vehicles:
+            if rng.random() >= hold:
+                action[vehicle] = int(rng.choice(ACTIONS))
+        actions.append(tuple(action))
+    return actions
+
+
+def generate_candidates(
+    count: int,
+    vehicles: Sequence[int],
+    seed: int = 0,
+    default_action: Sequence[int] = DEFAULT_ACTION,
+) -> List[List[tuple]]:
+    """
+    :return: count zufällige Aktionsfolgen (siehe random_actions) mit einer Länge zwischen MIN_SIM_STEPS und
+    MAX_SIM_STEPS. Der i-te Kandidat hängt nur von seed und i ab.
+    """
+    candidates = []
+    for index in range(count):
+        rng = np.random.default_rng([seed, index])
+        length = int(rng.integers(MIN_SIM_STEPS, MAX_SIM_STEPS + 1))
+        candidates.append(random_actions(rng, length, vehicles, default_action))
+    return candidates
+
+
+def check_actions(
+    env,
+    actions: Sequence,
+    agent: int = 0,
+    vut: int = 1,
+    fail_fast: bool = True,
+    record: bool = False,
+) -> Dict[str, Any]:
+    """
+    Simuliert die Aktionen ab dem aktuellen Zustand des Envs und prüft den Lauf mit den Constraints. Die Events
+    werden von einer EventBridge aus den Observations abgeleitet.
+    :param agent: Index des überholenden Fahrzeugs unter den kontrollierten Fahrzeugen.
+    :param vut: Index des VUT unter den kontrollierten Fahrzeugen.
+    :param fail_fast: Ob die Simulation nach der ersten sicheren Verletzung abgebrochen wird.
+    :param record: Ob die an die Constraints übergebenen "events" (Tupel aus Name und Payload) sowie die
+    "observations" und "rewards" je Schritt in das Ergebnis aufgenommen werden.
+    :return: Dict mit den "actions", der Anzahl simulierter "steps", "pruned" (True, wenn die Simulation nach einer
+    Verletzung abgebrochen wurde), "passed", den "violated" Constraints, den "statuses" je Constraint, den
+    "verdicts" als Dicts (leer, wenn abgebrochen), "first_violation_step" (None, wenn bestanden) und der Laufzeit
+    in "seconds".
+    """
+    start = time.perf_counter()
+    checker = OnlineChecker(fail_fast=fail_fast)
+    bridge = EventBridge(env, agent, vut)
+    events = []
+    observations = []
+    rewards = []
+
+    def send(bridge_events):
+        for event in bridge_events:
+            if record:
+                events.append((event.name, dict(event.data)))
+            checker.send(event)
+
+    send(bridge.reset(env.unwrapped.observation_type.observe()))
+    steps = 0
+    pruned = False
+    for action in actions:
+        if not checker.step_allowed():
+            pruned = True
+            break
+        obs, reward, terminated, truncated, _ = env.step(action)
+        steps += 1
+        if record:
+            observations.append(obs)
+            rewards.append(reward)
+        send(bridge.step(obs))
+        if terminated or truncated:
+            break
+    pruned = pruned or not checker.step_allowed()
+
+    verdicts = []
+    if pruned:
+        # die übrigen Constraints sind noch offen, ein END-Event würde sie wegen des Abbruchs verletzen
+        first_violation_step = steps
+    else:
+        if record:
+            events.append(("END", {}))
+        verdicts = [verdict._asdict() for verdict in checker.end()]
+        first_violation_step = min(
+            (
+                verdict["first_violation_step"]
+                for verdict in verdicts
+                if not verdict["passed"]
+            ),
+            default=None,
+        )
+    statuses = dict(checker.monitor.statuses)
+    violated = [name for name, status in statuses.items() if status == VIOLATED]
+    result = {
+        "actions": list(actions),
+        "steps": steps,
+        "pruned": pruned,
+        "passed": not pruned and not violated,
+        "violated": violated,
+        "statuses": statuses,
+        "verdicts": verdicts,
+        "first_violation_step": first_violation_step,
+        "seconds": time.perf_counter() - start,
+    }
+    if record:
+        result.update(events=events, observations=observations, rewards=rewards)
+    return result
+
+
+def evaluate_candidate(
+    snapshot: EnvSnapshot, actions: Sequence, agent: int = 0, vut: int = 1
+) -> Dict[str, Any]:
+    """
+    Simuliert einen Kandidaten ab dem Snapshot und prüft ihn im fail-fast-Modus (siehe check_actions).
+    """
+    env = snapshot.restore()
+    try:
+        return check_actions(env, actions, agent, vut)
+    finally:
+        env.close()
+
+
+def rank(results: List[Dict[str, Any]]):
+    """
+    :return: Tupel aus den bestandenen Kandidaten (kürzeste Szenarien zuerst) und den Kandidaten mit Verletzungen.
+    Verletzende Kandidaten werden nach der Anzahl verletzter Constraints und dann absteigend nach dem Schritt der
+    ersten Verletzung sortiert, Beinahe-Erfolge stehen damit vorne.
+    """
+    satisfying = sorted(
+        (result for result in results if result["passed"]),
+        key=lambda result: result["steps"],
+    )
+    violating = sorted(
+        (result for result in results if not result["passed"]),
+        key=lambda result: (len(result["violated"]), -result["first_violation_step"]),
+    )
+    return satisfying, violating
+
+
+def simulate(
+    config: Dict[str, Any],
+    seed: int,
+    actions: Sequence,
+    agent: int = 0,
+    vut: int = 1,
+    cache: ResultCache = None,
+) -> Dict[str, Any]:
+    """
+    Simuliert die Aktionsfolge ab env.reset(seed) vollständig und prüft sie mit den Constraints (check_actions mit
+    record=True, ohne fail-fast). Liegt das Ergebnis bereits im Cache, wird highway-env nicht verwendet.
+    :param cache: Optionaler ResultCache für die Ergebnisse.
+    :return: Das Ergebnis von check_actions mit Events, Observations, Rewards und Verdicts.
+    """
+
+    def compute():
+        env = create_env(config, render_mode=None)
+        try:
+            env.reset(seed=seed)
+            return check_actions(env, actions, agent, vut, fail_fast=False, record=True)
+        finally:
+            env.close()
+
+    if cache is None:
+        return compute()
+    key = cache_key(
+        ENV_ID,
+        config,
+        seed,
+        actions,
+        agent=agent,
+        vut=vut,
+        fail_fast=False,
+        acceleration_threshold=ACCELERATION_THRESHOLD,
+    )
+    return cache.get_or_compute(key, compute)
+
+
+def fuzz(
+    candidates: List[Sequence],
+    config: Dict[str, Any] = None,
+    seed: int = 0,
+    workers: int = None,
+    agent: int = 0,
+    vut: int = 1,
+    chunksize: int = 1,
+    cache: ResultCache = None,
+) -> List[Dict[str, Any]]:
+    """
+    Wertet alle Kandidaten mit evaluate_candidate aus.
+    :param candidates: Liste von Aktionsfolgen (siehe generate_candidates).
+    :param config: Die Config des Envs, None für main.set_config().
+    :param seed: Der Seed für env.reset(), alle Kandidaten starten im selben Zustand.
+    :param workers: Die Anzahl der Prozesse, None für die Anzahl der CPU-Kerne, 0 für die Ausführung in diesem
+    Prozess.
+    :param chunksize: Die Anzahl der Kandidaten, die zusammen an einen Prozess übergeben werden.
+    :param cache: Optionaler ResultCache. Nur Kandidaten ohne Eintrag werden simuliert, sind alle Kandidaten
+    bereits bekannt, wird kein Env erzeugt.
+    :return: Die Ergebnisse von evaluate_candidate in der Reihenfolge der Kandidaten.
+    """
+    config = config or set_config()
+    results = [None] * len(candidates)
+    keys = []
+    if cache is not None:
+        versions = package_versions()
+        keys = [
+            cache_key(
+                ENV_ID,
+                config,
+                seed,
+                actions,
+                versions,
+                agent=agent,
+                vut=vut,
+                fail_fast=True,
+                acceleration_threshold=ACCELERATION_THRESHOLD,
+            )
+            for actions in candidates
+        ]
+        results = [cache.get(key) for key in keys]
+    pending = [index for index, result in enumerate(results) if result is None]
+    if not pending:
+        return results
+
+    env = create_env(config, render_mode=None)
+    env.reset(seed=seed)
+    snapshot = EnvSnapshot(env)
+    env.close()
+    pending_candidates = [candidates[index] for index in pending]
+    if workers == 0:
+        computed = [
+            evaluate_candidate(snapshot, actions, agent, vut)
+            for actions in pending_candidates
+        ]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(snapshot, agent, vut),
+        ) as executor:
+            computed = list(
+                executor.map(_evaluate, pending_candidates, chunksize=chunksize)
+            )
+    for index, result in zip(pending, computed):
+        results[index] = result
+        if cache is not None:
+            cache.put(keys[index], result)
+    return results
+
+
+_worker_args = None
+
+
+def _init_worker(snapshot: EnvSnapshot, agent: int, vut: int):
+    global _worker_args
+    _worker_args = (snapshot, agent, vut)
+
+
+def _evaluate(actions: Sequence):
+    snapshot, agent, vut = _worker_args
+    return evaluate_candidate(snapshot, actions, agent, vut)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sucht Aktionsfolgen, die die Constraints des Überholszenarios erfüllen oder verletzen."
+    )
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--vehicles",
+        type=int,
+        nargs="+",
+        default=[0, 1],
+        help="Indizes der kontrollierten Fahrzeuge, deren Aktionen variiert werden.",
+    )
+    parser.add_argument("--agent", type=int, default=0)
+    parser.add_argument("--vut", type=int, default=1)
+    parser.add_argument("--chunksize", type=int, default=1)
+    parser.add_argument(
+        "--simulation-frequency",
+        type=int,
+        default=None,
+        help="Überschreibt die simulation_frequency aus main.set_config.",
+    )
+    parser.add_argument("--top", type=int, default=3)
+    parser.add_argument(
+        "--cache",
+        metavar="DIR",
+        help="Speichert die Ergebnisse im Verzeichnis DIR und verwendet bekannte Ergebnisse wieder.",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=float,
+        default=None,
+        metavar="MB",
+        help="Maximale Größe des Caches in MB.",
+    )
+    args = parser.parse_args()
+
+    config = set_config()
+    if args.simulation_frequency:
+        config["simulation_frequency"] = args.simulation_frequency
+    candidates = generate_candidates(args.candidates, args.vehicles, args.seed)
+    cache = None
+    if args.cache:
+        max_bytes = int(args.cache_size * 2**20) if args.cache_size else None
+        cache = ResultCache(args.cache, max_bytes)
+    start = time.perf_counter()
+    results = fuzz(
+        candidates,
+        config,
+        args.seed,
+        args.workers,
+        args.agent,
+        args.vut,
+        args.chunksize,
+        cache,
+    )
+    seconds = time.perf_counter() - start
+
+    satisfying, violating = rank(results)
+    for title, ranked in (("Erfüllt", satisfying), ("Verletzt", violating)):
+        print("{} ({}):".format(title, len(ranked)))
+        for result in ranked[: args.top]:
+            print(
+                "  Kandidat {}: {} Schritte{}, verletzt: {}".format(
+                    results.index(result),
+                    result["steps"],
+                    " (abgebrochen)" if result["pruned"] else "",
+                    ", ".join(result["violated"]) or "-",
+                )
+            )
+    steps = sum(result["steps"] for result in results)
+    planned = sum(len(actions) for actions in candidates)
+    print(
+        "{} Kandidaten in {:.2f} s mit {} Prozessen: {:.2f} Kandidaten/s, {} von {} Schritten simuliert, "
+        "{} abgebrochen".format(
+            len(results),
+            seconds,
+            args.workers,
+            len(results) / seconds,
+            steps,
+            planned,
+            sum(result["pruned"] for result in results),
+        )
+    )
+    if cache is not None:
+        print(
+            "Cache: {hits} Treffer, {misses} Fehlschläge ({hit_rate:.0%}), {entries} Einträge, {bytes} Bytes, "
+            "{evictions} verdrängt".format(**cache.stats())
+        )
+
+
+if __name__ == "__main__":
+    main()
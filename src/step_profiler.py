@@ -0,0 +1,222 @@
+"""
+Optionale Zeitmessung der Phasen eines Testlaufs mit Export im Chrome-Trace-Format.
+
+Der StepProfiler zeichnet Spans (Name, Kategorie, Start und Ende in Nanosekunden) auf:
+  - die Schleife selbst über span(), z.B. je Simulationsschritt,
+  - die Physik (_simulate) und den Aufbau der Observation (observe) des highway-env über instrument_env(),
+  - die öffentlichen Methoden eines ObservationWrappers über instrument_wrapper(),
+  - Event-Auswahl und Fortschalten der b-threads eines BProgram über instrument_bprogram().
+Die Instrumentierung ersetzt nur Methoden der übergebenen Instanz, nicht instrumentierte Objekte sind nicht
+betroffen. Ein deaktivierter StepProfiler instrumentiert nichts und zeichnet nichts auf.
+
+Die Spans können als Chrome-Trace-JSON (chrome://tracing, https://ui.perfetto.dev) gespeichert oder als Tabelle je
+Phase zusammengefasst werden.
+
+Beispiel:
+    profiler = StepProfiler()
+    profiler.instrument_env(env)
+    for step in range(steps):
+        with profiler.span("step"):
+            env.step(action)
+    profiler.write_chrome_trace("trace.json")
+    print(profiler.format_summary())
+"""
+
+import contextlib
+import functools
+import inspect
+import json
+import os
+import time
+from threading import get_ident
+from typing import Dict, List
+
+
+class _Span:
+    """
+    Kontextmanager für einen Span, leichter als contextlib.contextmanager.
+    """
+
+    __slots__ = ("spans", "name", "category", "start")
+
+    def __init__(self, spans: list, name: str, category: str):
+        self.spans = spans
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.spans.append(
+            (self.name, self.category, self.start, time.perf_counter_ns(), get_ident())
+        )
+
+
+class StepProfiler:
+    """
+    Zeichnet Spans auf und exportiert sie.
+
+    :attribute enabled: Ob aufgezeichnet wird.
+    :attribute spans: Liste der Spans als Tupel (Name, Kategorie, Start in ns, Ende in ns, Thread-Id).
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.spans = []
+
+    def span(self, name: str, category: str = "loop"):
+        """
+        :return: Kontextmanager, der die Dauer seines Blocks als Span aufzeichnet.
+        """
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return _Span(self.spans, name, category)
+
+    def wrap(self, function, name: str, category: str):
+        """
+        :return: Funktion, die function aufruft und jeden Aufruf als Span aufzeichnet. Ist der StepProfiler
+        deaktiviert, function selbst.
+        """
+        if not self.enabled:
+            return function
+        spans = self.spans
+        clock = time.perf_counter_ns
+
+        @functools.wraps(function)
+        def instrumented(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                spans.append((name, category, start, clock(), get_ident()))
+
+        return instrumented
+
+    def instrument_env(self, env):
+        """
+        Misst env.step() ("env.step"), darin die Physik-Simulation ("env.simulate") und den Aufbau der Observation
+        ("env.observe"). Da reset() den Observation-Typ neu erzeugt, wird dieser nach jedem Aufbau der Spaces erneut
+        instrumentiert.
+        """
+        if not self.enabled:
+            return env
+        unwrapped = env.unwrapped
+        unwrapped.step = self.wrap(unwrapped.step, "env.step", "env")
+        unwrapped._simulate = self.wrap(unwrapped._simulate, "env.simulate", "env")
+        define_spaces = unwrapped.define_spaces
+
+        def instrumented_define_spaces():
+            define_spaces()
+            observation_type = unwrapped.observation_type
+            observation_type.observe = self.wrap(
+                observation_type.observe, "env.observe", "env"
+            )
+
+        unwrapped.define_spaces = instrumented_define_spaces
+        instrumented_define_spaces()
+        return env
+
+    def instrument_wrapper(self, wrapper):
+        """
+        Misst jede öffentliche Methode des ObservationWrappers als "wrapper.<Methode>".
+        """
+        if not self.enabled:
+            return wrapper
+        for name, _ in inspect.getmembers(type(wrapper), inspect.isfunction):
+            if not name.startswith("_"):
+                setattr(
+                    wrapper,
+                    name,
+                    self.wrap(getattr(wrapper, name), "wrapper." + name, "wrapper"),
+                )
+        return wrapper
+
+    def instrument_bprogram(self, bprogram):
+        """
+        Misst die Event-Auswahl ("bp.select") und das Fortschalten der b-threads ("bp.advance") eines BProgram.
+        """
+        if not self.enabled:
+            return bprogram
+        bprogram.next_event = self.wrap(bprogram.next_event, "bp.select", "bp")
+        bprogram.advance_bthreads = self.wrap(
+            bprogram.advance_bthreads, "bp.advance", "bp"
+        )
+        return bprogram
+
+    def clear(self):
+        self.spans.clear()
+
+    def chrome_trace(self) -> dict:
+        """
+        :return: Die Spans im Chrome-Trace-Format als vollständige Events ("ph": "X"), Zeiten in Mikrosekunden
+        relativ zum ersten Span.
+        """
+        origin = min((span[2] for span in self.spans), default=0)
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (start - origin) / 1000,
+                    "dur": (end - start) / 1000,
+                    "pid": pid,
+                    "tid": tid,
+                }
+                for name, category, start, end, tid in self.spans
+            ],
+            "displayTimeUnit": "ns",
+        }
+
+    def write_chrome_trace(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.chrome_trace(), file)
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        :return: Dict je Phase (Name des Spans) mit "category", "count", "total_ms", "mean_us", "max_us" und
+        "share", dem Anteil an der gesamten aufgezeichneten Zeit vom ersten Start bis zum letzten Ende. Da Spans
+        verschachtelt sein können (z.B. "env.simulate" in "env.step"), ergeben die Anteile zusammen mehr als 1.
+        """
+        if not self.spans:
+            return {}
+        wall = max(span[3] for span in self.spans) - min(span[2] for span in self.spans)
+        durations: Dict[str, List[int]] = {}
+        categories = {}
+        for name, category, start, end, _ in self.spans:
+            durations.setdefault(name, []).append(end - start)
+            categories[name] = category
+        summary = {}
+        for name, phase_durations in durations.items():
+            total = sum(phase_durations)
+            summary[name] = {
+                "category": categories[name],
+                "count": len(phase_durations),
+                "total_ms": total / 1e6,
+                "mean_us": total / len(phase_durations) / 1e3,
+                "max_us": max(phase_durations) / 1e3,
+                "share": total / wall if wall > 0 else 0.0,
+            }
+        return summary
+
+    def format_summary(self) -> str:
+        """
+        :return: Die Zusammenfassung als Tabelle, nach Gesamtzeit absteigend sortiert.
+        """
+        lines = [
+            "{:<45} {:>8} {:>12} {:>12} {:>12} {:>7}".format(
+                "Phase", "Anzahl", "Gesamt ms", "Mittel us", "Max us", "Anteil"
+            )
+        ]
+        for name, phase in sorted(
+            self.summary().items(), key=lambda item: -item[1]["total_ms"]
+        ):
+            lines.append(
+                "{:<45} {count:>8} {total_ms:>12.2f} {mean_us:>12.1f} {max_us:>12.1f} {share:>7.1%}".format(
+                    name, **phase
+                )
+            )
+        return "\n".join(lines)
@@ -0,0 +1,109 @@
+import numpy as np
+from highway_env.vehicle.kinematics import Vehicle
+
+from .lane_index import LaneIndex
+
+# Abstand der Mittelpunkte zweier Fahrzeuge, ab dem sie sich berühren (halbe Länge des einen plus halbe des anderen)
+COLLISION_MARGIN = Vehicle.LENGTH
+
+
+class TimeToCollisionGrid:
+    """
+    Beantwortet Sicherheitsabfragen des ObservationWrappers über eine TimeToCollision-Observation durch direkten
+    Zugriff auf das Gitter, ohne die einzelnen Fahrzeuge zu betrachten.
+
+    Das Gitter einer Observation hat die Form (Geschwindigkeiten x Spuren x Zeit) = (3 x 3 x horizon *
+    policy_frequency). Die Geschwindigkeiten sind die nächstniedrigere, die aktuelle und die nächsthöhere
+    Zielgeschwindigkeit des Fahrzeugs (SLOWER, CURRENT, FASTER), die Spuren die linke, die eigene und die rechte
+    (indiziert über LaneIndex.LEFT, SAME und RIGHT). Ein Eintrag größer 0 bedeutet eine vorhergesagte Kollision im
+    Zeitschritt, Spuren außerhalb der Straße sind vollständig belegt.
+
+    :attribute time_step: Die Dauer eines Zeitschritts des Gitters in Sekunden (1 / policy_frequency).
+    :attribute time_cells: Die Anzahl der Zeitschritte des Gitters.
+
+    Note: HighwayEnv berechnet das Gitter mit der Zielgeschwindigkeit des Fahrzeugs, nicht mit der tatsächlichen.
+    Während das Fahrzeug beschleunigt oder bremst, weichen die Antworten daher von denen über Kinematics ab.
+    """
+
+    SLOWER = 0
+    CURRENT = 1
+    FASTER = 2
+
+    def __init__(self, horizon: float, policy_frequency: float):
+        """
+        :param horizon: Der Zeithorizont der Observation in Sekunden.
+        :param policy_frequency: Die policy_frequency des Environments.
+        """
+        self.time_step = 1 / policy_frequency
+        self.time_cells = int(horizon * policy_frequency)
+
+    @classmethod
+    def from_config(cls, config: dict, policy_frequency: float):
+        """
+        Baut das Gitter aus der Observation-Config eines Fahrzeugs auf.
+        :param config: Die Observation-Config (siehe occupancy_grid.get_observation_config).
+        :param policy_frequency: Die policy_frequency des Environments.
+        :return: Das TimeToCollisionGrid oder None, wenn die Observation nicht vom Typ TimeToCollision ist.
+        """
+        if config.get("type") != "TimeToCollision":
+            return None
+        # Standardwert aus TimeToCollisionObservation
+        return cls(config.get("horizon", 10), policy_frequency)
+
+    def lanes_safe(
+        self, grids: np.ndarray, horizon: float, speed: int = CURRENT
+    ) -> np.ndarray:
+        """
+        :param grids: Die Gitter der Form (Geschwindigkeiten x Spuren x Zeit), auch gestapelt für mehrere Fahrzeuge
+        mit vorangestellten Achsen.
+        :param horizon: Der Zeitraum in Sekunden, in dem keine Kollision vorhergesagt sein darf. Ist er länger als der
+        Horizont der Observation, wird deren Horizont genutzt.
+        :param speed: Die Geschwindigkeit (SLOWER, CURRENT oder FASTER), mit der gefahren wird.
+        :return: Bool-Array der Form (... x Spuren), True, wenn auf der Spur bis einschließlich des Zeitschritts von
+        horizon keine Kollision vorhergesagt ist.
+        """
+        cells = int(horizon / self.time_step) + 1
+        return ~(grids[..., speed, :, :cells] > 0).any(axis=-1)
+
+
+def predict_safe_lanes(
+    x: np.ndarray,
+    y: np.ndarray,
+    vx: np.ndarray,
+    horizon: float,
+    time_step: float,
+    lane_width: float,
+) -> np.ndarray:
+    """
+    Berechnet die Antworten von TimeToCollisionGrid.lanes_safe aus einer Kinematics-Observation. Wie in HighwayEnv
+    gelten ein Fahrzeug und die beiden Punkte eine Fahrzeuglänge davor und dahinter als Kollisionspunkte, betrachtet
+    werden nur Fahrzeuge, auf die sich das betrachtete Fahrzeug zubewegt.
+    :param x: Die relativen x-Positionen der anderen Fahrzeuge der Form (Fahrzeuge x andere Fahrzeuge).
+    :param y: Die relativen y-Positionen in der Form von x.
+    :param vx: Die relativen Geschwindigkeiten in x-Richtung in der Form von x.
+    :param horizon: Der Zeitraum in Sekunden, in dem keine Kollision vorhergesagt sein darf.
+    :param time_step: Die Dauer eines Zeitschritts in Sekunden, auf die die Zeit bis zur Kollision gerundet wird.
+    :param lane_width: Die Spurbreite, über die die anderen Fahrzeuge den relativen Spuren zugeordnet werden.
+    :return: Bool-Array der Form (Fahrzeuge x Spuren), indiziert über LaneIndex.LEFT, SAME und RIGHT.
+    """
+    # die Annäherungsgeschwindigkeit ist positiv, wenn der Abstand kleiner wird
+    closing = -vx[..., np.newaxis]
+    points = x[..., np.newaxis] + np.array([0, -COLLISION_MARGIN, COLLISION_MARGIN])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        time_to_collision = points / closing
+    # wie in highway_env.envs.common.finite_mdp.compute_ttc_grid wird die Zeit auf ganze Zeitschritte abgerundet
+    colliding = (
+        (closing != 0)
+        & (time_to_collision >= 0)
+        & (time_to_collision / time_step < int(horizon / time_step) + 1)
+    ).any(axis=-1)
+
+    relative_lane = np.round(y / lane_width)
+    safe = np.empty(x.shape[:-1] + (3,), dtype=bool)
+    for lane, offset in (
+        (LaneIndex.LEFT, -1),
+        (LaneIndex.SAME, 0),
+        (LaneIndex.RIGHT, 1),
+    ):
+        safe[..., lane] = ~(colliding & (relative_lane == offset)).any(axis=-1)
+    return safe
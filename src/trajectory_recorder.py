@@ -0,0 +1,182 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from .observation_wrapper import stack_observation
+
+HEADER_FILE = "header.json"
+STEPS_FILE = "steps.npy"
+
+
+class RecordingFullError(Exception):
+    pass
+
+
+class TrajectoryRecorder:
+    """
+    Schreibt die Daten eines Environment-Laufs Schritt für Schritt in vorab angelegte, memory-mapped .npy-Dateien.
+
+    Je Datenstrom wird beim ersten Schritt eine Datei der Form (max_steps x Form des Wertes) angelegt. Das Schreiben
+    eines Schrittes ist danach nur noch eine Zuweisung in den gemappten Speicher, das Betriebssystem schreibt die
+    Seiten im Hintergrund auf die Platte. Ein kleiner JSON-Header mit der Env-Config, der Anzahl der aufgezeichneten
+    Schritte und den Formen der Datenströme wird schon beim Anlegen des Recorders und bei jedem neuen Datenstrom
+    geschrieben. Die Anzahl der aufgezeichneten Schritte steht zusätzlich in der memory-mapped Datei steps.npy, die
+    jeder Schritt mit einer Zuweisung aktualisiert. load_recording liest die Anzahl von dort, eine nicht geschlossene
+    Aufzeichnung (z.B. nach einem Abbruch) ist damit vollständig lesbar.
+
+    Erscheint ein Datenstrom (z.B. ein info-Eintrag) erst nach dem ersten Schritt, wird der Schritt seines ersten
+    Wertes als "first_step" im Header abgelegt. Die Zeilen davor sind bei Gleitkomma-Datenströmen NaN, sonst 0.
+
+    Aufgezeichnet werden die Datenströme "observations", "actions", "rewards", "terminated" und "truncated" sowie
+    alle numerischen Werte aus info. Verschachtelte info-Einträge werden mit Punkten getrennt abgelegt, z.B.
+    "info.rewards.collision_reward". Nicht numerische info-Werte werden nicht aufgezeichnet.
+
+    :attribute directory: Das Verzeichnis, in das die Aufzeichnung geschrieben wird.
+    :attribute max_steps: Die maximale Anzahl an Schritten, für die Speicher angelegt wird.
+    :attribute config: Die Config des Environments, die im Header abgelegt wird.
+    :attribute observation_rows: Die Anzahl der Zeilen je Fahrzeug, auf die eine Kinematics-MultiAgentObservation
+    gestapelt wird (siehe stack_observation). Kinematics mit "vehicles_count": 1 liefert je Schritt unterschiedlich viele Zeilen,
+    dann sollte hier die Anzahl der Fahrzeuge auf der Straße angegeben werden. Ohne Angabe wird die Zeilenanzahl des
+    ersten Schrittes genutzt.
+    :attribute steps: Die Anzahl der bisher aufgezeichneten Schritte.
+
+    Die Aufzeichnung kann mit load_recording gelesen werden, ohne sie vollständig in den Speicher zu laden.
+    """
+
+    def __init__(
+        self,
+        directory,
+        max_steps: int,
+        config: dict = None,
+        observation_rows: int = None,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_steps = max_steps
+        self.config = config
+        self.observation_rows = observation_rows
+        self.steps = 0
+        self.__streams = {}
+        self.__first_steps = {}
+        self.__step_count = np.lib.format.open_memmap(
+            self.directory / STEPS_FILE, mode="w+", dtype=np.int64, shape=(1,)
+        )
+        self.__write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def record(self, observation, action, reward, terminated, truncated, info=None):
+        """
+        Zeichnet einen Schritt auf, wie er von env.step() zurückgegeben wird, zusammen mit der ausgeführten Aktion.
+        :raises RecordingFullError: Wenn bereits max_steps Schritte aufgezeichnet wurden.
+        """
+        if self.steps >= self.max_steps:
+            raise RecordingFullError(
+                "The recording is full after {} steps.".format(self.max_steps)
+            )
+        # nur Kinematics-Zeilen (2D je Fahrzeug) werden auf eine feste Zeilenanzahl gebracht, z.B. OccupancyGrid-
+        # Tupel haben bereits eine feste Form
+        if isinstance(observation, (tuple, list)) and np.ndim(observation[0]) == 2:
+            if self.observation_rows is None:
+                self.observation_rows = max(len(values) for values in observation)
+            observation = stack_observation(observation, self.observation_rows)
+        self.__write("observations", observation)
+        self.__write("actions", action)
+        self.__write("rewards", reward)
+        self.__write("terminated", terminated)
+        self.__write("truncated", truncated)
+        for name, value in _flatten_info(info or {}, "info"):
+            self.__write(name, value)
+        self.steps += 1
+        self.__step_count[0] = self.steps
+
+    def close(self):
+        """
+        Schreibt alle gemappten Seiten auf die Platte und aktualisiert den Header.
+        """
+        for stream in self.__streams.values():
+            stream.flush()
+        self.__step_count.flush()
+        self.__write_header()
+
+    def __write_header(self):
+        header = {
+            "steps": self.steps,
+            "max_steps": self.max_steps,
+            "config": self.config,
+            "streams": {
+                name: {
+                    "dtype": stream.dtype.str,
+                    "shape": list(stream.shape[1:]),
+                    "first_step": self.__first_steps[name],
+                }
+                for name, stream in self.__streams.items()
+            },
+        }
+        with open(self.directory / HEADER_FILE, "w") as header_file:
+            json.dump(header, header_file, indent=2, default=_to_json)
+
+    def __write(self, name, value):
+        stream = self.__streams.get(name)
+        if stream is None:
+            value = np.asarray(value)
+            stream = np.lib.format.open_memmap(
+                self.directory / (name + ".npy"),
+                mode="w+",
+                dtype=value.dtype,
+                shape=(self.max_steps, *value.shape),
+            )
+            # die Zeilen vor dem ersten Wert sind keine Messwerte
+            if value.dtype.kind == "f":
+                stream[: self.steps] = np.nan
+            self.__streams[name] = stream
+            self.__first_steps[name] = self.steps
+            self.__write_header()
+        stream[self.steps] = value
+
+
+def load_recording(directory, mmap_mode: str = "r"):
+    """
+    Öffnet eine mit dem TrajectoryRecorder geschriebene Aufzeichnung.
+    :param directory: Das Verzeichnis der Aufzeichnung.
+    :param mmap_mode: Wird an np.load weitergegeben. Mit "r" werden die Daten erst beim Zugriff von der Platte gelesen.
+    :return: Tupel aus Header und einem Dict mit den Datenströmen, jeweils gekürzt auf die aufgezeichneten Schritte.
+    Die Anzahl der Schritte im Header wird aus steps.npy übernommen, auch wenn der Recorder nicht geschlossen wurde.
+    """
+    directory = Path(directory)
+    with open(directory / HEADER_FILE) as header_file:
+        header = json.load(header_file)
+    if (directory / STEPS_FILE).exists():
+        header["steps"] = int(np.load(directory / STEPS_FILE)[0])
+    streams = {
+        name: np.load(directory / (name + ".npy"), mmap_mode=mmap_mode)[
+            : header["steps"]
+        ]
+        for name in header["streams"]
+    }
+    return header, streams
+
+
+def _flatten_info(info: dict, prefix: str):
+    for key, value in info.items():
+        name = "{}.{}".format(prefix, key)
+        if isinstance(value, dict):
+            yield from _flatten_info(value, name)
+            continue
+        try:
+            array = np.asarray(value)
+        except ValueError:
+            continue
+        if array.dtype.kind in "biuf":
+            yield name, array
+
+
+def _to_json(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    return str(value)
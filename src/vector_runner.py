@@ -0,0 +1,156 @@
+"""
+Führt mehrere Kopien des highway-v0-Szenarios aus main.py parallel als Gymnasium-Vector-Env aus.
+
+Aufruf aus dem Repository-Root:
+    python -m src.vector_runner --envs 8 --steps 200
+    python -m src.vector_runner --envs 8 --steps 200 --sync
+"""
+
+import argparse
+import time
+from typing import Any, Dict
+
+import gymnasium as gym
+import highway_env  # noqa: F401 (registriert highway-v0)
+import numpy as np
+from gymnasium.spaces import Box
+from gymnasium.vector import AsyncVectorEnv, SyncVectorEnv
+
+from .main import set_config
+from .observation_wrapper import stack_observation
+
+DEFAULT_ACTION = (1, 1, 2, 4, 0, 4, 4)
+
+
+def count_vehicles(config: Dict[str, Any]) -> int:
+    """
+    :return: Die Anzahl der Fahrzeuge auf der Straße (kontrollierte und weitere Fahrzeuge). Kinematics mit
+    "see_behind" sieht höchstens diese Anzahl an Fahrzeugen.
+    """
+    return config["controlled_vehicles"] + config["vehicles_count"]
+
+
+class StackedObservation(gym.ObservationWrapper):
+    """
+    Stapelt die MultiAgentObservation zu einem Array (Fahrzeuge x rows x Features), fehlende Zeilen werden mit NaN
+    aufgefüllt (siehe stack_observation).
+
+    Kinematics mit "vehicles_count": 1 liefert je kontrolliertem Fahrzeug alle wahrgenommenen Fahrzeuge, der
+    observation_space gibt aber nur eine Zeile an. Vector-Envs legen ihre Puffer anhand des observation_space an,
+    daher wird er hier auf die gestapelte Form gesetzt.
+    """
+
+    def __init__(self, env: gym.Env, rows: int):
+        super().__init__(env)
+        spaces = env.observation_space.spaces
+        self.rows = rows
+        self.observation_space = Box(
+            -np.inf,
+            np.inf,
+            shape=(len(spaces), rows, spaces[0].shape[-1]),
+            dtype=np.float32,
+        )
+
+    def observation(self, observation):
+        return stack_observation(observation, self.rows).astype(np.float32, copy=False)
+
+
+def make_env(config: Dict[str, Any], rows: int):
+    """
+    :return: Funktion, die ein highway-v0-Env mit der übergebenen Config und gestapelten Observations erzeugt. Die
+    Funktion wird von AsyncVectorEnv in den Subprozessen aufgerufen.
+    """
+
+    def create():
+        env = gym.make("highway-v0", config=config, disable_env_checker=True)
+        return StackedObservation(env, rows)
+
+    return create
+
+
+class VectorRunner:
+    """
+    Führt num_envs Kopien des Szenarios als SyncVectorEnv (im Prozess) oder AsyncVectorEnv (je Env ein Subprozess)
+    aus.
+
+    Die Observations werden als ein zusammenhängendes Array (Envs x Fahrzeuge x Zeilen x Features) zurückgegeben.
+    Aktionen werden als Array (Envs x Fahrzeuge) übergeben und in das Tupel je kontrolliertem Fahrzeug umgewandelt,
+    das die MultiAgentAction des Vector-Envs erwartet. Beendete Envs werden vom Vector-Env automatisch
+    zurückgesetzt.
+
+    :attribute env: Das Gymnasium-Vector-Env.
+    :attribute num_envs: Die Anzahl der Envs.
+    :attribute agents: Die Anzahl der kontrollierten Fahrzeuge je Env.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        config: Dict[str, Any] = None,
+        asynchronous: bool = True,
+    ):
+        config = config or set_config()
+        env_fns = [make_env(config, count_vehicles(config)) for _ in range(num_envs)]
+        self.env = AsyncVectorEnv(env_fns) if asynchronous else SyncVectorEnv(env_fns)
+        self.num_envs = num_envs
+        self.agents = config["controlled_vehicles"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def reset(self, seed: int = None):
+        """
+        :param seed: Startwert, die Envs erhalten seed, seed + 1, ...
+        :return: Tupel aus den Observations (Envs x Fahrzeuge x Zeilen x Features) und den infos.
+        """
+        return self.env.reset(seed=seed)
+
+    def step(self, actions):
+        """
+        :param actions: Array (Envs x Fahrzeuge) mit den Aktionen. Eine einzelne Aktion je Fahrzeug wird für alle
+        Envs übernommen.
+        :return: Tupel aus Observations, Rewards, terminated, truncated und infos, jeweils über alle Envs.
+        """
+        actions = np.broadcast_to(np.asarray(actions), (self.num_envs, self.agents))
+        return self.env.step(tuple(actions[:, agent] for agent in range(self.agents)))
+
+    def close(self):
+        self.env.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Führt das Szenario aus main.py parallel in mehreren Envs aus."
+    )
+    parser.add_argument("--envs", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="SyncVectorEnv statt AsyncVectorEnv verwenden.",
+    )
+    args = parser.parse_args()
+
+    with VectorRunner(args.envs, asynchronous=not args.sync) as runner:
+        obs, _ = runner.reset(seed=args.seed)
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            obs, reward, terminated, truncated, info = runner.step(DEFAULT_ACTION)
+        seconds = time.perf_counter() - start
+    print(
+        "{} Envs x {} Steps in {:.2f} s: {:.1f} Env-Steps/s, Observations {}".format(
+            args.envs,
+            args.steps,
+            seconds,
+            args.envs * args.steps / seconds,
+            obs.shape,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import inspect
+import unittest
+
+from benchmarks.suites import WRAPPER_QUERIES
+from src.observation_wrapper import ObservationWrapper
+
+
+class TestWrapperSuite(unittest.TestCase):
+
+    def test_queries_cover_public_methods(self):
+        methods = {
+            name
+            for name, _ in inspect.getmembers(ObservationWrapper, inspect.isfunction)
+            if not name.startswith("_") and name != "set_observation"
+        }
+        self.assertEqual(methods, set(WRAPPER_QUERIES))
+
+
+if __name__ == "__main__":
+    unittest.main()
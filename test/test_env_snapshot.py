@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+
+from src.env_snapshot import *
+from src.main import create_env, set_config
+
+
+def create_test_env():
+    config = set_config()
+    config["simulation_frequency"] = 15
+    env = create_env(config, render_mode=None)
+    env.reset(seed=0)
+    return env
+
+
+def assert_same_observations(test, expected, actual):
+    test.assertEqual(len(expected), len(actual))
+    for expected_obs, actual_obs in zip(expected, actual):
+        for expected_rows, actual_rows in zip(expected_obs, actual_obs):
+            np.testing.assert_array_equal(expected_rows, actual_rows)
+
+
+class TestEnvSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.env = create_test_env()
+        run_actions(self.env, [DEFAULT_ACTION] * 3)
+        self.snapshot = EnvSnapshot(self.env)
+
+    def tearDown(self):
+        self.env.close()
+
+    def test_steps(self):
+        self.assertEqual(3, self.snapshot.steps)
+
+    def test_restore_continues_like_original(self):
+        continuation = [(0,) + DEFAULT_ACTION[1:]] * 3
+        restored = self.snapshot.restore()
+
+        expected = run_actions(self.env, continuation)
+        actual = run_actions(restored, continuation)
+
+        assert_same_observations(self, expected["observations"], actual["observations"])
+        self.assertEqual(expected["rewards"], actual["rewards"])
+
+    def test_restored_envs_are_independent(self):
+        first = self.snapshot.restore()
+        second = self.snapshot.restore()
+        first.step(DEFAULT_ACTION)
+
+        self.assertEqual(3, EnvSnapshot(second).steps)
+        self.assertEqual(4, EnvSnapshot(first).steps)
+        self.assertIsNot(first.unwrapped.road, second.unwrapped.road)
+
+    def test_explore(self):
+        continuations = [[(action,) + DEFAULT_ACTION[1:]] * 2 for action in range(3)]
+
+        in_process = explore(self.snapshot, continuations, workers=0)
+        in_workers = explore(self.snapshot, continuations, workers=1)
+
+        self.assertEqual(3, len(in_workers))
+        for expected, actual, actions in zip(in_process, in_workers, continuations):
+            self.assertEqual(actions, actual["actions"])
+            assert_same_observations(
+                self, expected["observations"], actual["observations"]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+
+from src.event_bridge import *
+from src.main import create_env, set_config
+from src.scenario_fuzzer import DEFAULT_ACTION, OnlineChecker
+
+
+def run_episode(env, first_action, steps=40):
+    """
+    :return: Die Observations nach reset() und nach jedem Schritt, das erste Fahrzeug führt immer first_action aus.
+    """
+    obs, _ = env.reset(seed=0)
+    observations = [obs]
+    for _ in range(steps):
+        obs, reward, terminated, truncated, _ = env.step(
+            (first_action,) + DEFAULT_ACTION[1:]
+        )
+        observations.append(obs)
+        if terminated or truncated:
+            break
+    return observations
+
+
+def bridge_events(bridge, observations):
+    events = bridge.reset(observations[0])
+    for obs in observations[1:]:
+        events += bridge.step(obs)
+    return events
+
+
+def check(events):
+    checker = OnlineChecker(fail_fast=False)
+    for event in events:
+        checker.send(event)
+    return [verdict._asdict() for verdict in checker.end()]
+
+
+class TestEventBridge(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        config = set_config()
+        config["simulation_frequency"] = 15
+        cls.env = create_env(config, render_mode=None)
+        # LANE_LEFT, FASTER, SLOWER
+        cls.episodes = {action: run_episode(cls.env, action) for action in (0, 3, 4)}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.env.close()
+
+    def test_dense_events(self):
+        observations = self.episodes[0]
+        bridge = EventBridge(self.env)
+        events = bridge_events(bridge, observations)
+
+        steps = len(observations) - 1
+        self.assertEqual("POSITION_UPDATE", events[0].name)
+        self.assertEqual(steps, bridge.sent["STEP"])
+        self.assertEqual(steps + 1, bridge.sent["POSITION_UPDATE"])
+        self.assertEqual(steps, bridge.sent["SPEED_UPDATE"])
+        self.assertEqual({}, bridge.suppressed)
+        for event in events:
+            if event.name == "POSITION_UPDATE":
+                self.assertTrue(
+                    START_RELATIVE_POS
+                    <= event.data["distance_to_vut"]
+                    <= END_RELATIVE_POS
+                )
+
+    def test_lane_change_and_speed_up(self):
+        lane_changes = [
+            event
+            for event in bridge_events(EventBridge(self.env), self.episodes[0])
+            if event.name == "LANE_CHANGE"
+        ]
+        speed_ups = [
+            event
+            for event in bridge_events(EventBridge(self.env), self.episodes[3])
+            if event.name == "SPEED_UP"
+        ]
+
+        self.assertGreater(len(lane_changes), 0)
+        self.assertGreater(len(speed_ups), 0)
+
+    def test_decimation_suppresses_updates(self):
+        observations = self.episodes[4]
+        bridge = EventBridge(self.env, position_tolerance=5.0, speed_tolerance=5.0)
+        events = bridge_events(bridge, observations)
+
+        steps = len(observations) - 1
+        self.assertEqual(steps, bridge.sent["STEP"])
+        self.assertEqual(
+            steps + 1,
+            bridge.sent["POSITION_UPDATE"] + bridge.suppressed["POSITION_UPDATE"],
+        )
+        self.assertEqual(
+            steps, bridge.sent["SPEED_UPDATE"] + bridge.suppressed["SPEED_UPDATE"]
+        )
+        self.assertGreater(bridge.suppressed["SPEED_UPDATE"], 0)
+        # gesendet wird trotzdem, sobald sich die Bedingung der Constraints ändert
+        speeds = [
+            event.data["speed"] for event in events if event.name == "SPEED_UPDATE"
+        ]
+        for previous, speed in zip(speeds, speeds[1:]):
+            self.assertTrue(
+                abs(speed - previous) >= 5.0
+                or speed_condition(speed) != speed_condition(previous)
+            )
+
+    def test_decimated_verdicts_match_dense(self):
+        for action, observations in self.episodes.items():
+            with self.subTest(action=action):
+                dense = check(bridge_events(EventBridge(self.env), observations))
+                decimated = check(
+                    bridge_events(
+                        EventBridge(
+                            self.env, position_tolerance=5.0, speed_tolerance=5.0
+                        ),
+                        observations,
+                    )
+                )
+
+                self.assertEqual(dense, decimated)
+
+    def test_step_frames(self):
+        for action, observations in self.episodes.items():
+            with self.subTest(action=action):
+                bridge = EventBridge(
+                    self.env, position_tolerance=5.0, speed_tolerance=5.0, frames=True
+                )
+                events = bridge_events(bridge, observations)
+
+                self.assertEqual(
+                    ["STEP_FRAME"] * (len(observations) - 1),
+                    [event.name for event in events[1:]],
+                )
+                self.assertEqual(
+                    check(bridge_events(EventBridge(self.env), observations)),
+                    check(events),
+                )
+
+
+class TestConditions(unittest.TestCase):
+
+    def test_position_condition(self):
+        self.assertEqual(-1, position_condition(START_RELATIVE_POS))
+        self.assertEqual(0, position_condition(0.0))
+        self.assertEqual(1, position_condition(END_RELATIVE_POS))
+
+    def test_speed_condition(self):
+        self.assertEqual(-1, speed_condition(MIN_SPEED - 1))
+        self.assertEqual(0, speed_condition((MIN_SPEED + MAX_SPEED) / 2))
+        self.assertEqual(1, speed_condition(MAX_SPEED + 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+
+from src.main import *
+
+
+class TestTimingSummary(unittest.TestCase):
+
+    def test_timing_summary(self):
+        summary = timing_summary([0.01] * 99 + [0.5], 2.0)
+
+        self.assertEqual(100, summary["steps"])
+        self.assertAlmostEqual(50.0, summary["steps_per_second"])
+        self.assertAlmostEqual(14.9, summary["mean_ms"])
+        self.assertGreater(summary["p99_ms"], 10.0)
+
+    def test_empty(self):
+        self.assertEqual(0.0, timing_summary([], 0.0)["p99_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,8 +4,13 @@ from typing import Any, Dict
 import gymnasium as gym
 import highway_env as highway
 import numpy as np
+from highway_env.envs.common.observation import observation_factory
 
+from src.lane_geometry import LaneGeometry
+from src.lane_index import LaneIndex
 from src.observation_wrapper import *
+from src.occupancy_grid import OccupancyGrid
+from src.time_to_collision import TimeToCollisionGrid, predict_safe_lanes
 
 
 def create_test_env(config: Dict[str, Any]) -> Env:
@@ -138,6 +143,18 @@ class TestObservationWrapper(unittest.TestCase):
     def test_left_lane_clear_vehicle_not_found(self):
         obs_wrapper = ObservationWrapper(np.array([]))
         self.assertFalse(obs_wrapper.is_left_lane_clear(1, 10, 10))
+        self.assertFalse(obs_wrapper.is_left_lane_clear(-1, 10, 10))
+        self.assertEqual({"is_left_lane_clear": 2}, obs_wrapper.misses)
+
+    def test_vehicle_not_found_raises(self):
+        obs_wrapper = ObservationWrapper(np.array([]), raise_on_miss=True)
+        with self.assertRaises(VehicleNotFoundError):
+            obs_wrapper.is_left_lane_clear(1, 10, 10)
+        with self.assertRaises(VehicleNotFoundError):
+            obs_wrapper.get_velocity(0)
+        self.assertEqual(
+            {"is_left_lane_clear": 1, "get_velocity": 1}, obs_wrapper.misses
+        )
 
     # is_right_lane_clear tests
 
@@ -206,6 +223,54 @@ class TestObservationWrapper(unittest.TestCase):
         obs_wrapper = ObservationWrapper(np.array([]))
         self.assertEqual(0, obs_wrapper.get_distance_to_leading_vehicle(1))
 
+    # get_distance_to_following_vehicle tests
+
+    def test_distance_following_vehicles(self):
+        obs_wrapper = ObservationWrapper(self.OBS_DISTANCE_TO_LEADING_VEHICLE)
+        self.assertEqual(
+            [0, 0, 50, 25], obs_wrapper.get_distances_to_following_vehicles().tolist()
+        )
+        self.assertEqual(25, obs_wrapper.get_distance_to_following_vehicle(3))
+
+    def test_distance_to_following_vehicle_not_found(self):
+        obs_wrapper = ObservationWrapper(np.array([]))
+        self.assertEqual(0, obs_wrapper.get_distance_to_following_vehicle(1))
+
+    # der LaneIndex muss die gleichen Ergebnisse wie der Durchlauf über alle Fahrzeuge liefern
+    def test_lane_index_matches_scan(self):
+        rng = np.random.default_rng(0)
+        observation = tuple(
+            np.column_stack(
+                [
+                    rng.uniform(-100, 100, 50),
+                    rng.choice([-8, -4, 0, 4, 8], 50) + rng.choice([0, 0.01], 50),
+                    rng.uniform(15, 30, 50),
+                    np.zeros(50),
+                ]
+            ).astype(np.float32)
+            for _ in range(7)
+        )
+        scan = ObservationWrapper(observation)
+        indexed = ObservationWrapper(observation, use_lane_index=True)
+        for vehicle_id in range(7):
+            self.assertEqual(
+                scan.get_distance_to_leading_vehicle(vehicle_id),
+                indexed.get_distance_to_leading_vehicle(vehicle_id),
+            )
+            self.assertEqual(
+                scan.get_distance_to_following_vehicle(vehicle_id),
+                indexed.get_distance_to_following_vehicle(vehicle_id),
+            )
+            for front, back in [(5, 5), (10, 0), (0, 20), (30, 30)]:
+                self.assertEqual(
+                    scan.is_left_lane_clear(vehicle_id, front, back),
+                    indexed.is_left_lane_clear(vehicle_id, front, back),
+                )
+                self.assertEqual(
+                    scan.is_right_lane_clear(vehicle_id, front, back),
+                    indexed.is_right_lane_clear(vehicle_id, front, back),
+                )
+
     # get_velocity tests
     def test_get_velocity_vehicle_not_found(self):
         obs_wrapper = ObservationWrapper(np.array([]))
@@ -229,6 +294,144 @@ class TestObservationWrapper(unittest.TestCase):
         obs_wrapper = ObservationWrapper(np.array([]))
         self.assertFalse(obs_wrapper.is_in_same_lane(1, 2))
 
+    # Batch-Varianten müssen die gleichen Ergebnisse wie die Einzelabfragen liefern
+    def test_are_left_lanes_clear_matches_scalar(self):
+        obs_wrapper = ObservationWrapper(self.OBS_LEFT_LANE_CLEAR_TEST)
+        for front, back in [(10, 10), (0, 10), (24, 24), (25, 25), (26, 24), (0, 0)]:
+            expected = [
+                obs_wrapper.is_left_lane_clear(i, front, back)
+                for i in range(len(self.OBS_LEFT_LANE_CLEAR_TEST))
+            ]
+            self.assertEqual(
+                expected, obs_wrapper.are_left_lanes_clear(front, back).tolist()
+            )
+
+    def test_are_right_lanes_clear_matches_scalar(self):
+        obs_wrapper = ObservationWrapper(self.OBS_RIGHT_LANE_CLEAR_TEST)
+        for front, back in [(10, 10), (10, 0), (24, 24), (25, 25), (24, 26), (0, 0)]:
+            expected = [
+                obs_wrapper.is_right_lane_clear(i, front, back)
+                for i in range(len(self.OBS_RIGHT_LANE_CLEAR_TEST))
+            ]
+            self.assertEqual(
+                expected, obs_wrapper.are_right_lanes_clear(front, back).tolist()
+            )
+
+    def test_get_distances_to_leading_vehicles(self):
+        obs_wrapper = ObservationWrapper(self.OBS_DISTANCE_TO_LEADING_VEHICLE)
+        self.assertEqual(
+            [0, 50, 25, 0], obs_wrapper.get_distances_to_leading_vehicles().tolist()
+        )
+
+    def test_get_velocities(self):
+        obs_wrapper = ObservationWrapper(self.OBS_LEFT_LANE_CLEAR_TEST)
+        self.assertEqual([25, 25, 25], obs_wrapper.get_velocities().tolist())
+
+    # testet, dass die Matrizen den Einzelabfragen für alle Paare der 7 gesteuerten Fahrzeuge entsprechen
+    def test_pairwise_relations_match_scalar(self):
+        env = create_test_env(
+            dict(
+                self.CONFIG,
+                controlled_vehicles=7,
+                vehicles_count=7,
+                initial_positions=None,
+            )
+        )
+        obs, _ = env.reset(seed=0)
+        obs_wrapper = ObservationWrapper(obs, env)
+        relations = obs_wrapper.get_pairwise_relations()
+        positions = obs_wrapper.get_positions()
+
+        self.assertEqual((7, 7), relations.same_lane.shape)
+        for i in range(7):
+            for j in range(7):
+                self.assertEqual(
+                    obs_wrapper.is_in_same_lane(i, j), relations.same_lane[i, j]
+                )
+                self.assertAlmostEqual(
+                    positions[j, 0] - positions[i, 0], relations.gaps[i, j], places=3
+                )
+                self.assertAlmostEqual(
+                    obs[j][0][2] - obs[i][0][2],
+                    relations.relative_speeds[i, j],
+                    places=3,
+                )
+
+    def test_get_nearest_vehicles(self):
+        observation = tuple(
+            np.array([[x, y, vx, 0]], dtype=np.float32)
+            for x, y, vx in ((100, 0, 20), (130, 4, 25), (90, 0, 30), (160, 0, 20))
+        )
+        obs_wrapper = ObservationWrapper(observation)
+
+        ids, distances = obs_wrapper.get_nearest_vehicles(2)
+        self.assertEqual([[2, 1], [0, 3], [0, 1], [1, 0]], ids.tolist())
+        self.assertEqual([[10, 30], [30, 30], [10, 40], [30, 60]], distances.tolist())
+
+        ids, distances = obs_wrapper.get_nearest_vehicles(3, same_lane=True)
+        self.assertEqual(
+            [[2, 3, -1], [-1, -1, -1], [0, 3, -1], [0, 2, -1]], ids.tolist()
+        )
+        self.assertEqual([60, 70, np.inf], distances[3].tolist())
+
+    def test_get_positions(self):
+        obs_wrapper = ObservationWrapper(self.OBS_DISTANCE_TO_LEADING_VEHICLE)
+        positions = obs_wrapper.get_positions()
+        self.assertEqual(
+            (len(self.OBS_DISTANCE_TO_LEADING_VEHICLE), 2), positions.shape
+        )
+        self.assertEqual(
+            [
+                vehicle[0][:2].tolist()
+                for vehicle in self.OBS_DISTANCE_TO_LEADING_VEHICLE
+            ],
+            positions.tolist(),
+        )
+
+    def test_batch_queries_empty_observation(self):
+        obs_wrapper = ObservationWrapper(np.array([]))
+        self.assertEqual(0, obs_wrapper.are_left_lanes_clear(10, 10).size)
+        self.assertEqual(0, obs_wrapper.get_distances_to_leading_vehicles().size)
+        self.assertEqual(0, obs_wrapper.get_velocities().size)
+        self.assertEqual((0, 0), obs_wrapper.get_pairwise_relations().gaps.shape)
+        self.assertEqual((0, 2), obs_wrapper.get_nearest_vehicles(2)[0].shape)
+
+    # Kinematics mit "vehicles_count": 1 liefert je Fahrzeug unterschiedlich viele Zeilen
+    def test_batch_queries_ragged_observation(self):
+        observation = (
+            self.OBS_DISTANCE_TO_LEADING_VEHICLE[1],
+            self.OBS_DISTANCE_TO_LEADING_VEHICLE[2][:2],
+            self.OBS_DISTANCE_TO_LEADING_VEHICLE[3][:1],
+        )
+        obs_wrapper = ObservationWrapper(observation)
+        self.assertEqual(
+            [50, 0, 0], obs_wrapper.get_distances_to_leading_vehicles().tolist()
+        )
+        self.assertEqual([25, 25, 25], obs_wrapper.get_velocities().tolist())
+        self.assertEqual(
+            [True, False, True], obs_wrapper.are_left_lanes_clear(10, 30).tolist()
+        )
+
+    # innerhalb eines Frames werden abgeleitete Werte nur einmal berechnet
+    def test_derived_values_reused_within_frame(self):
+        obs_wrapper = ObservationWrapper(self.OBS_DISTANCE_TO_LEADING_VEHICLE)
+        distances = obs_wrapper.get_distances_to_leading_vehicles()
+        obs_wrapper.get_distance_to_leading_vehicle(1)
+        self.assertIs(distances, obs_wrapper.get_distances_to_leading_vehicles())
+
+    # eine neue Observation beginnt einen neuen Frame
+    def test_set_observation_discards_frame(self):
+        obs_wrapper = ObservationWrapper(self.OBS_DISTANCE_TO_LEADING_VEHICLE)
+        self.assertEqual(50, obs_wrapper.get_distance_to_leading_vehicle(1))
+        self.assertEqual(25, obs_wrapper.get_velocity(0))
+
+        obs_wrapper.set_observation(self.OBS_LEFT_LANE_CLEAR_TEST)
+        self.assertEqual(50, obs_wrapper.get_distance_to_leading_vehicle(1))
+        self.assertTrue(obs_wrapper.is_left_lane_clear(0, 10, 10))
+
+        obs_wrapper.observation = np.array([])
+        self.assertEqual(0, obs_wrapper.get_velocity(0))
+
     # Testet, ob das Fahrzeug mit id=0 auf bestimmter Lane ist
     def test_is_in_lane(self):
         env = create_test_env(self.CONFIG)
@@ -269,6 +472,52 @@ class TestObservationWrapper(unittest.TestCase):
         # Env hat 4 Lanes
         self.assertFalse(obs_wrapper.is_in_lane(0, 5))
 
+    # testet, dass die Spurtabelle die gleichen Lanes wie das RoadNetwork liefert
+    def test_lane_geometry_matches_road_network(self):
+        env = create_test_env(self.CONFIG)
+        network = env.unwrapped.road.network
+        lane_geometry = LaneGeometry.from_road(env.unwrapped.road)
+
+        y_values = np.linspace(-3, 15, 73)
+        expected = [
+            network.get_closest_lane_index(np.array([0, y]), 0.0)[2] for y in y_values
+        ]
+        self.assertEqual(expected, lane_geometry.get_lane_ids(y_values).tolist())
+
+    # testet, dass die Spurtabelle nach einem reset mit neuer Road neu aufgebaut wird
+    def test_lane_geometry_refreshed_after_reset(self):
+        env = create_test_env(self.CONFIG)
+        obs, _ = env.reset()
+        obs_wrapper = ObservationWrapper(obs, env)
+        obs_wrapper.get_lane_ids()
+
+        env.unwrapped.configure({"lanes_count": 2})
+        obs, _ = env.reset()
+        obs_wrapper.set_observation(obs)
+
+        self.assertFalse(obs_wrapper.is_in_lane(0, 3))
+        self.assertTrue(obs_wrapper.is_in_lane(0, obs_wrapper.get_lane_ids()[0]))
+
+    def test_get_lane_ids(self):
+        env = create_test_env(self.CONFIG)
+        obs, _ = env.reset()
+        obs_wrapper = ObservationWrapper(obs, env)
+
+        # in dem Beispiel sind Lanes 4 Einheiten breit und beginnen bei Koordinate 0
+        self.assertEqual([obs[0][0][1] / 4], obs_wrapper.get_lane_ids().tolist())
+
+    # testet, dass bei gesetztem Environment die Spurbreite statt der gerundeten y-Koordinate genutzt wird
+    def test_is_in_same_lane_uses_lane_width(self):
+        env = create_test_env(self.CONFIG)
+        observation = (
+            np.array([[100, 1.9, 25, 0]], dtype=np.float32),
+            np.array([[120, 2.1, 25, 0]], dtype=np.float32),
+            np.array([[140, 3.4, 25, 0]], dtype=np.float32),
+        )
+        obs_wrapper = ObservationWrapper(observation, env)
+        self.assertFalse(obs_wrapper.is_in_same_lane(0, 1))
+        self.assertTrue(obs_wrapper.is_in_same_lane(1, 2))
+
     # testet, dass false bei nicht existierendem Vehicle geliefert wird
     def test_is_in_lane_vehicle_not_found(self):
         env = create_test_env(self.CONFIG)
@@ -280,5 +529,379 @@ class TestObservationWrapper(unittest.TestCase):
         self.assertFalse(obs_wrapper.is_in_lane(10, 0))
 
 
+class TestObservationConfig(unittest.TestCase):
+    KINEMATICS = TestObservationWrapper.CONFIG["observation"]["observation_config"]
+
+    def create_env(self, **observation_config):
+        config = dict(TestObservationWrapper.CONFIG, controlled_vehicles=3)
+        config["observation"] = {
+            "type": "MultiAgentObservation",
+            "observation_config": dict(self.KINEMATICS, **observation_config),
+        }
+        return create_test_env(config)
+
+    # testet, dass die Spalten der features aus der Config gelesen werden und die Reihenfolge beliebig ist
+    def test_feature_order(self):
+        env = self.create_env()
+        obs, _ = env.reset(seed=0)
+        reordered_env = self.create_env(
+            features=["presence", "vy", "y", "heading", "vx", "x"]
+        )
+        reordered_obs, _ = reordered_env.reset(seed=0)
+
+        expected = ObservationWrapper(obs, env)
+        actual = ObservationWrapper(reordered_obs, reordered_env)
+        self.assertEqual(
+            expected.get_positions().tolist(), actual.get_positions().tolist()
+        )
+        self.assertEqual(
+            expected.get_velocities().tolist(), actual.get_velocities().tolist()
+        )
+        self.assertEqual(
+            expected.get_lane_ids().tolist(), actual.get_lane_ids().tolist()
+        )
+        self.assertEqual(
+            expected.get_distances_to_leading_vehicles().tolist(),
+            actual.get_distances_to_leading_vehicles().tolist(),
+        )
+        self.assertEqual(
+            expected.are_left_lanes_clear(20, 20).tolist(),
+            actual.are_left_lanes_clear(20, 20).tolist(),
+        )
+        self.assertEqual(expected.is_in_same_lane(0, 1), actual.is_in_same_lane(0, 1))
+
+    def test_missing_feature(self):
+        env = self.create_env(features=["x", "y", "vx"])
+        with self.assertRaises(InvalidObservationConfigError):
+            ObservationWrapper(None, env)
+
+    def test_absolute(self):
+        env = self.create_env(absolute=True)
+        with self.assertRaises(InvalidObservationConfigError):
+            ObservationWrapper(None, env)
+
+    def test_unsupported_type(self):
+        config = dict(TestObservationWrapper.CONFIG)
+        config["observation"] = {"type": "TimeToCollision", "horizon": 5}
+        env = create_test_env(config)
+        ObservationWrapper(None, env)
+
+        env.unwrapped.configure({"observation": {"type": "LidarObservation"}})
+        env.reset()
+        with self.assertRaises(InvalidObservationConfigError):
+            ObservationWrapper(None, env)
+
+    # testet, dass die Config nach einem reset mit neuem ObservationType erneut gelesen wird
+    def test_config_read_after_reset(self):
+        env = self.create_env()
+        obs_wrapper = ObservationWrapper(None, env)
+
+        env.unwrapped.configure(
+            {
+                "observation": {
+                    "type": "MultiAgentObservation",
+                    "observation_config": dict(
+                        self.KINEMATICS, features=["y", "x", "vy", "vx"]
+                    ),
+                }
+            }
+        )
+        obs, _ = env.reset(seed=0)
+        obs_wrapper.set_observation(obs)
+        self.assertEqual(obs[0][0][1], obs_wrapper.get_positions()[0, 0])
+
+
+class TestOccupancyGrid(unittest.TestCase):
+    # Spurmitten liegen in den Spaltenmitten: Spalte 3 ist die eigene Spur, 0-2 links, 4-6 rechts
+    GRID_SIZE = [[-50, 50], [-14, 14]]
+    GRID_STEP = [5, 4]
+
+    CONFIG = {
+        "vehicles_count": 20,
+        "controlled_vehicles": 3,
+        "lanes_count": 4,
+        "observation": {
+            "type": "MultiAgentObservation",
+            "observation_config": {
+                "type": "OccupancyGrid",
+                "features": ["presence", "vx"],
+                "grid_size": GRID_SIZE,
+                "grid_step": GRID_STEP,
+                "absolute": False,
+            },
+        },
+        "action": TestObservationWrapper.CONFIG["action"],
+    }
+
+    KINEMATICS = TestObservationWrapper.CONFIG["observation"]
+
+    def create_grid(self, *cells):
+        """
+        :param cells: (x, y) der belegten Zellen relativ zum betrachteten Fahrzeug.
+        :return: Ein Gitter mit dem betrachteten Fahrzeug und den übergebenen belegten Zellen.
+        """
+        grid = OccupancyGrid(self.GRID_SIZE, self.GRID_STEP, ["presence"])
+        values = np.zeros((1, 20, 7), dtype=np.float32)
+        for x, y in ((0, 0),) + cells:
+            values[0, (x + 50) // 5, (y + 14) // 4] = 1
+        return grid, values
+
+    def test_lanes_clear(self):
+        grid, values = self.create_grid((22, -4), (-12, 8))
+
+        self.assertFalse(grid.lanes_clear(values, LaneIndex.LEFT, 25, 10))
+        self.assertTrue(grid.lanes_clear(values, LaneIndex.LEFT, 19, 10))
+        self.assertFalse(grid.lanes_clear(values, LaneIndex.RIGHT, 5, 15))
+        self.assertTrue(grid.lanes_clear(values, LaneIndex.RIGHT, 5, 10))
+
+    def test_leading_distances(self):
+        grid, values = self.create_grid((32, 0), (17, 0), (-20, 0), (10, 4))
+        self.assertEqual(15, grid.leading_distances(values))
+        self.assertEqual(
+            [15, 15], grid.leading_distances(np.stack([values] * 2)).tolist()
+        )
+
+        grid, values = self.create_grid((-20, 0), (10, 4))
+        self.assertEqual(0, grid.leading_distances(values))
+
+    def test_following_distances(self):
+        grid, values = self.create_grid((-32, 0), (-17, 0), (20, 0), (-10, 4))
+        self.assertEqual(15, grid.following_distances(values))
+        self.assertEqual(
+            [15, 15], grid.following_distances(np.stack([values] * 2)).tolist()
+        )
+
+        grid, values = self.create_grid((20, 0), (-10, 4))
+        self.assertEqual(0, grid.following_distances(values))
+
+    def test_missing_presence_feature(self):
+        with self.assertRaises(ValueError):
+            OccupancyGrid(self.GRID_SIZE, self.GRID_STEP, ["on_road"])
+
+    def test_from_config(self):
+        config = self.CONFIG["observation"]["observation_config"]
+        self.assertEqual(0, OccupancyGrid.from_config(config).presence_layer)
+        self.assertIsNone(
+            OccupancyGrid.from_config(self.KINEMATICS["observation_config"])
+        )
+
+    # testet, dass der ObservationWrapper bei OccupancyGrid-Observations das Gitter nutzt und dessen Antworten zu
+    # denen über Kinematics passen: Gitter frei impliziert Kinematics frei, die Distanz ist auf eine Zelle genau
+    def test_wrapper_matches_kinematics(self):
+        env = gym.make("highway-v0", render_mode="rgb_array", config=self.CONFIG)
+        for seed in range(5):
+            obs, _ = env.reset(seed=seed)
+            kinematics = observation_factory(env.unwrapped, self.KINEMATICS).observe()
+            grid_wrapper = ObservationWrapper(obs, env)
+            kinematics_wrapper = ObservationWrapper(kinematics)
+
+            for front, back in ((30, 20), (10, 40), (45, 0)):
+                for side in ("left", "right"):
+                    method = "are_{}_lanes_clear".format(side)
+                    grid_clear = getattr(grid_wrapper, method)(front, back)
+                    kinematics_clear = getattr(kinematics_wrapper, method)(front, back)
+                    self.assertTrue(np.all(kinematics_clear[grid_clear]))
+                    self.assertEqual(
+                        grid_clear[0],
+                        getattr(grid_wrapper, "is_{}_lane_clear".format(side))(
+                            0, front, back
+                        ),
+                    )
+
+            grid_distances = grid_wrapper.get_distances_to_leading_vehicles()
+            for vehicle_id, distance in enumerate(
+                kinematics_wrapper.get_distances_to_leading_vehicles()
+            ):
+                self.assertEqual(
+                    grid_distances[vehicle_id],
+                    grid_wrapper.get_distance_to_leading_vehicle(vehicle_id),
+                )
+                if 5 <= distance < 50:
+                    self.assertLessEqual(grid_distances[vehicle_id], distance)
+                    self.assertLess(distance, grid_distances[vehicle_id] + 5)
+
+            grid_distances = grid_wrapper.get_distances_to_following_vehicles()
+            self.assertEqual((3,), grid_distances.shape)
+            for vehicle_id, distance in enumerate(
+                kinematics_wrapper.get_distances_to_following_vehicles()
+            ):
+                self.assertEqual(
+                    grid_distances[vehicle_id],
+                    grid_wrapper.get_distance_to_following_vehicle(vehicle_id),
+                )
+                if 5 < distance <= 50:
+                    self.assertLess(grid_distances[vehicle_id], distance)
+                    self.assertLessEqual(distance, grid_distances[vehicle_id] + 5)
+        env.close()
+
+    # Abfragen, die das Gitter nicht beantworten kann, lösen einen Fehler aus, statt Gitterwerte als Kinematics zu
+    # lesen
+    def test_kinematics_only_queries_raise(self):
+        env = gym.make("highway-v0", render_mode="rgb_array", config=self.CONFIG)
+        obs, _ = env.reset(seed=0)
+        wrapper = ObservationWrapper(obs, env)
+        queries = {
+            "get_velocity": lambda: wrapper.get_velocity(0),
+            "is_in_same_lane": lambda: wrapper.is_in_same_lane(0, 1),
+            "is_in_lane": lambda: wrapper.is_in_lane(0, 1),
+            "get_lane_ids": wrapper.get_lane_ids,
+            "get_pairwise_relations": wrapper.get_pairwise_relations,
+            "get_nearest_vehicles": lambda: wrapper.get_nearest_vehicles(2),
+            "get_velocities": wrapper.get_velocities,
+            "get_positions": wrapper.get_positions,
+            "is_left_lane_safe": lambda: wrapper.is_left_lane_safe(0, 2),
+            "is_right_lane_safe": lambda: wrapper.is_right_lane_safe(0, 2),
+            "is_current_lane_safe": lambda: wrapper.is_current_lane_safe(0, 2),
+            "are_lanes_safe": lambda: wrapper.are_lanes_safe(2),
+        }
+        for name, query in queries.items():
+            with self.subTest(name):
+                with self.assertRaises(InvalidObservationConfigError):
+                    query()
+        env.close()
+
+    # ein einzelnes Gitter als ndarray ist die Observation eines Fahrzeugs, weitere IDs sind Fehlschläge
+    def test_single_grid_vehicle_count(self):
+        env = gym.make("highway-v0", render_mode="rgb_array", config=self.CONFIG)
+        obs, _ = env.reset(seed=0)
+        wrapper = ObservationWrapper(obs[0], env)
+
+        self.assertEqual(
+            wrapper.is_left_lane_clear(0, 10, 10),
+            ObservationWrapper(obs, env).is_left_lane_clear(0, 10, 10),
+        )
+        self.assertFalse(wrapper.is_left_lane_clear(1, 10, 10))
+        self.assertFalse(wrapper.is_left_lane_clear(2, 10, 10))
+        self.assertEqual(0, wrapper.get_distance_to_following_vehicle(1))
+        self.assertEqual(
+            {"is_left_lane_clear": 2, "get_distance_to_following_vehicle": 1},
+            wrapper.misses,
+        )
+        self.assertEqual((1,), wrapper.are_left_lanes_clear(0, 0).shape)
+        env.close()
+
+
+class TestTimeToCollision(unittest.TestCase):
+    CONFIG = {
+        "vehicles_count": 20,
+        "controlled_vehicles": 3,
+        "lanes_count": 4,
+        "policy_frequency": 2,
+        "observation": {
+            "type": "MultiAgentObservation",
+            "observation_config": {"type": "TimeToCollision", "horizon": 5},
+        },
+        "action": TestObservationWrapper.CONFIG["action"],
+    }
+
+    KINEMATICS = {
+        "type": "MultiAgentObservation",
+        "observation_config": {
+            "type": "Kinematics",
+            "vehicles_count": 30,
+            "features": ["x", "y", "vx", "vy"],
+            "normalize": False,
+            "absolute": False,
+            "see_behind": True,
+            "order": "sorted",
+        },
+    }
+
+    def test_lanes_safe(self):
+        grid = TimeToCollisionGrid(horizon=5, policy_frequency=2)
+        values = np.zeros((3, 3, grid.time_cells), dtype=np.float32)
+        # Kollision auf der linken Spur nach 2-2.5s, auf der rechten bei höherer Geschwindigkeit nach 0.5-1s
+        values[TimeToCollisionGrid.CURRENT, LaneIndex.LEFT, 4] = 0.5
+        values[TimeToCollisionGrid.FASTER, LaneIndex.RIGHT, 1] = 1
+
+        self.assertEqual([True, True, True], grid.lanes_safe(values, 1.9).tolist())
+        self.assertEqual([False, True, True], grid.lanes_safe(values, 2).tolist())
+        self.assertEqual(
+            [True, True, False],
+            grid.lanes_safe(values, 1, TimeToCollisionGrid.FASTER).tolist(),
+        )
+
+    def test_predict_safe_lanes(self):
+        # links 30m voraus mit 10m/s langsamer, rechts 20m dahinter mit 10m/s schneller, vorne gleich schnell
+        x = np.array([[30, -20, 10]], dtype=np.float32)
+        y = np.array([[-4, 4, 0]], dtype=np.float32)
+        vx = np.array([[-10, 10, 0]], dtype=np.float32)
+
+        # Kollisionspunkte links nach 2.5s, 3s und 3.5s, rechts nach 1.5s, 2s und 2.5s
+        self.assertEqual(
+            [[True, True, True]], predict_safe_lanes(x, y, vx, 1, 0.5, 4).tolist()
+        )
+        self.assertEqual(
+            [[True, True, False]], predict_safe_lanes(x, y, vx, 2, 0.5, 4).tolist()
+        )
+        self.assertEqual(
+            [[False, True, False]], predict_safe_lanes(x, y, vx, 2.5, 0.5, 4).tolist()
+        )
+
+    # testet, dass die Antworten aus dem TimeToCollision-Gitter denen aus Kinematics entsprechen. Beide Environments
+    # erzeugen mit gleichem Seed dieselben Fahrzeuge, die gesteuerten Fahrzeuge halten ihre Zielgeschwindigkeit.
+    def test_wrapper_matches_kinematics(self):
+        env = gym.make("highway-v0", config=self.CONFIG)
+        kinematics_env = gym.make(
+            "highway-v0", config=dict(self.CONFIG, observation=self.KINEMATICS)
+        )
+        idle = (1, 1, 1)
+        for seed in range(5):
+            obs, _ = env.reset(seed=seed)
+            kinematics_obs, _ = kinematics_env.reset(seed=seed)
+            for _ in range(3):
+                wrapper = ObservationWrapper(obs, env)
+                kinematics_wrapper = ObservationWrapper(kinematics_obs, kinematics_env)
+                for horizon in (1, 2.5, 4):
+                    expected = kinematics_wrapper.are_lanes_safe(horizon)
+                    self.assertEqual(
+                        expected.tolist(), wrapper.are_lanes_safe(horizon).tolist()
+                    )
+                    self.assertEqual(
+                        expected[0, LaneIndex.LEFT],
+                        wrapper.is_left_lane_safe(0, horizon),
+                    )
+                    self.assertEqual(
+                        expected[1, LaneIndex.RIGHT],
+                        wrapper.is_right_lane_safe(1, horizon),
+                    )
+                    self.assertEqual(
+                        expected[2, LaneIndex.SAME],
+                        wrapper.is_current_lane_safe(2, horizon),
+                    )
+                obs, *_ = env.step(idle)
+                kinematics_obs, *_ = kinematics_env.step(idle)
+        env.close()
+        kinematics_env.close()
+
+    def test_grid_queries_raise(self):
+        env = gym.make("highway-v0", config=self.CONFIG)
+        obs, _ = env.reset(seed=0)
+        wrapper = ObservationWrapper(obs, env)
+        queries = {
+            "is_left_lane_clear": lambda: wrapper.is_left_lane_clear(0, 10, 10),
+            "get_distance_to_following_vehicle": lambda: (
+                wrapper.get_distance_to_following_vehicle(0)
+            ),
+            "get_distances_to_leading_vehicles": (
+                wrapper.get_distances_to_leading_vehicles
+            ),
+            "get_positions": wrapper.get_positions,
+        }
+        for name, query in queries.items():
+            with self.subTest(name):
+                with self.assertRaises(InvalidObservationConfigError):
+                    query()
+        env.close()
+
+    def test_lane_safe_vehicle_not_found(self):
+        env = gym.make("highway-v0", config=self.CONFIG)
+        obs, _ = env.reset(seed=0)
+        obs_wrapper = ObservationWrapper(obs, env)
+        self.assertFalse(obs_wrapper.is_left_lane_safe(5, 1))
+        self.assertEqual({"is_left_lane_safe": 1}, obs_wrapper.misses)
+        env.close()
+
+
 if __name__ == "__main__":
     unittest.main()
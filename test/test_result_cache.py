@@ -0,0 +1,151 @@
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from src.result_cache import *
+
+VERSIONS = {"highway-env": "1.0"}
+
+
+class TestCacheKey(unittest.TestCase):
+
+    def test_stable(self):
+        key = cache_key("highway-v0", {"a": 1, "b": [1, 2]}, 0, [(1, 2)], VERSIONS)
+
+        self.assertEqual(
+            key, cache_key("highway-v0", {"b": [1, 2], "a": 1}, 0, [[1, 2]], VERSIONS)
+        )
+        self.assertEqual(
+            key,
+            cache_key(
+                "highway-v0",
+                {"a": np.int64(1), "b": np.array([1, 2])},
+                0,
+                [(1, 2)],
+                VERSIONS,
+            ),
+        )
+        self.assertEqual(64, len(key))
+
+    def test_inputs_change_key(self):
+        key = cache_key("highway-v0", {"a": 1}, 0, [(1, 2)], VERSIONS)
+
+        self.assertNotEqual(
+            key, cache_key("highway-v0", {"a": 2}, 0, [(1, 2)], VERSIONS)
+        )
+        self.assertNotEqual(
+            key, cache_key("highway-v0", {"a": 1}, 1, [(1, 2)], VERSIONS)
+        )
+        self.assertNotEqual(
+            key, cache_key("highway-v0", {"a": 1}, 0, [(1, 3)], VERSIONS)
+        )
+        self.assertNotEqual(
+            key, cache_key("highway-v0", {"a": 1}, 0, [(1, 2)], {"highway-env": "1.1"})
+        )
+        self.assertNotEqual(
+            key, cache_key("highway-v0", {"a": 1}, 0, [(1, 2)], VERSIONS, agent=1)
+        )
+
+    def test_package_versions(self):
+        self.assertEqual(set(PACKAGES), set(package_versions()))
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_and_put(self):
+        cache = ResultCache(self.directory.name)
+
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", {"value": np.arange(3)})
+        np.testing.assert_array_equal(np.arange(3), cache.get("a")["value"])
+
+        stats = cache.stats()
+        self.assertEqual(1, stats["hits"])
+        self.assertEqual(1, stats["misses"])
+        self.assertEqual(0.5, stats["hit_rate"])
+        self.assertEqual(1, stats["entries"])
+        self.assertGreater(stats["bytes"], 0)
+
+    def test_persistent(self):
+        ResultCache(self.directory.name).put("a", 1)
+
+        cache = ResultCache(self.directory.name)
+        self.assertIn("a", cache)
+        self.assertEqual(1, cache.get("a"))
+
+    def test_entry_of_other_instance(self):
+        first = ResultCache(self.directory.name)
+        second = ResultCache(self.directory.name)
+        first.put("a", 1)
+
+        self.assertIn("a", second)
+        self.assertEqual(1, second.get("a"))
+        self.assertEqual(first.size, second.size)
+
+    def test_failed_put_leaves_no_file(self):
+        cache = ResultCache(self.directory.name)
+
+        with self.assertRaises(Exception):
+            cache.put("a", lambda: None)
+        self.assertNotIn("a", cache)
+        self.assertEqual([], os.listdir(self.directory.name))
+
+    def test_get_or_compute(self):
+        cache = ResultCache(self.directory.name)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return None
+
+        # auch None wird gespeichert und nicht erneut berechnet
+        cache.get_or_compute("a", compute)
+        cache.get_or_compute("a", compute)
+        self.assertEqual(1, len(calls))
+
+    def test_lru_eviction(self):
+        cache = ResultCache(self.directory.name)
+        cache.put("a", b"x" * 1000)
+        entry_size = cache.size
+        cache.max_bytes = 2 * entry_size
+        cache.put("b", b"x" * 1000)
+        cache.get("a")
+        cache.put("c", b"x" * 1000)
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(1, cache.stats()["evictions"])
+        self.assertEqual(2, len(os.listdir(self.directory.name)))
+
+    def test_lru_order_survives_restart(self):
+        cache = ResultCache(self.directory.name)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        time.sleep(0.01)
+        cache.get("a")
+
+        cache = ResultCache(self.directory.name, max_bytes=cache.size)
+        cache.put("c", 3)
+        self.assertEqual(["a", "c"], sorted(key for key in "abc" if key in cache))
+
+    def test_clear(self):
+        cache = ResultCache(self.directory.name)
+        cache.put("a", 1)
+        cache.clear()
+
+        self.assertEqual(0, len(cache))
+        self.assertEqual([], os.listdir(self.directory.name))
+
+
+if __name__ == "__main__":
+    unittest.main()
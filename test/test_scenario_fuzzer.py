@@ -0,0 +1,123 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from src.main import set_config
+from src.result_cache import ResultCache
+from src.scenario_fuzzer import *
+
+
+def make_config():
+    config = set_config()
+    config["simulation_frequency"] = 15
+    return config
+
+
+class TestCandidates(unittest.TestCase):
+
+    def test_generate_candidates(self):
+        candidates = generate_candidates(5, vehicles=[0, 1], seed=3)
+
+        self.assertEqual(candidates, generate_candidates(5, vehicles=[0, 1], seed=3))
+        self.assertNotEqual(candidates, generate_candidates(5, vehicles=[0, 1], seed=4))
+        for actions in candidates:
+            self.assertTrue(MIN_SIM_STEPS <= len(actions) <= MAX_SIM_STEPS)
+            for action in actions:
+                self.assertEqual(DEFAULT_ACTION[2:], action[2:])
+                self.assertIn(action[0], ACTIONS)
+
+    def test_rank(self):
+        results = [
+            {
+                "passed": False,
+                "steps": 5,
+                "violated": ["position", "duration"],
+                "first_violation_step": 5,
+            },
+            {"passed": True, "steps": 30, "violated": [], "first_violation_step": None},
+            {
+                "passed": False,
+                "steps": 3,
+                "violated": ["speed_limit"],
+                "first_violation_step": 3,
+            },
+            {
+                "passed": False,
+                "steps": 20,
+                "violated": ["speed_limit"],
+                "first_violation_step": 20,
+            },
+            {"passed": True, "steps": 12, "violated": [], "first_violation_step": None},
+        ]
+
+        satisfying, violating = rank(results)
+        self.assertEqual([12, 30], [result["steps"] for result in satisfying])
+        self.assertEqual([20, 3, 5], [result["steps"] for result in violating])
+
+
+class TestFuzz(unittest.TestCase):
+
+    def test_prunes_speed_violation(self):
+        # der Agent bremst dauerhaft und unterschreitet MIN_SPEED
+        candidate = [(4,) + DEFAULT_ACTION[1:]] * MAX_SIM_STEPS
+
+        result = fuzz([candidate], make_config(), workers=0)[0]
+
+        self.assertTrue(result["pruned"])
+        self.assertFalse(result["passed"])
+        self.assertIn("speed_limit", result["violated"])
+        self.assertLess(result["steps"], MAX_SIM_STEPS)
+        self.assertEqual(result["steps"], result["first_violation_step"])
+
+    def test_workers(self):
+        candidates = generate_candidates(2, vehicles=[0], seed=1)
+
+        in_process = fuzz(candidates, make_config(), workers=0)
+        in_workers = fuzz(candidates, make_config(), workers=1)
+
+        for expected, actual in zip(in_process, in_workers):
+            self.assertEqual(expected["statuses"], actual["statuses"])
+            self.assertEqual(expected["steps"], actual["steps"])
+            self.assertEqual(expected["actions"], actual["actions"])
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_simulate(self):
+        actions = generate_candidates(1, vehicles=[0], seed=2)[0][:MIN_SIM_STEPS]
+        result = simulate(make_config(), 0, actions, cache=self.cache)
+
+        self.assertFalse(result["pruned"])
+        self.assertEqual(result["steps"], len(result["observations"]))
+        self.assertEqual(("END", {}), result["events"][-1])
+        self.assertEqual(4, len(result["verdicts"]))
+        with mock.patch("src.scenario_fuzzer.create_env", side_effect=AssertionError):
+            cached = simulate(make_config(), 0, actions, cache=self.cache)
+        self.assertEqual(result["events"], cached["events"])
+        self.assertEqual(1, self.cache.hits)
+
+    def test_fuzz_uses_cache(self):
+        candidates = generate_candidates(2, vehicles=[0], seed=1)
+        results = fuzz(candidates, make_config(), workers=0, cache=self.cache)
+
+        with mock.patch("src.scenario_fuzzer.create_env", side_effect=AssertionError):
+            cached = fuzz(candidates, make_config(), workers=0, cache=self.cache)
+        self.assertEqual(
+            [result["statuses"] for result in results],
+            [result["statuses"] for result in cached],
+        )
+        self.assertEqual(
+            {"hits": 2, "misses": 2},
+            {"hits": self.cache.hits, "misses": self.cache.misses},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
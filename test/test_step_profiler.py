@@ -0,0 +1,116 @@
+import unittest
+
+import numpy as np
+from bppy import BEvent, BProgram, SimpleEventSelectionStrategy, sync, thread
+
+from src.main import create_env, set_config
+from src.observation_wrapper import ObservationWrapper
+from src.step_profiler import *
+
+
+@thread
+def two_events():
+    yield sync(request=BEvent("A"))
+    yield sync(request=BEvent("B"))
+
+
+class TestStepProfiler(unittest.TestCase):
+
+    def test_span(self):
+        profiler = StepProfiler()
+        with profiler.span("outer"):
+            with profiler.span("inner", "test"):
+                pass
+
+        self.assertEqual(["inner", "outer"], [span[0] for span in profiler.spans])
+        inner, outer = profiler.spans
+        self.assertEqual("test", inner[1])
+        self.assertLessEqual(outer[2], inner[2])
+        self.assertLessEqual(inner[3], outer[3])
+
+    def test_disabled(self):
+        profiler = StepProfiler(enabled=False)
+        function = lambda: 1
+        with profiler.span("step"):
+            pass
+
+        self.assertIs(function, profiler.wrap(function, "function", "test"))
+        self.assertEqual([], profiler.spans)
+        self.assertEqual({}, profiler.summary())
+
+    def test_wrap_records_exceptions(self):
+        profiler = StepProfiler()
+
+        def fail():
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            profiler.wrap(fail, "fail", "test")()
+        self.assertEqual("fail", profiler.spans[0][0])
+
+    def test_chrome_trace(self):
+        profiler = StepProfiler()
+        for _ in range(3):
+            with profiler.span("step"):
+                pass
+
+        events = profiler.chrome_trace()["traceEvents"]
+        self.assertEqual(3, len(events))
+        self.assertEqual(0.0, events[0]["ts"])
+        for event in events:
+            self.assertEqual("X", event["ph"])
+            self.assertGreaterEqual(event["dur"], 0.0)
+
+    def test_summary(self):
+        profiler = StepProfiler()
+        profiler.spans.extend(
+            [
+                ("step", "loop", 0, 1000, 0),
+                ("step", "loop", 1000, 4000, 0),
+                ("select", "bp", 1000, 2000, 0),
+            ]
+        )
+
+        summary = profiler.summary()
+        self.assertEqual(2, summary["step"]["count"])
+        self.assertAlmostEqual(0.004, summary["step"]["total_ms"])
+        self.assertAlmostEqual(2.0, summary["step"]["mean_us"])
+        self.assertAlmostEqual(3.0, summary["step"]["max_us"])
+        self.assertAlmostEqual(1.0, summary["step"]["share"])
+        self.assertAlmostEqual(0.25, summary["select"]["share"])
+        self.assertTrue(profiler.format_summary().splitlines()[1].startswith("step"))
+
+    def test_instrument_bprogram(self):
+        profiler = StepProfiler()
+        bp = BProgram(
+            bthreads=[two_events()],
+            event_selection_strategy=SimpleEventSelectionStrategy(),
+        )
+        profiler.instrument_bprogram(bp)
+        bp.run()
+
+        summary = profiler.summary()
+        # die letzte Auswahl findet kein Event mehr, setup() schaltet die b-threads zum ersten sync weiter
+        self.assertEqual(3, summary["bp.select"]["count"])
+        self.assertEqual(3, summary["bp.advance"]["count"])
+
+    def test_instrument_env_and_wrapper(self):
+        profiler = StepProfiler()
+        env = profiler.instrument_env(create_env(set_config(), render_mode=None))
+        env.reset()
+        obs, *_ = env.step((1, 1, 2, 4, 0, 4, 4))
+        wrapper = profiler.instrument_wrapper(ObservationWrapper(obs, env))
+        velocity = wrapper.get_velocity(0)
+        env.close()
+
+        summary = profiler.summary()
+        self.assertEqual(1, summary["env.step"]["count"])
+        self.assertEqual(1, summary["env.simulate"]["count"])
+        # einmal im Step und einmal im zweiten reset()
+        self.assertEqual(2, summary["env.observe"]["count"])
+        self.assertEqual(1, summary["wrapper.get_velocity"]["count"])
+        self.assertTrue(np.isfinite(velocity))
+
+
+if __name__ == "__main__":
+    unittest.main()
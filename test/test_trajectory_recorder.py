@@ -0,0 +1,97 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.trajectory_recorder import *
+
+
+class TestTrajectoryRecorder(unittest.TestCase):
+    # zwei kontrollierte Fahrzeuge, das zweite sieht ein Fahrzeug weniger als das erste
+    OBSERVATION = (
+        np.array([[100, 4, 25, 0], [-25, 4, 20, 0]], dtype=np.float32),
+        np.array([[75, 8, 20, 0]], dtype=np.float32),
+    )
+    INFO = {"speed": 25.0, "crashed": False, "rewards": {"on_road_reward": 1.0}}
+
+    def record_steps(self, directory, steps, max_steps=10):
+        with TrajectoryRecorder(
+            directory, max_steps, {"lanes_count": 4}, observation_rows=3
+        ) as recorder:
+            for step in range(steps):
+                recorder.record(
+                    self.OBSERVATION, (step, 1), 0.5 * step, False, False, self.INFO
+                )
+
+    def test_record_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.record_steps(directory, 4)
+            header, streams = load_recording(directory)
+
+            self.assertEqual(4, header["steps"])
+            self.assertEqual({"lanes_count": 4}, header["config"])
+            self.assertIsInstance(streams["observations"], np.memmap)
+            self.assertEqual((4, 2, 3, 4), streams["observations"].shape)
+            self.assertEqual([0, 1, 2, 3], streams["actions"][:, 0].tolist())
+            self.assertEqual([0, 0.5, 1, 1.5], streams["rewards"].tolist())
+            self.assertEqual([1.0] * 4, streams["info.rewards.on_road_reward"].tolist())
+
+    # fehlende Zeilen einer MultiAgentObservation werden mit NaN aufgefüllt
+    def test_ragged_observation_padded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.record_steps(directory, 1)
+            _, streams = load_recording(directory)
+
+            np.testing.assert_array_equal(
+                self.OBSERVATION[1][0], streams["observations"][0, 1, 0]
+            )
+            self.assertTrue(np.isnan(streams["observations"][0, 1, 1:]).all())
+
+    # ein info-Eintrag, der erst im zweiten Schritt erscheint, ist davor NaN
+    def test_late_stream_padded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with TrajectoryRecorder(directory, 10) as recorder:
+                recorder.record(self.OBSERVATION, (0, 1), 0.0, False, False, {})
+                recorder.record(self.OBSERVATION, (1, 1), 0.0, False, False, self.INFO)
+            header, streams = load_recording(directory)
+
+            self.assertEqual(0, header["streams"]["rewards"]["first_step"])
+            self.assertEqual(1, header["streams"]["info.speed"]["first_step"])
+            self.assertTrue(np.isnan(streams["info.speed"][0]))
+            self.assertEqual(25.0, streams["info.speed"][1])
+
+    # der Header wird schon beim Anlegen geschrieben, auch ohne close()
+    def test_header_written_on_creation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = TrajectoryRecorder(directory, 10, {"lanes_count": 4})
+            recorder.record(self.OBSERVATION, (0, 1), 0.0, False, False, self.INFO)
+            header, streams = load_recording(directory)
+
+            self.assertEqual({"lanes_count": 4}, header["config"])
+            self.assertIn("info.speed", streams)
+            recorder.close()
+
+    # eine nicht geschlossene Aufzeichnung enthält alle bisher aufgezeichneten Schritte
+    def test_load_unclosed_recording(self):
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = TrajectoryRecorder(directory, 30, observation_rows=3)
+            for step in range(20):
+                recorder.record(
+                    self.OBSERVATION, (step, 1), 0.5 * step, False, False, self.INFO
+                )
+            header, streams = load_recording(directory)
+
+            self.assertEqual(20, header["steps"])
+            self.assertEqual((20, 2, 3, 4), streams["observations"].shape)
+            self.assertEqual(list(range(20)), streams["actions"][:, 0].tolist())
+            self.assertEqual(9.5, streams["rewards"][-1])
+            recorder.close()
+
+    def test_recording_full(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(RecordingFullError):
+                self.record_steps(directory, 3, max_steps=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
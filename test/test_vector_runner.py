@@ -0,0 +1,48 @@
+import unittest
+
+import gymnasium as gym
+import numpy as np
+
+from src.observation_wrapper import stack_observation
+from src.vector_runner import *
+
+
+def make_config():
+    config = set_config()
+    # weniger Simulationsschritte je env.step(), damit der Test schnell bleibt
+    config["simulation_frequency"] = 5
+    return config
+
+
+class TestVectorRunner(unittest.TestCase):
+
+    def test_sync_observations_stacked(self):
+        config = make_config()
+        with VectorRunner(2, config, asynchronous=False) as runner:
+            obs, _ = runner.reset(seed=3)
+            self.assertEqual((2, 7, count_vehicles(config), 4), obs.shape)
+            self.assertTrue(obs.flags.c_contiguous)
+
+            # das zweite Env erhält seed + 1
+            env = gym.make("highway-v0", config=config, disable_env_checker=True)
+            single_obs, _ = env.reset(seed=4)
+            np.testing.assert_array_equal(
+                stack_observation(single_obs, count_vehicles(config)), obs[1]
+            )
+
+            obs, reward, terminated, truncated, _ = runner.step(
+                [DEFAULT_ACTION, (1,) * 7]
+            )
+            self.assertEqual((2, 7, count_vehicles(config), 4), obs.shape)
+            self.assertEqual((2,), reward.shape)
+
+    def test_async(self):
+        with VectorRunner(2, make_config(), asynchronous=True) as runner:
+            runner.reset(seed=0)
+            obs, reward, terminated, truncated, _ = runner.step(DEFAULT_ACTION)
+            self.assertEqual((2, 7, 8, 4), obs.shape)
+            self.assertEqual(np.float32, obs.dtype)
+
+
+if __name__ == "__main__":
+    unittest.main()